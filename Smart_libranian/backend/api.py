@@ -1,110 +1,644 @@
 # backend/api.py
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Union, List, Dict, Tuple
-import os, json, re
-from openai import OpenAI
-from unidecode import unidecode
+from typing import Optional, Union, List, Dict, Tuple, AsyncIterator
+import os, json, re, time, asyncio, threading
+from collections import OrderedDict
+import httpx
 
 # filtrul local de limbaj
-from core.language_filter import filter_prompt
+from core.language_filter import filter_prompt, filter_many
+from core.language_detect import detect_lang
 
 from core.tools import get_summary_by_title
-
-app = FastAPI(title="RINA Bot - OpenAI + ChromaDB")
+from core.title_matcher import get_title_matcher
+from core import vector_store
+from core.answer_cache import AnswerCache, ANSWER_CACHE_THRESHOLD
+from core.embeddings import embed_texts, get_provider
+from core.lexical_index import parse_document
+from core import metrics
 
 # ==== OpenAI config ====
 OPENAI_API_KEY = ""
-client = OpenAI(api_key=OPENAI_API_KEY)
 MODEL_NAME = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "32"))        # completări simultane spre provider
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "64"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))              # secunde / apel
+DISCONNECT_POLL = 0.25                                            # cât de des verificăm dacă clientul a plecat
 
 
 LANGUAGE_FILTER_MODE = "block"
+TITLE_FUZZY_MATCH = os.getenv("TITLE_FUZZY_MATCH", "0") == "1"  # toleranță la o greșeală de tastare în titlu
+# întrebări care nu sunt în română: "combined" = un singur prompt care detectează limba și răspunde,
+# "translate" = traducere prin LLM (memorată) înainte de căutarea titlului
+TRANSLATE_MODE = os.getenv("TRANSLATE_MODE", "combined")
+TRANSLATION_CACHE_SIZE = 2048
+
+# cât de des evităm apelul de detectare/traducere (expuse în /stats)
+LANG_STATS = {
+    "requests": 0,
+    "fast_path_ro": 0,          # detectat local ca română -> fără traducere
+    "title_without_translation": 0,
+    "combined_prompt": 0,       # detectare + răspuns într-un singur apel
+    "translated": 0,            # apel LLM de traducere
+    "translation_cache_hits": 0,
+}
+_translations: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+
+# retrieval-first: întrebările fără titlu caută întâi în catalog (search_books). Un prim rezultat sigur
+# (BM25 sigur sau similaritate >= prag) primește răspunsul direct din catalog, fără LLM (doar pentru română,
+# limba rezumatelor); altfel primele RETRIEVAL_TOP_K cărți intră ca context în promptul de generare.
+RETRIEVAL_FIRST = os.getenv("RETRIEVAL_FIRST", "1") != "0"
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "3"))
+RETRIEVAL_ANSWER_THRESHOLD = os.getenv("RETRIEVAL_ANSWER_THRESHOLD")  # similaritate cosinus; gol = după provider
+# scala similarităților diferă între modele: n-gramele hash-uite dau scoruri mult mai mici
+DEFAULT_ANSWER_THRESHOLDS = {"openai": 0.45, "onnx": 0.45, "hashed": 0.25}
+# cache-ul semantic compară întrebare cu întrebare: praguri mult mai sus; la n-gramele hash-uite, parafrazele și
+# întrebările diferite se suprapun ("dragoste" / "dragoni" ~0.86), deci acolo doar aproape-duplicatele
+DEFAULT_CACHE_THRESHOLDS = {"openai": 0.92, "onnx": 0.90, "hashed": 0.95}
+GROUNDED_SUMMARY_CHARS = 400   # cât din rezumatul fiecărei cărți intră în prompt
+LOG_ANSWER_PATH = os.getenv("LOG_ANSWER_PATH", "1") != "0"
+
+# calea urmată de fiecare cerere /chat (expuse în /stats și ca rina_answer_path_total)
+ANSWER_PATHS = {
+    "moderated": 0,
+    "cache": 0,
+    "title": 0,                 # titlu menționat explicit -> rezumatul lui, rescris de LLM
+    "retrieval_direct": 0,      # răspuns din catalog, fără apel LLM
+    "retrieval_grounded": 0,    # LLM cu primele k cărți din catalog ca context
+    "llm": 0,                   # căutarea a eșuat / e dezactivată -> recomandare liberă
+}
+
+# /chat/batch: evaluări și backfill-uri cu mii de întrebări într-o singură cerere
+BATCH_MAX_QUESTIONS = int(os.getenv("BATCH_MAX_QUESTIONS", "10000"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))  # întrebări rezolvate simultan per lot (sub LLM_CONCURRENCY)
 
+# cache de răspunsuri (exact + semantic); golit automat la re-ingest
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE", "1") != "0"
+ANSWER_CACHE_SEMANTIC = os.getenv("ANSWER_CACHE_SEMANTIC", "1") != "0"
+
+def _cache_threshold() -> float:
+    if ANSWER_CACHE_THRESHOLD:
+        return float(ANSWER_CACHE_THRESHOLD)
+    return DEFAULT_CACHE_THRESHOLDS.get(get_provider().name, DEFAULT_CACHE_THRESHOLDS["openai"])
+
+answer_cache = AnswerCache(threshold=_cache_threshold,
+                           embed=(lambda q: embed_texts([q])[0]) if ANSWER_CACHE_SEMANTIC else None)
+
+# un singur client async (pool HTTP partajat) pe proces, creat la startup
+_http: Optional[httpx.AsyncClient] = None
+_llm: Optional["AsyncOpenAI"] = None
+_llm_sem: Optional[asyncio.Semaphore] = None
+# timeout-urile tratate ca 504; APITimeoutError se adaugă când se importă openai (în get_llm)
+_timeouts: tuple = (asyncio.TimeoutError,)
+
+def get_llm() -> "AsyncOpenAI":
+    global _http, _llm, _llm_sem, _timeouts
+    if _llm is None:
+        if not OPENAI_API_KEY:
+            raise RuntimeError("Set OPENAI_API_KEY in environment.")
+        from openai import AsyncOpenAI, APITimeoutError
+        _timeouts = (asyncio.TimeoutError, APITimeoutError)
+        _http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS),
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=5.0),
+        )
+        _llm = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=_http, max_retries=1)
+        _llm_sem = asyncio.Semaphore(LLM_CONCURRENCY)
+    return _llm
 
-BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-BOOKS_PATH = os.path.join(BASE_DIR, "core", "book_summaries.json")
+async def close_llm():
+    global _http, _llm, _llm_sem
+    if _http is not None:
+        await _http.aclose()
+    _http, _llm, _llm_sem = None, None, None
 
-def load_books() -> List[Dict]:
+# ==== pornire ====
+# FAST_START=1: serverul e anunțat gata imediat după import, iar încălzirea (store, titluri, client LLM)
+# continuă în fundal; cererile sosite între timp încarcă lazy ce le lipsește. Implicit: încălzire, apoi gata.
+FAST_START = os.getenv("FAST_START", "0") == "1"
+# launcher-ele din alt proces primesc "ready" pe acest descriptor (pipe moștenit), fără să interogheze /ping
+READY_FD = os.getenv("BACKEND_READY_FD")
+ready = threading.Event()       # launcher-ul din același proces (run.py) așteaptă pe el
+warmed = threading.Event()      # încălzirea s-a terminat (GET /ready)
+
+def _signal_ready():
+    if ready.is_set():
+        return
+    ready.set()
+    if READY_FD:
+        try:
+            os.write(int(READY_FD), b"ready\n")
+            os.close(int(READY_FD))
+        except (OSError, ValueError) as e:
+            print("[WARN] Could not signal readiness:", e)
+
+def _warm_up():
+    """Încărcările lente de la pornire; rulează într-un thread, nu pe bucla de evenimente."""
     try:
-        with open(BOOKS_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return []
+        n = vector_store.warm_store()
+        print(f"[INFO] Vector store ready ({n} books).")
+    except Exception as e:
+        print("[WARN] Vector store warm-up failed:", e)
+    print(f"[INFO] Title matcher ready ({len(get_title_matcher())} titles).")
+    if OPENAI_API_KEY:
+        import openai  # noqa: F401  (altfel primul get_llm l-ar importa pe bucla de evenimente)
 
-BOOKS = load_books()
+async def _warm_all():
+    t0 = time.perf_counter()
+    await asyncio.to_thread(_warm_up)
+    try:
+        get_llm()
+    except RuntimeError as e:
+        print("[WARN]", e)
+    warmed.set()
+    print(f"[INFO] Warm-up done in {time.perf_counter() - t0:.2f}s.")
 
-def strip_diacritics(s: str) -> str:
-    return unidecode(s or "").lower().strip()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # deschidem o singură dată clientul Chroma și încărcăm indexul înainte de primul request
+    task = None
+    if FAST_START:
+        task = asyncio.create_task(_warm_all())
+    else:
+        await _warm_all()
+    _signal_ready()
+    yield
+    if task is not None:
+        await task
+    await close_llm()
+    vector_store.close_store()
 
-def chat_completion(prompt: str, temperature: float = 0.4) -> str:
+app = FastAPI(title="RINA Bot - OpenAI + ChromaDB", lifespan=lifespan)
+# latența pe etape + /metrics; Server-Timing doar cu X-Debug-Timing: 1 (sau TIMING_HEADER=1)
+app.add_middleware(metrics.TimingMiddleware)
+
+def _count_usage(kind: str, usage):
+    if usage is not None:
+        metrics.inc("rina_llm_tokens_total", getattr(usage, "prompt_tokens", 0) or 0, kind=kind, type="prompt")
+        metrics.inc("rina_llm_tokens_total", getattr(usage, "completion_tokens", 0) or 0, kind=kind, type="completion")
+
+
+async def chat_completion(prompt: str, temperature: float = 0.4, json_mode: bool = False) -> str:
     msgs = [
         {"role": "system", "content": "You are a helpful, concise assistant."},
         {"role": "user", "content": prompt}
     ]
-    resp = client.chat.completions.create(model=MODEL_NAME, messages=msgs, temperature=temperature)
+    llm = get_llm()
+    extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+    kind = "json" if json_mode else "completion"
+    try:
+        with metrics.stage("llm_completion"):
+            async with _llm_sem:
+                resp = await asyncio.wait_for(
+                    llm.chat.completions.create(model=MODEL_NAME, messages=msgs, temperature=temperature,
+                                                timeout=LLM_TIMEOUT, **extra),
+                    timeout=LLM_TIMEOUT,
+                )
+    except _timeouts:
+        metrics.inc("rina_llm_calls_total", kind=kind, outcome="timeout")
+        raise HTTPException(status_code=504, detail="LLM request timed out")
+    except Exception:
+        metrics.inc("rina_llm_calls_total", kind=kind, outcome="error")
+        raise
+    metrics.inc("rina_llm_calls_total", kind=kind, outcome="ok")
+    _count_usage(kind, getattr(resp, "usage", None))
     return resp.choices[0].message.content
 
-def detect_lang_and_to_ro(text: str) -> Tuple[str, str]:
+async def chat_completion_stream(prompt: str, temperature: float = 0.4) -> AsyncIterator[str]:
+    """Ca chat_completion, dar livrează fragmentele de text pe măsură ce sosesc de la provider."""
+    msgs = [
+        {"role": "system", "content": "You are a helpful, concise assistant."},
+        {"role": "user", "content": prompt}
+    ]
+    llm = get_llm()
+    async with _llm_sem:
+        t0 = time.perf_counter()
+        try:
+            stream = await asyncio.wait_for(
+                llm.chat.completions.create(model=MODEL_NAME, messages=msgs, temperature=temperature,
+                                            timeout=LLM_TIMEOUT, stream=True),
+                timeout=LLM_TIMEOUT,
+            )
+        except _timeouts:
+            metrics.inc("rina_llm_calls_total", kind="stream", outcome="timeout")
+            raise HTTPException(status_code=504, detail="LLM request timed out")
+        metrics.inc("rina_llm_calls_total", kind="stream", outcome="ok")
+        chunks = 0
+        try:
+            async for chunk in stream:
+                if chunk.choices:
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        if not chunks:
+                            metrics.record("llm_first_token", time.perf_counter() - t0)
+                        chunks += 1
+                        yield delta
+        finally:
+            # fără stream_options providerul nu raportează usage pe flux: numărăm fragmentele de conținut
+            metrics.record("llm_stream", time.perf_counter() - t0)
+            metrics.inc("rina_llm_tokens_total", chunks, kind="stream", type="completion")
+
+def _parse_lang_json(raw: str, text: str) -> Tuple[str, str]:
+    body = (raw or "").strip()
+    # unele modele învelesc JSON-ul în ```json ... ```
+    m = re.search(r"\{.*\}", body, flags=re.DOTALL)
+    try:
+        data = json.loads(m.group(0) if m else body)
+        return (data.get("lang") or "ro").lower(), data.get("ro") or text
+    except Exception:
+        print("[WARN] Could not parse language JSON from LLM:", body[:200])
+        return "ro", text
+
+async def detect_lang_and_to_ro(text: str) -> Tuple[str, str]:
+    key = text.strip()
+    cached = _translations.get(key)
+    if cached is not None:
+        _translations.move_to_end(key)
+        LANG_STATS["translation_cache_hits"] += 1
+        metrics.inc("rina_cache_total", cache="translation", result="hit")
+        return cached
+    metrics.inc("rina_cache_total", cache="translation", result="miss")
     prompt = (
         "Detectează limba următorului text și traduce-l în română. "
         "Răspunde STRICT în JSON cu cheile: lang, ro.\n\n"
         f"Text: ```{text}```"
     )
-    raw = chat_completion(prompt, temperature=0.0)
-    lang, ro = "ro", text
+    raw = await chat_completion(prompt, temperature=0.0, json_mode=True)
+    LANG_STATS["translated"] += 1
+    result = _parse_lang_json(raw, text)
+    _translations[key] = result
+    while len(_translations) > TRANSLATION_CACHE_SIZE:
+        _translations.popitem(last=False)
+    return result
+
+def _in_user_lang(user_lang: Optional[str], question: str) -> str:
+    if user_lang:
+        return f"în limba {user_lang.upper()}"
+    # limba nu a fost detectată local: o lăsăm pe seama modelului, în același apel
+    return f"în aceeași limbă în care este scrisă întrebarea utilizatorului („{question}”)"
+
+async def _cancel_on_disconnect(request: Request, coro):
+    """Rulează coro ca task și îl anulează dacă clientul HTTP închide conexiunea între timp."""
+    task = asyncio.ensure_future(coro)
     try:
-        data = json.loads(raw)
-        lang = (data.get("lang") or "ro").lower()
-        ro = data.get("ro") or text
-    except Exception:
-        pass
-    return lang, ro
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                return JSONResponse({"detail": "client disconnected"}, status_code=499)
+    finally:
+        if not task.done():
+            task.cancel()
 
 # ---------- API ----------
 class ChatIn(BaseModel):
     user_id: Union[str, int]
     question: str
 
+class BatchIn(BaseModel):
+    user_id: Union[str, int]
+    questions: List[str]
+
 @app.get("/ping")
 async def ping():
     return {"status": "ok"}
 
-@app.post("/chat")
-async def chat(payload: ChatIn):
-    original_question = (payload.question or "").strip()
+@app.get("/ready")
+async def readiness():
+    """200 după încălzire (probe de readiness); cu FAST_START, 503 cât timp încă se încarcă în fundal."""
+    if warmed.is_set():
+        return {"status": "ready"}
+    return JSONResponse({"status": "warming"}, status_code=503)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/stats")
+async def stats():
+    n = LANG_STATS["requests"] or 1
+    skipped = LANG_STATS["requests"] - LANG_STATS["translated"]
+    return {
+        "language": dict(LANG_STATS, translation_skipped_ratio=round(skipped / n, 3)),
+        "answer_paths": dict(ANSWER_PATHS),
+        "answer_cache": answer_cache.stats(),
+    }
+
+def _count_path(path: str):
+    ANSWER_PATHS[path] += 1
+    metrics.inc("rina_answer_path_total", path=path)
+
+def _log_path(path: str, started: float, **info):
+    _count_path(path)
+    if LOG_ANSWER_PATH:
+        extra = "".join(f" {k}={v}" for k, v in info.items() if v is not None)
+        print(f"[INFO] /chat path={path}{extra} ({(time.perf_counter() - started) * 1000:.0f} ms)")
+
+async def answer_question(question: str) -> Dict:
+    started = time.perf_counter()
+    original_question = (question or "").strip()
 
     
-    ok, filtered_or_reply = filter_prompt(original_question, mode=LANGUAGE_FILTER_MODE)
+    with metrics.stage("filter_prompt"):
+        ok, filtered_or_reply = filter_prompt(original_question, mode=LANGUAGE_FILTER_MODE)
     if not ok:
-        return {"response": filtered_or_reply, "moderated": True}
+        _log_path("moderated", started)
+        return {"response": filtered_or_reply, "moderated": True, "path": "moderated"}
 
-  
-    user_lang, q_ro = detect_lang_and_to_ro(filtered_or_reply)
+    LANG_STATS["requests"] += 1
+    # detectare locală RO/EN: româna nu mai trece printr-un apel LLM de traducere
+    with metrics.stage("detect_lang"):
+        user_lang, _ = detect_lang(filtered_or_reply)
 
-    
-    title = None
-    for b in BOOKS:
-        t_norm = strip_diacritics(b.get("title", ""))
-        if t_norm and t_norm in strip_diacritics(q_ro):
-            title = b.get("title")
-            break
+    cache_lang, qvec = user_lang or "auto", None
+    if ANSWER_CACHE_ENABLED:
+        with metrics.stage("answer_cache"):
+            hit, kind, qvec = await asyncio.to_thread(answer_cache.get, cache_lang, filtered_or_reply)
+        metrics.inc("rina_cache_total", cache="answer", result=kind if hit is not None else "miss")
+        if hit is not None:
+            _log_path("cache", started, cache=kind)
+            return dict(hit, cache=kind, path="cache")
+
+    plan = await _plan_answer(filtered_or_reply, user_lang)
+    if "response" in plan:
+        result = {"response": plan["response"]}
+    else:
+        result = {"response": await chat_completion(plan["prompt"])}
+    if ANSWER_CACHE_ENABLED:
+        answer_cache.put(cache_lang, filtered_or_reply, result, qvec)
+    _log_path(plan["path"], started, title=plan.get("title"), source=plan.get("source"), score=plan.get("score"))
+    return dict(result, cache="miss", path=plan["path"])
+
+def _answer_threshold() -> float:
+    if RETRIEVAL_ANSWER_THRESHOLD:
+        return float(RETRIEVAL_ANSWER_THRESHOLD)
+    return DEFAULT_ANSWER_THRESHOLDS.get(get_provider().name, DEFAULT_ANSWER_THRESHOLDS["openai"])
+
+def _confident(hit: Dict) -> bool:
+    """Primul rezultat e destul de sigur ca să răspundem din catalog fără LLM."""
+    if hit.get("source") == "lexical":  # modul auto a găsit deja un câștigător BM25 clar
+        return True
+    return hit.get("similarity") is not None and hit["similarity"] >= _answer_threshold()
+
+async def _retrieve(q: str, vector=None) -> List[Dict]:
+    try:
+        return await asyncio.to_thread(vector_store.search_books, q, RETRIEVAL_TOP_K, None, vector)
+    except Exception as e:
+        print(f"[WARN] Catalog search failed ({type(e).__name__}: {e}); answering without catalog context.")
+        return []
+
+def _grounded_prompt(q_ro: str, hits: List[Dict], user_lang: Optional[str], question: str) -> str:
+    books = []
+    for i, h in enumerate(hits, 1):
+        fields = parse_document(h.get("doc") or "")
+        books.append(f"{i}. {h['title']} (teme: {fields['themes'] or '-'}): "
+                     f"{fields['summary'][:GROUNDED_SUMMARY_CHARS]}")
+    return (
+        f"User language: {user_lang or 'detect it from the question'}\n"
+        f"User asked: {q_ro}\n"
+        "Cărți din catalogul nostru, cele mai relevante întâi:\n" + "\n".join(books) + "\n\n"
+        "Recomandă cartea din listă care se potrivește cel mai bine, cu un rezumat scurt (2–4 fraze) și motivul "
+        f"alegerii, {_in_user_lang(user_lang, question)}. Folosește doar informațiile din listă; dacă niciuna "
+        "nu se potrivește cu întrebarea, spune asta și recomandă o altă carte relevantă."
+    )
+
+async def _plan_answer(filtered_or_reply: str, user_lang: Optional[str], vector=None) -> Dict:
+    """
+    Alege calea răspunsului: {"path", "prompt"} pentru LLM sau {"path", "response"} direct din catalog
+    (plus "title"/"source"/"score" pentru jurnal). `vector` = embedding-ul întrebării, dacă e deja calculat.
+    """
+    # o singură trecere Aho–Corasick peste întrebare; preferă cel mai lung titlu menționat
+    matcher = get_title_matcher()
+    q_ro = filtered_or_reply
+    if user_lang == "ro":
+        LANG_STATS["fast_path_ro"] += 1
+        with metrics.stage("title_scan"):
+            title = matcher.best(q_ro, fuzzy=TITLE_FUZZY_MATCH)
+    else:
+        # titlul apare de obicei ca atare și în întrebările în alte limbi ("What is 1984?")
+        with metrics.stage("title_scan"):
+            title = matcher.best(filtered_or_reply, fuzzy=TITLE_FUZZY_MATCH)
+        if title:
+            LANG_STATS["title_without_translation"] += 1
+        elif TRANSLATE_MODE == "translate":
+            with metrics.stage("detect_lang_and_to_ro"):
+                user_lang, q_ro = await detect_lang_and_to_ro(filtered_or_reply)
+            with metrics.stage("title_scan"):
+                title = matcher.best(q_ro, fuzzy=TITLE_FUZZY_MATCH)
+        else:
+            LANG_STATS["combined_prompt"] += 1
 
     if title:
-        summary_local = get_summary_by_title(title)
-        prompt = (
+        with metrics.stage("get_summary_by_title"):
+            summary_local = get_summary_by_title(title)
+        return {"path": "title", "title": title, "prompt": (
             f"Cartea: {title}\n"
             f"Rezumat:\n{summary_local}\n\n"
-            f"Rescrie într-un răspuns scurt, conversațional, în limba {user_lang.upper()}."
-        )
-        reply = chat_completion(prompt)
-        return {"response": reply}
+            f"Rescrie într-un răspuns scurt, conversațional, {_in_user_lang(user_lang, filtered_or_reply)}."
+        )}
 
-    
-    prompt_alt = (
-        f"User language: {user_lang}\n"
+    if q_ro != filtered_or_reply:
+        vector = None  # întrebarea tradusă are alt embedding
+    hits = await _retrieve(q_ro, vector) if RETRIEVAL_FIRST else []
+    if hits:
+        top = hits[0]
+        info = {"title": top["title"], "source": top.get("source"),
+                "score": round(top["similarity"], 3) if top.get("similarity") is not None else None}
+        if user_lang == "ro" and _confident(top):
+            with metrics.stage("get_summary_by_title"):
+                response = vector_store.answer_book_question(q_ro, hits)
+            if response:
+                return dict(info, path="retrieval_direct", response=response)
+        return dict(info, path="retrieval_grounded", prompt=_grounded_prompt(q_ro, hits, user_lang, filtered_or_reply))
+
+    return {"path": "llm", "prompt": (
+        f"User language: {user_lang or 'detect it from the question'}\n"
         f"User asked: {q_ro}\n"
-        "Nu am găsit cartea în baza locală. Recomandă o ALTĂ carte relevantă și un rezumat scurt (2–4 fraze)."
-    )
-    reply_alt = chat_completion(prompt_alt)
-    return {"response": reply_alt}
+        "Nu am găsit cartea în baza locală. Recomandă o ALTĂ carte relevantă și un rezumat scurt (2–4 fraze), "
+        f"{_in_user_lang(user_lang, filtered_or_reply)}."
+    )}
+
+async def answer_question_stream(question: str) -> AsyncIterator[Dict]:
+    """Varianta pe flux a answer_question: evenimente {"type": "token"} urmate de un {"type": "done"} final."""
+    started = time.perf_counter()
+    original_question = (question or "").strip()
+    with metrics.stage("filter_prompt"):
+        ok, filtered_or_reply = filter_prompt(original_question, mode=LANGUAGE_FILTER_MODE)
+    if not ok:
+        _log_path("moderated", started)
+        yield {"type": "done", "response": filtered_or_reply, "moderated": True, "path": "moderated"}
+        return
+
+    LANG_STATS["requests"] += 1
+    with metrics.stage("detect_lang"):
+        user_lang, _ = detect_lang(filtered_or_reply)
+    cache_lang, qvec = user_lang or "auto", None
+    if ANSWER_CACHE_ENABLED:
+        with metrics.stage("answer_cache"):
+            hit, kind, qvec = await asyncio.to_thread(answer_cache.get, cache_lang, filtered_or_reply)
+        metrics.inc("rina_cache_total", cache="answer", result=kind if hit is not None else "miss")
+        if hit is not None:
+            _log_path("cache", started, cache=kind)
+            yield {"type": "token", "text": hit["response"]}
+            yield dict(hit, type="done", cache=kind, path="cache")
+            return
+
+    plan = await _plan_answer(filtered_or_reply, user_lang)
+    if "response" in plan:
+        # răspunsul din catalog e gata: un singur fragment
+        yield {"type": "token", "text": plan["response"]}
+        result = {"response": plan["response"]}
+    else:
+        parts = []
+        async for delta in chat_completion_stream(plan["prompt"]):
+            parts.append(delta)
+            yield {"type": "token", "text": delta}
+        result = {"response": "".join(parts)}
+    if ANSWER_CACHE_ENABLED:
+        answer_cache.put(cache_lang, filtered_or_reply, result, qvec)
+    _log_path(plan["path"], started, title=plan.get("title"), source=plan.get("source"), score=plan.get("score"))
+    yield dict(result, type="done", cache="miss", path=plan["path"])
+
+# ---------- /chat/batch ----------
+def _batch_vectors(items: List[Tuple[str, Optional[str]]]) -> List[Optional[List[float]]]:
+    """
+    Embedding-urile întrebărilor care au nevoie de ele (nivelul semantic al cache-ului, căutarea în catalog),
+    într-un singur apel embed_texts (care le împarte singur în loturi paralele).
+    """
+    matcher = get_title_matcher()
+    semantic = ANSWER_CACHE_ENABLED and ANSWER_CACHE_SEMANTIC
+    need = [i for i, (text, _) in enumerate(items)
+            if semantic or (RETRIEVAL_FIRST and not matcher.best(text, fuzzy=TITLE_FUZZY_MATCH))]
+    out: List[Optional[List[float]]] = [None] * len(items)
+    if not need:
+        return out
+    try:
+        for i, vec in zip(need, embed_texts([items[i][0] for i in need])):
+            out[i] = vec
+    except Exception as e:
+        # fiecare întrebare își va calcula singură embedding-ul (sau va merge mai departe fără el)
+        print(f"[WARN] Batch embedding failed ({type(e).__name__}: {e}); embedding per question.")
+    return out
+
+async def _answer_one(text: str, user_lang: Optional[str], vector, qvec, sem: asyncio.Semaphore) -> Dict:
+    try:
+        async with sem:
+            plan = await _plan_answer(text, user_lang, vector)
+            if "response" in plan:
+                result = {"response": plan["response"]}
+            else:
+                result = {"response": await chat_completion(plan["prompt"])}
+    except HTTPException as e:
+        return {"error": e.detail, "status": e.status_code}
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}", "status": 500}
+    if ANSWER_CACHE_ENABLED:
+        answer_cache.put(user_lang or "auto", text, result, qvec)
+    _count_path(plan["path"])
+    return dict(result, cache="miss", path=plan["path"])
+
+async def answer_batch(questions: List[str]) -> AsyncIterator[Dict]:
+    """
+    Răspunsuri pentru un lot, în ordinea de intrare: {"index", "response", "path", ...} sau {"index", "error",
+    "status"} pentru o întrebare eșuată, apoi un rezumat {"done": true, ...}. Întrebările identice se rezolvă
+    o singură dată; completările rulează în paralel (BATCH_CONCURRENCY), dar rezultatele pleacă în ordine.
+    """
+    started = time.perf_counter()
+    originals = [(q or "").strip() for q in questions]
+    unique = list(dict.fromkeys(originals))
+    with metrics.stage("filter_prompt"):
+        filtered = filter_many(unique, mode=LANGUAGE_FILTER_MODE)
+
+    results: Dict[str, Union[Dict, asyncio.Task]] = {}
+    todo: List[Tuple[str, Tuple[str, Optional[str]]]] = []
+    for q, (ok, text) in zip(unique, filtered):
+        if not ok:
+            _count_path("moderated")
+            results[q] = {"response": text, "moderated": True, "path": "moderated"}
+            continue
+        LANG_STATS["requests"] += 1
+        with metrics.stage("detect_lang"):
+            user_lang, _ = detect_lang(text)
+        todo.append((q, (text, user_lang)))
+
+    with metrics.stage("batch_embed"):
+        vectors = await asyncio.to_thread(_batch_vectors, [item for _, item in todo])
+
+    def lookup():
+        return [answer_cache.get(lang or "auto", text, vector=vec)
+                for (_, (text, lang)), vec in zip(todo, vectors)]
+
+    if ANSWER_CACHE_ENABLED:
+        with metrics.stage("answer_cache"):
+            cached = await asyncio.to_thread(lookup)
+    else:
+        cached = [(None, "miss", None)] * len(todo)
+
+    sem = asyncio.Semaphore(BATCH_CONCURRENCY)
+    for (q, (text, lang)), vec, (hit, kind, qvec) in zip(todo, vectors, cached):
+        metrics.inc("rina_cache_total", cache="answer", result=kind if hit is not None else "miss")
+        if hit is not None:
+            _count_path("cache")
+            results[q] = dict(hit, cache=kind, path="cache")
+        else:
+            results[q] = asyncio.ensure_future(_answer_one(text, lang, vec, qvec, sem))
+
+    errors = 0
+    try:
+        for i, q in enumerate(originals):
+            r = results[q]
+            if isinstance(r, asyncio.Future):
+                r = await r
+            errors += "error" in r
+            yield dict(r, index=i)
+    finally:
+        # clientul a plecat sau lotul s-a terminat: nimic nu mai rulează în fundal
+        for r in results.values():
+            if isinstance(r, asyncio.Future) and not r.done():
+                r.cancel()
+    elapsed = time.perf_counter() - started
+    print(f"[INFO] /chat/batch: {len(originals)} questions ({len(unique)} unique, {errors} errors) "
+          f"in {elapsed:.1f} s")
+    yield {"done": True, "questions": len(originals), "unique": len(unique), "errors": errors,
+           "seconds": round(elapsed, 3)}
+
+@app.post("/chat")
+async def chat(payload: ChatIn, request: Request, response: Response):
+    result = await _cancel_on_disconnect(request, answer_question(payload.question))
+    if isinstance(result, dict) and "cache" in result:
+        response.headers["X-Answer-Cache"] = result["cache"]
+    if isinstance(result, dict) and "path" in result:
+        response.headers["X-Answer-Path"] = result["path"]
+    return result
+
+@app.post("/chat/stream")
+async def chat_stream(payload: ChatIn):
+    """Server-Sent Events: câte un eveniment pentru fiecare fragment de text, apoi evenimentul "done"."""
+    async def events():
+        try:
+            async for ev in answer_question_stream(payload.question):
+                yield f"data: {json.dumps(ev, ensure_ascii=False)}\n\n"
+        except HTTPException as e:
+            yield f"data: {json.dumps({'type': 'error', 'detail': e.detail})}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'type': 'error', 'detail': str(e)})}\n\n"
+    # la deconectarea clientului Starlette anulează generatorul, deci și apelul către LLM
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/chat/batch")
+async def chat_batch(payload: BatchIn):
+    """NDJSON: o linie per întrebare, în ordinea de intrare, pe măsură ce sunt gata; ultima linie e rezumatul."""
+    if len(payload.questions) > BATCH_MAX_QUESTIONS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_QUESTIONS} questions per batch")
+
+    async def lines():
+        async for item in answer_batch(payload.questions):
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+    return StreamingResponse(lines(), media_type="application/x-ndjson",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
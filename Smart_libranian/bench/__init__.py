@@ -0,0 +1 @@
+# bench/ - scripturi de măsurare a performanței (rulează din Smart_libranian/: python -m bench.<nume>)
@@ -0,0 +1,78 @@
+# bench/bench_answer_paths.py
+# /chat cu și fără retrieval-first (RETRIEVAL_FIRST), în proces, contra bench.fake_openai: câte cereri API
+# (chat + embedding), latența per întrebare, pe ce cale a mers fiecare întrebare și cât de des răspunsul direct din catalog
+# a ales cartea așteptată. Întrebările: cele etichetate din bench_retrieval, câteva cu titlul explicit
+# și câteva din afara catalogului. Cache-ul de răspunsuri e oprit, ca fiecare întrebare să parcurgă tot lanțul.
+#
+#   python -m bench.bench_answer_paths                       # embedding-uri locale (hashed), fără rețea
+#   python -m bench.bench_answer_paths --provider openai     # embedding-uri de la serverul fals (vectori aleatori)
+import argparse, asyncio, os, shutil, statistics, tempfile, time
+
+os.environ["ANSWER_CACHE"] = "0"
+os.environ.setdefault("EMBED_CACHE", "0")
+os.environ.setdefault("LOG_ANSWER_PATH", "0")
+
+from bench.bench_retrieval import LABELED
+from bench.fake_openai import FakeConfig, start_server
+from core import embeddings, ingest, vector_store
+
+WITH_TITLE = [("Ce părere ai despre 1984?", "1984"), ("What do you think of Neuromancer?", "Neuromancer")]
+OFF_CATALOG = [("Ce faci azi?", None), ("care e vremea mâine", None), ("recomandă-mi o carte bună", None)]
+
+async def _run(api, questions):
+    lat, paths, direct, direct_ok = [], {}, 0, 0
+    for q, expected in questions:
+        t0 = time.perf_counter()
+        res = await api.answer_question(q)
+        lat.append((time.perf_counter() - t0) * 1000.0)
+        paths[res["path"]] = paths.get(res["path"], 0) + 1
+        if res["path"] == "retrieval_direct":
+            direct += 1
+            direct_ok += expected is not None and f"„{expected}”" in res["response"]
+    return lat, paths, (direct_ok / direct if direct else None)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--provider", default="hashed", help="hashed, onnx, local sau openai (serverul fals)")
+    ap.add_argument("--chat-latency", type=float, default=0.3, help="secunde per completare (fake LLM)")
+    ap.add_argument("--threshold", default=None, help="RETRIEVAL_ANSWER_THRESHOLD (implicit: după provider)")
+    args = ap.parse_args()
+
+    cfg = FakeConfig(latency=0.02, per_item_latency=0.0, dim=256, chat_latency=args.chat_latency)
+    server, base_url = start_server(cfg)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    embeddings.OPENAI_API_KEY = embeddings.OPENAI_API_KEY or "sk-fake"
+    embeddings.EMBED_PROVIDER = args.provider
+    embeddings._provider = None
+    embeddings._client = None
+
+    from backend import api
+    api.OPENAI_API_KEY = api.OPENAI_API_KEY or "sk-fake"
+    api.RETRIEVAL_ANSWER_THRESHOLD = args.threshold
+    questions = LABELED + WITH_TITLE + OFF_CATALOG
+
+    tmp = tempfile.mkdtemp(prefix="rina_bench_paths_")
+    try:
+        vector_store.close_store()
+        vector_store.CHROMA_DIR = tmp
+        ingest.run_ingest(rebuild=True)
+        vector_store.warm_store()
+        print(f"[BENCH] {len(questions)} questions, provider={embeddings.get_provider().name}, "
+              f"threshold={api._answer_threshold()}, fake chat latency {args.chat_latency * 1000:.0f} ms")
+        print(f"{'retrieval-first':<16} {'API calls':>9} {'mean ms':>8} {'p95 ms':>8} {'direct ok':>9}  paths")
+        for enabled in (False, True):
+            api.RETRIEVAL_FIRST = enabled
+            calls0 = cfg.requests
+            lat, paths, precision = asyncio.run(_run(api, questions))
+            api._llm = api._http = None  # clientul async e legat de bucla închisă de asyncio.run
+            p95 = sorted(lat)[int(0.95 * (len(lat) - 1))]
+            ok = "-" if precision is None else f"{precision:.2f}"
+            print(f"{'on' if enabled else 'off':<16} {cfg.requests - calls0:>9} {statistics.mean(lat):>8.1f} "
+                  f"{p95:>8.1f} {ok:>9}  {paths}")
+    finally:
+        vector_store.close_store()
+        server.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# bench/bench_batch.py
+# Un set de evaluare trimis întrebare cu întrebare pe /chat (N clienți concurenți) vs. o singură cerere
+# /chat/batch, pe backend-ul real (proces separat) cu bench.fake_openai: durata totală, timpul până la primul
+# rezultat și câte apeluri de chat / embedding au ajuns la provider (citite din /metrics-ul backend-ului).
+# Setul conține duplicate (--dup), ca un job de evaluare real.
+#
+#   python -m bench.bench_batch --questions 300 --dup 0.3 --concurrency 8
+import argparse, asyncio, json, os, random, re, time
+
+from bench import suite
+from bench.fake_openai import FakeConfig, start_server
+
+_CALLS_RE = re.compile(r'^rina_llm_calls_total\{kind="(\w+)",outcome="ok"\} (\S+)$', re.MULTILINE)
+
+def _calls(base: str) -> dict:
+    text = suite.httpx.get(f"{base}/metrics", timeout=5).text
+    return {kind: float(v) for kind, v in _CALLS_RE.findall(text)}
+
+def _questions(n: int, dup: float, tag: str, rng: random.Random):
+    """n întrebări, din care ~dup sunt repetări ale unora anterioare; `tag` le face distincte între moduri."""
+    out = []
+    for i in range(n):
+        if out and rng.random() < dup:
+            out.append(rng.choice(out))
+        else:
+            out.append(f"{suite.QUESTIONS[i % len(suite.QUESTIONS)]} ({tag}{i})")
+    return out
+
+async def _one_by_one(base: str, questions, concurrency: int):
+    it = iter(enumerate(questions))
+    first, errors = [None], [0]
+    limits = suite.httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with suite.httpx.AsyncClient(base_url=base, timeout=120, limits=limits) as client:
+        t0 = time.perf_counter()
+
+        async def worker():
+            for _, q in it:
+                try:
+                    (await client.post("/chat", json={"user_id": "bench", "question": q})).raise_for_status()
+                except Exception:
+                    errors[0] += 1
+                first[0] = first[0] or time.perf_counter() - t0
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - t0, first[0], errors[0]
+
+async def _batch(base: str, questions):
+    first, errors, summary = None, 0, {}
+    async with suite.httpx.AsyncClient(base_url=base, timeout=600) as client:
+        t0 = time.perf_counter()
+        async with client.stream("POST", "/chat/batch", json={"user_id": "bench", "questions": questions}) as r:
+            r.raise_for_status()
+            async for line in r.aiter_lines():
+                if not line:
+                    continue
+                item = json.loads(line)
+                if item.get("done"):
+                    summary = item
+                    continue
+                first = first or time.perf_counter() - t0
+                errors += "error" in item
+        return time.perf_counter() - t0, first, errors, summary
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--questions", type=int, default=300)
+    ap.add_argument("--dup", type=float, default=0.3, help="fracțiunea de întrebări repetate")
+    ap.add_argument("--concurrency", type=int, default=8, help="clienți /chat și BATCH_CONCURRENCY")
+    ap.add_argument("--chat-latency", type=float, default=0.2)
+    ap.add_argument("--embed-latency", type=float, default=0.02)
+    args = ap.parse_args()
+
+    os.environ["BATCH_CONCURRENCY"] = str(args.concurrency)
+    os.environ["LOG_ANSWER_PATH"] = "0"
+    fake, base_url = start_server(FakeConfig(latency=args.embed_latency, per_item_latency=0.0, dim=256,
+                                             chat_latency=args.chat_latency))
+    os.environ["OPENAI_BASE_URL"] = base_url
+    from core import embeddings, vector_store
+    embeddings.OPENAI_API_KEY = embeddings.OPENAI_API_KEY or "sk-fake"
+    embeddings._client = None
+    vector_store.CHROMA_DIR = os.path.join(suite._TMP, "chroma")
+    suite.micro_ingest()
+    vector_store.close_store()
+
+    backend, base = suite.spawn("backend", "/ping")
+    try:
+        rng = random.Random(0)
+        print(f"[BENCH] {args.questions} questions ({args.dup:.0%} repeats), concurrency {args.concurrency}, "
+              f"fake chat {args.chat_latency * 1000:.0f} ms, embed {args.embed_latency * 1000:.0f} ms")
+        print(f"{'mode':<12} {'wall s':>7} {'q/s':>7} {'first ms':>9} {'errors':>7} {'chat calls':>11} "
+              f"{'embed calls':>12}")
+        for mode in ("per-request", "batch"):
+            questions = _questions(args.questions, args.dup, "a" if mode == "batch" else "b", rng)
+            before = _calls(base)
+            if mode == "batch":
+                wall, first, errors, summary = asyncio.run(_batch(base, questions))
+            else:
+                wall, first, errors = asyncio.run(_one_by_one(base, questions, args.concurrency))
+            after = _calls(base)
+            delta = {k: int(after.get(k, 0) - before.get(k, 0)) for k in ("completion", "embedding")}
+            print(f"{mode:<12} {wall:>7.1f} {len(questions) / wall:>7.1f} {(first or 0) * 1000:>9.0f} "
+                  f"{errors:>7} {delta['completion']:>11} {delta['embedding']:>12}")
+    finally:
+        suite.stop(backend)
+        fake.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# bench/bench_chat_load.py
+# Test de încărcare pentru /chat: backend-ul real (uvicorn, în proces) + bench.fake_openai în loc de OpenAI.
+# Cu clientul async, throughput-ul trebuie să crească aproape liniar cu numărul de utilizatori simultani.
+#
+#   python -m bench.bench_chat_load --users 1 4 16 64 --chat-latency 0.3
+import argparse, asyncio, os, socket, statistics, tempfile, threading, time
+
+import httpx
+import uvicorn
+
+from bench.fake_openai import FakeConfig, start_server
+
+QUESTIONS = [
+    "Ce părere ai despre 1984?",
+    "Vreau o carte despre prietenie și magie.",
+    "Recomandă-mi ceva ca Dune.",
+    "What do you recommend for someone who loves war stories?",
+]
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_backend(port: int):
+    from core import vector_store
+    from backend import api
+    vector_store.CHROMA_DIR = tempfile.mkdtemp(prefix="rina_bench_store_")
+    api.OPENAI_API_KEY = api.OPENAI_API_KEY or "sk-fake"
+    server = uvicorn.Server(uvicorn.Config(api.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+async def _user(client: httpx.AsyncClient, url: str, n: int, lat: list, errors: list):
+    for i in range(n):
+        t0 = time.perf_counter()
+        try:
+            r = await client.post(url, json={"user_id": "bench", "question": QUESTIONS[i % len(QUESTIONS)]})
+            r.raise_for_status()
+            lat.append(time.perf_counter() - t0)
+        except Exception as e:
+            errors.append(e)
+
+async def run_level(url: str, users: int, per_user: int):
+    lat, errors = [], []
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(_user(client, url, per_user, lat, errors) for _ in range(users)))
+        wall = time.perf_counter() - t0
+    return lat, errors, wall
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, nargs="+", default=[1, 4, 16, 64])
+    ap.add_argument("--requests-per-user", type=int, default=5)
+    ap.add_argument("--chat-latency", type=float, default=0.3)
+    args = ap.parse_args()
+
+    fake, base_url = start_server(FakeConfig(chat_latency=args.chat_latency))
+    os.environ["OPENAI_BASE_URL"] = base_url
+    port = _free_port()
+    backend = start_backend(port)
+    url = f"http://127.0.0.1:{port}/chat"
+
+    print(f"[BENCH] /chat, fake completion latency {args.chat_latency}s")
+    print(f"{'users':>6} {'req/s':>8} {'p50 (s)':>8} {'p95 (s)':>8} {'errors':>7}")
+    for users in args.users:
+        lat, errors, wall = asyncio.run(run_level(url, users, args.requests_per_user))
+        lat.sort()
+        p95 = lat[int(0.95 * (len(lat) - 1))] if lat else float("nan")
+        p50 = statistics.median(lat) if lat else float("nan")
+        print(f"{users:>6} {len(lat) / wall:>8.1f} {p50:>8.2f} {p95:>8.2f} {len(errors):>7}")
+
+    calls = fake.cfg.requests
+    print(f"[BENCH] LLM calls served by fake server: {calls}")
+    print("[BENCH] /stats:", httpx.get(f"http://127.0.0.1:{port}/stats").json())
+    backend.should_exit = True
+    fake.shutdown()
+
+if __name__ == "__main__":
+    main()
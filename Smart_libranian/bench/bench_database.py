@@ -0,0 +1,136 @@
+# bench/bench_database.py
+# Ops/sec pentru ConversationDB cu mai mulți workeri concurenți (ca thread-urile unui server Flask):
+# implementarea veche (conexiune nouă + commit la fiecare statement, fără indecși, jurnal rollback)
+# vs. conexiunile persistente în WAL.
+#
+#   python -m bench.bench_database --users 200 --workers 1 4 16
+import argparse, os, random, sqlite3, tempfile, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.database import ConversationDB, MIGRATIONS
+
+class LegacyConversationDB:
+    """Copie a vechii implementări, doar metodele folosite la o vizualizare de pagină."""
+
+    def __init__(self, path: str):
+        self.path = path
+        for stmt in MIGRATIONS[0]:
+            self._execute(stmt)
+
+    def _execute(self, sql, params=(), fetch=False):
+        con = sqlite3.connect(self.path)
+        try:
+            cur = con.cursor()
+            cur.execute(sql, params)
+            con.commit()
+            if fetch:
+                return cur.fetchall()
+            return None
+        finally:
+            con.close()
+
+    def create_session(self, user_id, title=None):
+        self._execute("INSERT INTO sessions(user_id,title) VALUES(?,?)", (user_id, title or "Chat"))
+        return self._execute("SELECT last_insert_rowid()", fetch=True)[0][0]
+
+    def get_sessions(self, user_id):
+        return self._execute("SELECT id, title FROM sessions WHERE user_id=? ORDER BY created_at DESC", (user_id,), fetch=True)
+
+    def get_latest_session(self, user_id):
+        rows = self._execute("SELECT id FROM sessions WHERE user_id=? ORDER BY created_at DESC LIMIT 1", (user_id,), fetch=True)
+        return rows[0][0] if rows else None
+
+    def save(self, user_id, question, answer, session_id):
+        self._execute("INSERT INTO messages(user_id, session_id, question, answer) VALUES(?,?,?,?)",
+                      (user_id, session_id, question, answer))
+
+    def get_conversation_by_session(self, session_id):
+        return self._execute("SELECT question, answer, created_at FROM messages WHERE session_id=? ORDER BY id ASC",
+                             (session_id,), fetch=True)
+
+def _populate(path: str, users: int, sessions: int, turns: int) -> dict:
+    # aceleași date pentru ambele variante, inserate direct (rapid)
+    con = sqlite3.connect(path)
+    for stmt in MIGRATIONS[0]:
+        con.execute(stmt)
+    owner = {}
+    for u in range(1, users + 1):
+        con.execute("INSERT INTO users(id, username, password) VALUES(?,?,?)", (u, f"user{u}", "x"))
+        for s in range(sessions):
+            cur = con.execute("INSERT INTO sessions(user_id, title, created_at) VALUES(?,?,?)", (u, f"Chat {s}", s))
+            owner[cur.lastrowid] = u
+    rows = [(owner[sid], sid, "Vreau o carte despre prietenie " * 3, "Îți recomand „Hobbitul” " * 10)
+            for sid in owner for _ in range(turns)]
+    random.Random(0).shuffle(rows)  # mesajele sesiunilor sunt intercalate, ca în realitate
+    con.executemany("INSERT INTO messages(user_id, session_id, question, answer) VALUES(?,?,?,?)", rows)
+    con.commit()
+    con.close()
+    return owner
+
+def _page_view(db, rng: random.Random, owner: dict, sids: list, write_ratio: float) -> int:
+    """Ce face o cerere la /chat: sesiunile utilizatorului, istoricul sesiunii curente, uneori un mesaj salvat."""
+    sid = rng.choice(sids)
+    uid = owner[sid]
+    db.get_sessions(uid)
+    db.get_latest_session(uid)
+    db.get_conversation_by_session(sid)
+    ops = 3
+    if rng.random() < write_ratio:
+        db.save(uid, "întrebare nouă", "răspuns nou", sid)
+        ops += 1
+    return ops
+
+def _run(db, owner: dict, workers: int, seconds: float, write_ratio: float):
+    sids = list(owner)
+    stop = time.perf_counter() + seconds
+    lock = threading.Lock()
+    totals = {"ops": 0, "errors": 0}
+
+    def worker(seed):
+        rng = random.Random(seed)
+        ops = errors = 0
+        while time.perf_counter() < stop:
+            try:
+                ops += _page_view(db, rng, owner, sids, write_ratio)
+            except sqlite3.OperationalError:
+                errors += 1  # "database is locked"
+        with lock:
+            totals["ops"] += ops
+            totals["errors"] += errors
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        list(ex.map(worker, range(workers)))
+    return totals["ops"] / (time.perf_counter() - t0), totals["errors"]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=200)
+    ap.add_argument("--sessions", type=int, default=5)
+    ap.add_argument("--turns", type=int, default=20)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--write-ratio", type=float, default=0.2)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path, new_path = os.path.join(tmp, "old.sqlite3"), os.path.join(tmp, "new.sqlite3")
+        owner = _populate(old_path, args.users, args.sessions, args.turns)
+        _populate(new_path, args.users, args.sessions, args.turns)
+        old_db, new_db = LegacyConversationDB(old_path), ConversationDB(new_path)
+        print(f"[BENCH] {args.users} users, {len(owner)} sessions, {len(owner) * args.turns} messages, "
+              f"{args.write_ratio:.0%} of page views save a message")
+
+        # create_session: ID-ul citit pe altă conexiune decât INSERT-ul
+        print(f"[BENCH] create_session id: old={old_db.create_session(1)}  new={new_db.create_session(1)}")
+
+        print(f"{'workers':>8} {'old ops/s':>10} {'new ops/s':>10} {'old errors':>11} {'new errors':>11}")
+        for w in args.workers:
+            old_rate, old_err = _run(old_db, owner, w, args.seconds, args.write_ratio)
+            new_rate, new_err = _run(new_db, owner, w, args.seconds, args.write_ratio)
+            print(f"{w:>8} {old_rate:>10.0f} {new_rate:>10.0f} {old_err:>11} {new_err:>11}")
+        print(f"[BENCH] connections opened by the new DB: {new_db.connections}")
+        new_db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# bench/bench_embeddings.py
+# Throughput pentru embed_texts pe un catalog mare, împotriva serverului fals din bench.fake_openai:
+# un singur request cu toate textele (vechiul comportament) vs. loturi concurente cu retry,
+# plus providerii locali (fără rețea) pentru comparație.
+#
+#   python -m bench.bench_embeddings --texts 5000 --rate-limit-prob 0.05
+import argparse, os, time
+
+from bench.fake_openai import FakeConfig, start_server
+from core import embeddings, local_embeddings
+
+def _catalog(n: int):
+    return [f"Title: Carte {i}\nThemes: tema {i % 17}, tema {i % 5}\nSummary: " + "cuvânt " * (40 + i % 60)
+            for i in range(n)]
+
+def _run(name: str, fn, texts, server):
+    before = server.cfg.requests
+    t0 = time.perf_counter()
+    vecs = fn(texts)
+    dt = time.perf_counter() - t0
+    assert len(vecs) == len(texts)
+    print(f"{name:<34} {dt:7.2f} s  {len(texts) / dt:9.0f} texts/s  requests={server.cfg.requests - before}")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--texts", type=int, default=5000)
+    ap.add_argument("--latency", type=float, default=0.05)
+    ap.add_argument("--per-item-latency", type=float, default=0.002)
+    ap.add_argument("--dim", type=int, default=64)
+    ap.add_argument("--rate-limit-prob", type=float, default=0.0)
+    args = ap.parse_args()
+
+    cfg = FakeConfig(latency=args.latency, per_item_latency=args.per_item_latency,
+                     dim=args.dim, rate_limit_prob=args.rate_limit_prob)
+    server, base_url = start_server(cfg)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    embeddings.OPENAI_API_KEY = embeddings.OPENAI_API_KEY or "sk-fake"
+    embeddings._client = None
+    embeddings._provider = embeddings.OpenAIEmbedder()
+
+    texts = _catalog(args.texts)
+    print(f"[BENCH] {len(texts)} texts, latency={args.latency}s + {args.per_item_latency}s/item, "
+          f"429 prob={args.rate_limit_prob}")
+
+    _run("single request (old)", lambda t: embeddings._embed_batch(t, "text-embedding-3-small"), texts, server)
+    for conc in (1, 4, 8):
+        embeddings.EMBED_CONCURRENCY = conc
+        _run(f"batched x{embeddings.EMBED_BATCH_SIZE}, concurrency={conc}",
+             lambda t: embeddings.embed_texts(t, use_cache=False), texts, server)
+    _run("local hashed n-grams (CPU)", local_embeddings.HashedNgramEmbedder().embed, texts, server)
+    model_dir = local_embeddings.find_onnx_model()
+    if model_dir:
+        _run("local ONNX model (CPU)", local_embeddings.OnnxEmbedder(model_dir).embed, texts, server)
+    print(f"[BENCH] 429 responses served: {server.cfg.rate_limited}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# bench/bench_history.py
+# Mărimea cookie-ului de sesiune și timpul de randare pentru /chat pe conversații tot mai lungi:
+# vechiul mod (tot istoricul copiat în cookie și randat) vs. istoricul paginat din baza de date.
+#
+#   python -m bench.bench_history --turns 10 100 1000
+import argparse, os, random, statistics, tempfile, time
+
+from flask import render_template
+
+WORDS = ("carte roman poveste prietenie curaj aventură magie război familie dragoste mister istorie "
+         "personaj autor recomand Tolkien Orwell libertate călătorie copilărie speranță").split()
+
+def _text(rng: random.Random, n: int) -> str:
+    # text variat: cookie-ul vechi era comprimat, iar un răspuns repetat identic s-ar comprima nerealist de bine
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+def _client(frontend, turns: int):
+    from core.database import ConversationDB
+    frontend.db = ConversationDB(os.path.join(tempfile.mkdtemp(prefix="rina_bench_hist_"), "bench.sqlite3"))
+    frontend.db.create_user("bench", "bench")
+    uid = frontend.db.validate_user("bench", "bench")
+    sid = frontend.db.create_session(uid)
+    rng = random.Random(turns)
+    frontend.db._execute("INSERT INTO messages(user_id, session_id, question, answer) VALUES(?,?,?,?)",
+                         [(uid, sid, _text(rng, 12), _text(rng, 60)) for _ in range(turns)], many=True)
+    client = frontend.app.test_client()
+    client.post("/", data={"username": "bench", "password": "bench"})
+    return client, uid, sid
+
+def _old_cookie_and_render(frontend, client, uid: int, sid: int, repeat: int):
+    # reconstruim ce făcea vechiul cod: session["messages"] cu toată conversația, randată integral
+    history = frontend.db.get_conversation_by_session(sid)
+    messages = []
+    for q, a, _ in history:
+        messages += [("You", q), ("RINA", a)]
+    data = {"user_id": uid, "username": "bench", "session_id": sid, "pending": None,
+            "last_active": time.time(), "messages": messages, "_permanent": True}
+    cookie = frontend.app.session_interface.get_signing_serializer(frontend.app).dumps(data)
+    times = []
+    with frontend.app.test_request_context("/chat"):
+        from flask import session
+        session.update(data)
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            frontend.db.get_conversation_by_session(sid)
+            render_template("chat.html", messages=messages, pending=None, gemini_ok=False,
+                            sessions=frontend.db.get_sessions(uid), session_id=sid, has_more=False, oldest_id=None)
+            times.append(time.perf_counter() - t0)
+    return len(cookie), statistics.median(times)
+
+def _new_cookie_and_render(client, repeat: int):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        resp = client.get("/chat")
+        times.append(time.perf_counter() - t0)
+        assert resp.status_code == 200, resp.status_code
+    return len(client.get_cookie("session").value), statistics.median(times)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--turns", type=int, nargs="+", default=[10, 100, 1000])
+    ap.add_argument("--repeat", type=int, default=30)
+    args = ap.parse_args()
+
+    from frontend import app as frontend
+    print(f"[BENCH] page size: {frontend.HISTORY_PAGE_SIZE} turns; browsers drop cookies above ~4096 bytes")
+    print(f"{'turns':>6} {'old cookie B':>13} {'new cookie B':>13} {'old render ms':>14} {'new /chat ms':>13}")
+    for n in args.turns:
+        client, uid, sid = _client(frontend, n)
+        old_size, old_t = _old_cookie_and_render(frontend, client, uid, sid, args.repeat)
+        new_size, new_t = _new_cookie_and_render(client, args.repeat)
+        print(f"{n:>6} {old_size:>13} {new_size:>13} {old_t * 1e3:>14.2f} {new_t * 1e3:>13.2f}")
+        frontend.db.close()
+
+if __name__ == "__main__":
+    main()
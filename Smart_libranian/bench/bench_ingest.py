@@ -0,0 +1,62 @@
+# bench/bench_ingest.py
+# Memoria de vârf (tracemalloc) și durata pentru run_ingest (json.load + totul în memorie)
+# vs. run_ingest_streaming, pe un catalog sintetic, cu embedding-uri de la bench.fake_openai.
+#
+#   python -m bench.bench_ingest --books 5000
+import argparse, json, os, shutil, tempfile, time, tracemalloc
+
+os.environ.setdefault("EMBED_CACHE", "0")  # măsurăm pipeline-ul, nu cache-ul
+
+from bench.fake_openai import FakeConfig, start_server
+from core import embeddings, ingest, vector_store
+
+def write_catalog(path: str, n: int):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i in range(n):
+            book = {"title": f"Carte {i}", "themes": [f"tema {i % 17}", f"tema {i % 5}"],
+                    "summary": "Un rezumat sintetic. " * (5 + i % 20)}
+            f.write(("," if i else "") + json.dumps(book, ensure_ascii=False) + "\n")
+        f.write("]\n")
+
+def _measure(name: str, fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn()
+    dt = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<12} {dt:7.2f} s  peak={peak / 2**20:8.1f} MiB")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--books", type=int, default=5000)
+    ap.add_argument("--dim", type=int, default=256)
+    args = ap.parse_args()
+
+    server, base_url = start_server(FakeConfig(latency=0.0, per_item_latency=0.0, dim=args.dim))
+    os.environ["OPENAI_BASE_URL"] = base_url
+    embeddings.OPENAI_API_KEY = embeddings.OPENAI_API_KEY or "sk-fake"
+    embeddings._client = None
+
+    tmp = tempfile.mkdtemp(prefix="rina_bench_ingest_")
+    try:
+        catalog = os.path.join(tmp, "catalog.json")
+        write_catalog(catalog, args.books)
+        print(f"[BENCH] {args.books} books, {os.path.getsize(catalog) / 2**20:.1f} MiB catalog, dim={args.dim}")
+
+        for name, fn in (
+            ("full", lambda: ingest.run_ingest(rebuild=True)),
+            ("streaming", lambda: ingest.run_ingest_streaming(catalog, resume=False)),
+        ):
+            vector_store.close_store()
+            vector_store.CHROMA_DIR = os.path.join(tmp, f"chroma_{name}")
+            ingest.BOOKS_PATH = catalog
+            _measure(name, fn)
+    finally:
+        vector_store.close_store()
+        server.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
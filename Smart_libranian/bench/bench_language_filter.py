@@ -0,0 +1,90 @@
+# bench/bench_language_filter.py
+# Throughput pentru filtrul de limbaj pe texte lungi: implementarea veche (câte un re.search pe cuvânt
+# din listă, contains_profanity pe fiecare token în censor) vs. automatul compilat din core.language_filter.
+# Verifică și că rezultatele sunt identice.
+#
+#   python -m bench.bench_language_filter --words 200 2000 20000
+import argparse, random, re, time
+
+from core import language_filter as lf
+
+# --- implementarea anterioară, păstrată doar ca referință ---
+def _legacy_contains(text: str) -> bool:
+    norm = lf._normalize(text)
+    for w in norm.split():
+        if w in lf.BAD_WORDS:
+            return True
+    for bad in lf.BAD_WORDS:
+        if re.search(rf"{re.escape(bad)}", norm):
+            return True
+    return False
+
+def _legacy_lang(norm_text: str) -> str:
+    for w in norm_text.split():
+        if w in lf.BAD_WORDS_RO:
+            return "ro"
+        if w in lf.BAD_WORDS_EN:
+            return "en"
+    for bad in lf.BAD_WORDS_RO:
+        if re.search(rf"{re.escape(bad)}", norm_text):
+            return "ro"
+    for bad in lf.BAD_WORDS_EN:
+        if re.search(rf"{re.escape(bad)}", norm_text):
+            return "en"
+    return "ro"
+
+def _legacy_censor(text: str) -> str:
+    tokens = re.findall(r"\w+|\W+", text, flags=re.UNICODE)
+    return "".join(lf._mask_word(t) if re.search(r"\w", t) and _legacy_contains(t) else t for t in tokens)
+
+def _legacy_filter(text: str, mode: str):
+    if _legacy_contains(text):
+        if mode == "censor":
+            return True, _legacy_censor(text)
+        lang = _legacy_lang(lf._normalize(text))
+        return False, lf.POLITE_REPLY_EN if lang == "en" else lf.POLITE_REPLY_RO
+    return True, text
+
+CLEAN = ["Vreau", "o", "carte", "despre", "prietenie", "și", "magie,", "ceva", "ca", "Dune.",
+         "I", "would", "like", "a", "novel", "about", "war", "stories!", "Mulțumesc", "frumos"]
+
+def _text(rng: random.Random, n_words: int, dirty: bool) -> str:
+    words = [rng.choice(CLEAN) for _ in range(n_words)]
+    if dirty:
+        for _ in range(max(1, n_words // 100)):
+            words[rng.randrange(n_words)] = rng.choice(sorted(lf.BAD_WORDS))
+    return " ".join(words)
+
+def _rate(fn, texts, budget_s: float = 1.0):
+    n, total_chars, t0 = 0, 0, time.perf_counter()
+    while time.perf_counter() - t0 < budget_s:
+        for t in texts:
+            fn(t)
+            total_chars += len(t)
+        n += len(texts)
+    return total_chars / (time.perf_counter() - t0) / 1e6
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--words", type=int, nargs="+", default=[200, 2000, 20000])
+    args = ap.parse_args()
+    rng = random.Random(0)
+
+    print(f"{'words':>7} {'op':<22} {'old (MB/s)':>11} {'new (MB/s)':>11}")
+    for n in args.words:
+        clean = [_text(rng, n, False) for _ in range(3)]
+        dirty = [_text(rng, n, True) for _ in range(3)]
+        for t in clean + dirty:
+            assert _legacy_filter(t, "block") == lf.filter_prompt(t, "block")
+            assert _legacy_filter(t, "censor") == lf.filter_prompt(t, "censor")
+        budget = 0.5 if n < 5000 else 2.0
+        rows = [
+            ("filter block (clean)", lambda t: _legacy_filter(t, "block"), lambda t: lf.filter_prompt(t, "block"), clean),
+            ("filter block (dirty)", lambda t: _legacy_filter(t, "block"), lambda t: lf.filter_prompt(t, "block"), dirty),
+            ("filter censor (dirty)", lambda t: _legacy_filter(t, "censor"), lambda t: lf.filter_prompt(t, "censor"), dirty),
+        ]
+        for name, old, new, texts in rows:
+            print(f"{n:>7} {name:<22} {_rate(old, texts, budget):>11.3f} {_rate(new, texts, budget):>11.3f}")
+
+if __name__ == "__main__":
+    main()
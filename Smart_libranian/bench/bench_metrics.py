@@ -0,0 +1,83 @@
+# bench/bench_metrics.py
+# Costul instrumentării din core.metrics: cât adaugă o etapă cronometrată (fără trasare, cu trasarea cererii,
+# cu METRICS=0), un contor și o histogramă sub 1-8 thread-uri concurente, și cât durează randarea /metrics.
+# Pentru efectul pe cererile reale: python -m bench.suite cu METRICS=0 vs. METRICS=1.
+#
+#   python -m bench.bench_metrics --ops 200000
+import argparse, threading, time
+
+from core import metrics
+
+def _per_op_ns(fn, ops: int) -> float:
+    t0 = time.perf_counter()
+    fn(ops)
+    return (time.perf_counter() - t0) / ops * 1e9
+
+def _loop_empty(ops):
+    for _ in range(ops):
+        pass
+
+def _loop_stage(ops):
+    for _ in range(ops):
+        with metrics.stage("bench"):
+            pass
+
+def _loop_inc(ops):
+    for _ in range(ops):
+        metrics.inc("rina_db_ops_total", op="bench")
+
+def _loop_traced(ops):
+    token = metrics.start_trace()
+    for i in range(ops):
+        if i % 16 == 0:  # o cerere are câteva zeci de etape, nu sute de mii
+            metrics.end_trace(token)
+            token = metrics.start_trace()
+        with metrics.stage("bench"):
+            pass
+    metrics.end_trace(token)
+
+def _threaded(fn, ops: int, threads: int) -> float:
+    per = ops // threads
+    workers = [threading.Thread(target=fn, args=(per,)) for _ in range(threads)]
+    t0 = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return (time.perf_counter() - t0) / (per * threads) * 1e9
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ops", type=int, default=200000)
+    ap.add_argument("--series", type=int, default=60, help="serii de histogramă pentru testul de randare")
+    args = ap.parse_args()
+
+    base = _per_op_ns(_loop_empty, args.ops)
+    print(f"[BENCH] {args.ops} ops; ns/op net of an empty loop ({base:.0f} ns)")
+    print(f"{'case':<28} {'ns/op':>8}")
+    for name, fn in (("stage()", _loop_stage), ("stage() inside a trace", _loop_traced), ("inc()", _loop_inc)):
+        metrics.reset()
+        print(f"{name:<28} {_per_op_ns(fn, args.ops) - base:>8.0f}")
+    metrics.METRICS_ENABLED = False
+    print(f"{'stage() with METRICS=0':<28} {_per_op_ns(_loop_stage, args.ops) - base:>8.0f}")
+    metrics.METRICS_ENABLED = True
+
+    print(f"\n{'threads':<8} {'stage() ns/op (wall)':>22}")
+    for threads in (1, 2, 4, 8):
+        metrics.reset()
+        print(f"{threads:<8} {_threaded(_loop_stage, args.ops, threads):>22.0f}")
+
+    metrics.reset()
+    for i in range(args.series):
+        for v in (0.0004, 0.003, 0.04, 0.4):
+            metrics.observe("rina_stage_seconds", v, stage=f"stage_{i}")
+        metrics.inc("rina_db_ops_total", op=f"op_{i}")
+    n = 200
+    t0 = time.perf_counter()
+    for _ in range(n):
+        text = metrics.render()
+    ms = (time.perf_counter() - t0) / n * 1000
+    print(f"\nrender(): {args.series} histograms + {args.series} counters -> {len(text) / 1024:.0f} KiB in {ms:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# bench/bench_retrieval.py
+# Calitate și latență pentru search_books pe un set mic de întrebări etichetate, în cele trei moduri:
+# vector (doar embedding), hybrid (BM25 + vector, RRF) și auto (sare peste embedding când BM25 e sigur).
+#
+#   python -m bench.bench_retrieval                 # embedding-uri de la bench.fake_openai (vectori aleatori)
+#   OPENAI_API_KEY=sk-... python -m bench.bench_retrieval --real
+#   python -m bench.bench_retrieval --provider hashed  # embedding-uri locale pe CPU, fără rețea
+#
+# Cu serverul fals, vectorii nu au sens semantic: calitatea "vector" e la nivel de șansă, iar latența
+# include întârzierea simulată a API-ului (--embed-latency). Pentru calitate reală rulați cu --real
+# sau cu un provider local (--provider hashed|onnx|local).
+import argparse, os, shutil, statistics, tempfile, time
+
+os.environ.setdefault("EMBED_CACHE", "0")  # fiecare mod plătește propriile embedding-uri
+
+from bench.fake_openai import FakeConfig, start_server
+from core import embeddings, ingest, vector_store
+
+# (întrebare, titlul așteptat)
+LABELED = [
+    ("distopie totalitară și supraveghere", "1984"),
+    ("Winston și Ministerul Adevărului", "1984"),
+    ("inginerie socială și condiționare genetică", "Minunata lume nouă"),
+    ("o carte despre cenzură, pompieri care ard cărți", "Fahrenheit 451"),
+    ("Paul Atreides pe planeta Arrakis", "Dune"),
+    ("ecologie și misticism într-un deșert", "Dune"),
+    ("cyberpunk, hackeri și inteligență artificială", "Neuromancer"),
+    ("Hari Seldon și psihohistoria", "Fundația"),
+    ("istorie alternativă în care Aliații au pierdut războiul", "Omul din castelul înalt"),
+    ("identitate de gen fluidă pe o altă planetă", "Mâna stângă a întunericului"),
+    ("metavers și un virus care afectează creierele", "Snow Crash"),
+    ("un tată și fiul său într-o lume postapocaliptică", "Drumul"),
+    ("Vreau o carte despre supraviețuire", "Drumul"),
+    ("un android și întrebări despre conștiință", "Mașinile ca mine"),
+    ("rețele sociale și transparență totală", "Cercul"),
+    ("book burning firemen", "Fahrenheit 451"),
+    ("a father and son crossing a burned world", "Drumul"),
+    ("artificial intelligence and megacorporations", "Neuromancer"),
+    ("a tech company obsessed with transparency", "Cercul"),
+    ("genetic engineering and a happy conformist society", "Minunata lume nouă"),
+]
+
+def _evaluate(mode: str, k: int, cfg):
+    hits1, rr, lat = 0, 0.0, []
+    calls0 = cfg.requests if cfg else 0
+    sources = {}
+    for q, expected in LABELED:
+        t0 = time.perf_counter()
+        res = vector_store.search_books(q, k=k, mode=mode)
+        lat.append((time.perf_counter() - t0) * 1000.0)
+        titles = [h["title"] for h in res]
+        if titles[:1] == [expected]:
+            hits1 += 1
+        if expected in titles:
+            rr += 1.0 / (titles.index(expected) + 1)
+        for h in res[:1]:
+            sources[h["source"]] = sources.get(h["source"], 0) + 1
+    n = len(LABELED)
+    calls = (cfg.requests - calls0) if cfg else None
+    return hits1 / n, rr / n, statistics.mean(lat), sorted(lat)[int(0.95 * (n - 1))], calls, sources
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--real", action="store_true", help="embedding-uri reale (OPENAI_API_KEY)")
+    ap.add_argument("--embed-latency", type=float, default=0.2, help="latența simulată a API-ului de embedding")
+    ap.add_argument("--provider", default="openai", help="openai (fals sau --real), hashed, onnx, local")
+    ap.add_argument("--k", type=int, default=3)
+    args = ap.parse_args()
+
+    cfg = None
+    embeddings.EMBED_PROVIDER = args.provider
+    embeddings._provider = None
+    if args.provider != "openai":
+        label = f"local ({embeddings.get_provider().name}, dim={embeddings.get_provider().dim})"
+    elif args.real:
+        label = "OpenAI"
+        embeddings.OPENAI_API_KEY = embeddings.OPENAI_API_KEY or os.environ.get("OPENAI_API_KEY", "")
+    else:
+        label = f"fake ({args.embed_latency * 1000:.0f} ms)"
+        cfg = FakeConfig(latency=args.embed_latency, per_item_latency=0.0, dim=256)
+        server, base_url = start_server(cfg)
+        os.environ["OPENAI_BASE_URL"] = base_url
+        embeddings.OPENAI_API_KEY = embeddings.OPENAI_API_KEY or "sk-fake"
+    embeddings._client = None
+
+    tmp = tempfile.mkdtemp(prefix="rina_bench_retrieval_")
+    try:
+        vector_store.close_store()
+        vector_store.CHROMA_DIR = tmp
+        ingest.run_ingest(rebuild=True)
+        vector_store.warm_store()
+        print(f"[BENCH] {len(LABELED)} labeled queries, k={args.k}, embeddings: {label}")
+        print(f"{'mode':<8} {'hit@1':>6} {'MRR@k':>6} {'mean ms':>8} {'p95 ms':>8} {'embed calls':>12}  top-1 source")
+        for mode in ("vector", "hybrid", "auto"):
+            h1, mrr, mean, p95, calls, sources = _evaluate(mode, args.k, cfg)
+            calls = "-" if calls is None else calls
+            print(f"{mode:<8} {h1:>6.2f} {mrr:>6.2f} {mean:>8.1f} {p95:>8.1f} {calls:>12}  {sources}")
+    finally:
+        vector_store.close_store()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# bench/bench_startup.py
+# Pornirea la rece a backend-ului, fiecare măsurătoare într-un proces nou:
+#   - timpul de import (backend.api cu importurile lazy, față de chromadb + openai importate dinainte);
+#   - time-to-ready: de la lansarea procesului până la semnalul "ready" trimis din lifespan pe un pipe
+#     (BACKEND_READY_FD), pentru: store existent (implicit / FAST_START=1 / importuri eager), store lipsă
+#     refăcut prin ingest (embedding-uri de la bench.fake_openai) și store lipsă restaurat din snapshot;
+#   - latența primei cereri /chat imediat după semnal (cu FAST_START, încălzirea poate fi încă în curs).
+#
+#   python -m bench.bench_startup --runs 3
+import argparse, os, shutil, statistics, subprocess, sys, tempfile, time
+
+import httpx
+
+from bench.fake_openai import FakeConfig, start_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUESTION = "Vreau o carte despre prietenie și magie"
+
+_IMPORT_SNIPPET = "import time; t = time.perf_counter(); {pre}import backend.api; print(time.perf_counter() - t)"
+
+def _import_seconds(pre: str = "") -> float:
+    out = subprocess.run([sys.executable, "-c", _IMPORT_SNIPPET.format(pre=pre)], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+def _module_seconds(module: str) -> float:
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip())
+
+def child(args):
+    """Procesul măsurat: ca run.py (store, apoi uvicorn), cu căile și portul date de părinte."""
+    if args.eager:
+        import chromadb, openai  # noqa: F401  (comportamentul de dinainte de importurile lazy)
+    from core import embeddings, snapshot, vector_store
+    embeddings.OPENAI_API_KEY = "sk-fake"
+    vector_store.CHROMA_DIR = args.store
+    snapshot.SNAPSHOT_PATH = args.snapshot
+    snapshot.ensure_store()
+    import uvicorn
+    from backend import api
+    api.OPENAI_API_KEY = "sk-fake"
+    uvicorn.Server(uvicorn.Config(api.app, host="127.0.0.1", port=args.port, log_level="warning")).run()
+
+def _free_port() -> int:
+    import socket
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _boot(store: str, snap: str, fast: bool = False, eager: bool = False):
+    """Pornește un backend; întoarce (secunde până la "ready", ms pentru primul /chat)."""
+    r, w = os.pipe()
+    port = _free_port()
+    env = dict(os.environ, BACKEND_READY_FD=str(w), FAST_START="1" if fast else "0")
+    cmd = [sys.executable, "-m", "bench.bench_startup", "--child", "--port", str(port),
+           "--store", store, "--snapshot", snap] + (["--eager"] if eager else [])
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, pass_fds=(w,))
+    os.close(w)
+    try:
+        with os.fdopen(r, "rb") as pipe:
+            if not pipe.readline():   # EOF fără semnal: procesul a murit la pornire
+                raise RuntimeError(f"backend exited with code {proc.wait()}")
+        ready = time.perf_counter() - t0
+        t1 = time.perf_counter()
+        resp = httpx.post(f"http://127.0.0.1:{port}/chat", json={"user_id": "bench", "question": QUESTION},
+                          timeout=60)
+        resp.raise_for_status()
+        return ready, (time.perf_counter() - t1) * 1000.0
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--embed-latency", type=float, default=0.3, help="secunde per cerere de embedding (fake)")
+    ap.add_argument("--chat-latency", type=float, default=0.05)
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--eager", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    ap.add_argument("--store", default="", help=argparse.SUPPRESS)
+    ap.add_argument("--snapshot", default="", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        return child(args)
+
+    print(f"[BENCH] {args.runs} runs per case, median shown")
+    print(f"{'import':<34} {'ms':>8}")
+    for name, fn in (("chromadb", lambda: _module_seconds("chromadb")),
+                     ("openai", lambda: _module_seconds("openai")),
+                     ("backend.api (lazy)", _import_seconds),
+                     ("backend.api + chromadb + openai", lambda: _import_seconds("import chromadb, openai; "))):
+        print(f"{name:<34} {statistics.median(fn() for _ in range(args.runs)) * 1000:>8.0f}")
+
+    fake, base_url = start_server(FakeConfig(latency=args.embed_latency, per_item_latency=0.0, dim=256,
+                                             chat_latency=args.chat_latency))
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.update(EMBED_PROVIDER="openai", EMBED_CACHE="0", ANSWER_CACHE="0", LOG_ANSWER_PATH="0")
+    tmp = tempfile.mkdtemp(prefix="rina_bench_startup_")
+    store, snap = os.path.join(tmp, "store"), os.path.join(tmp, "snapshot.tar.gz")
+    nosnap = os.path.join(tmp, "missing.tar.gz")
+    try:
+        _boot(store, nosnap)   # store-ul de referință, apoi snapshot-ul lui
+        subprocess.run([sys.executable, "-c", "import sys; from core import snapshot, vector_store; "
+                        "vector_store.CHROMA_DIR, snapshot.SNAPSHOT_PATH = sys.argv[1:3]; snapshot.create()",
+                        store, snap], cwd=ROOT, check=True, env=dict(os.environ, OPENAI_API_KEY="sk-fake"))
+
+        def fresh(restore_from):
+            shutil.rmtree(store, ignore_errors=True)
+            return restore_from
+
+        cases = [
+            ("existing store, eager imports", lambda: _boot(store, nosnap, eager=True)),
+            ("existing store", lambda: _boot(store, nosnap)),
+            ("existing store, FAST_START=1", lambda: _boot(store, nosnap, fast=True)),
+            ("no store -> ingest", lambda: _boot(store, fresh(nosnap))),
+            ("no store -> snapshot", lambda: _boot(store, fresh(snap))),
+            ("no store -> snapshot, FAST_START=1", lambda: _boot(store, fresh(snap), fast=True)),
+        ]
+        print(f"\n{'time-to-ready':<34} {'ready s':>8} {'1st /chat ms':>13}")
+        for name, fn in cases:
+            runs = [fn() for _ in range(args.runs)]
+            print(f"{name:<34} {statistics.median(r[0] for r in runs):>8.2f} "
+                  f"{statistics.median(r[1] for r in runs):>13.0f}")
+    finally:
+        fake.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# bench/bench_title_match.py
+# Căutarea titlului în întrebare: vechea buclă din /chat (unidecode pe fiecare titlu, la fiecare request)
+# vs. automatul Aho–Corasick din core.title_matcher, pentru cataloage de mărimi diferite.
+#
+#   python -m bench.bench_title_match --sizes 15 1000 100000
+import argparse, random, time
+from unidecode import unidecode
+
+from core.title_matcher import TitleMatcher
+
+WORDS = ["lume", "noua", "castel", "drum", "umbra", "noapte", "vant", "mare", "stele", "cerc",
+         "masini", "fundatia", "dune", "timp", "casa", "rau", "munte", "lup", "foc", "zapada"]
+
+def _titles(n: int, rng: random.Random):
+    out = set()
+    while len(out) < n:
+        out.add(" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).capitalize() + f" {len(out)}")
+    return list(out)
+
+def _old_scan(books, question):
+    def strip_diacritics(s):
+        return unidecode(s or "").lower().strip()
+    for b in books:
+        t_norm = strip_diacritics(b.get("title", ""))
+        if t_norm and t_norm in strip_diacritics(question):
+            return b.get("title")
+    return None
+
+def _per_call_us(fn, questions, budget_s: float = 2.0):
+    n, t0 = 0, time.perf_counter()
+    while True:
+        for q in questions:
+            fn(q)
+        n += len(questions)
+        dt = time.perf_counter() - t0
+        if dt > budget_s:
+            return dt / n * 1e6
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[15, 1000, 10000, 100000])
+    args = ap.parse_args()
+    rng = random.Random(0)
+
+    print(f"{'books':>8} {'old scan (us)':>15} {'automaton (us)':>15} {'build (s)':>10}")
+    for n in args.sizes:
+        titles = _titles(n, rng)
+        books = [{"title": t} for t in titles]
+        questions = [f"Ce părere ai despre {rng.choice(titles)}? Vreau ceva asemănător." for _ in range(20)]
+        questions += ["Recomandă-mi o carte despre prietenie și magie."] * 5
+
+        t0 = time.perf_counter()
+        matcher = TitleMatcher(titles)
+        build = time.perf_counter() - t0
+
+        old = _per_call_us(lambda q: _old_scan(books, q), questions, budget_s=1.0 if n > 1000 else 2.0)
+        new = _per_call_us(matcher.best, questions)
+        print(f"{n:>8} {old:>15.1f} {new:>15.1f} {build:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# bench/bench_ttft.py
+# Time-to-first-token: calea blocantă (/chat, răspunsul apare doar la final) vs. /chat/stream,
+# măsurat direct pe backend și prin frontend-ul Flask. OpenAI este înlocuit de bench.fake_openai.
+#
+#   python -m bench.bench_ttft --chat-latency 0.3 --token-interval 0.03
+import argparse, json, os, statistics, tempfile, time
+
+os.environ.setdefault("ANSWER_CACHE", "0")  # fiecare cerere trebuie să ajungă la LLM
+
+import httpx
+
+from bench.fake_openai import FakeConfig, start_server
+from bench.bench_chat_load import _free_port, start_backend
+
+QUESTIONS = ["Ce părere ai despre 1984?", "Vreau o carte despre prietenie și magie."]
+
+def _backend_blocking(base: str, q: str):
+    t0 = time.perf_counter()
+    httpx.post(f"{base}/chat", json={"user_id": "bench", "question": q}, timeout=60).raise_for_status()
+    total = time.perf_counter() - t0
+    return total, total
+
+def _backend_stream(base: str, q: str):
+    t0 = time.perf_counter()
+    first = None
+    with httpx.stream("POST", f"{base}/chat/stream", json={"user_id": "bench", "question": q}, timeout=60) as r:
+        for line in r.iter_lines():
+            if first is None and line.startswith("data: ") and json.loads(line[6:]).get("type") == "token":
+                first = time.perf_counter() - t0
+    return first, time.perf_counter() - t0
+
+def _flask_client(backend_base: str):
+    from frontend import app as frontend
+    from core.database import ConversationDB
+    frontend.db = ConversationDB(os.path.join(tempfile.mkdtemp(prefix="rina_bench_db_"), "bench.sqlite3"))
+    frontend.FASTAPI_URL = f"{backend_base}/chat"
+    frontend.FASTAPI_STREAM_URL = f"{backend_base}/chat/stream"
+    frontend.db.create_user("bench", "bench")
+    uid = frontend.db.validate_user("bench", "bench")
+    client = frontend.app.test_client()
+    with client.session_transaction() as sess:
+        sess["user_id"] = uid
+        sess["session_id"] = frontend.db.create_session(uid)
+        sess["last_active"] = time.time() + 3600
+    return client
+
+def _flask_blocking(client, q: str):
+    t0 = time.perf_counter()
+    client.post("/chat", data={"message": q})
+    total = time.perf_counter() - t0
+    return total, total
+
+def _flask_stream(client, q: str):
+    t0 = time.perf_counter()
+    first = None
+    resp = client.post("/chat/stream", json={"message": q}, buffered=False)
+    for chunk in resp.response:
+        text = chunk.decode("utf-8") if isinstance(chunk, bytes) else chunk
+        if first is None and '"type": "token"' in text:
+            first = time.perf_counter() - t0
+    resp.close()
+    return first, time.perf_counter() - t0
+
+def _report(name: str, fn, rounds: int):
+    ttft, total = [], []
+    for i in range(rounds):
+        a, b = fn(QUESTIONS[i % len(QUESTIONS)])
+        ttft.append(a)
+        total.append(b)
+    print(f"{name:<22} TTFT p50={statistics.median(ttft):6.3f} s   total p50={statistics.median(total):6.3f} s")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--chat-latency", type=float, default=0.3)
+    ap.add_argument("--token-interval", type=float, default=0.03)
+    ap.add_argument("--rounds", type=int, default=6)
+    args = ap.parse_args()
+
+    fake, base_url = start_server(FakeConfig(chat_latency=args.chat_latency, token_interval=args.token_interval))
+    os.environ["OPENAI_BASE_URL"] = base_url
+    port = _free_port()
+    backend = start_backend(port)
+    base = f"http://127.0.0.1:{port}"
+    client = _flask_client(base)
+
+    print(f"[BENCH] fake LLM: {args.chat_latency}s to first token, {args.token_interval}s / token")
+    _report("backend /chat", lambda q: _backend_blocking(base, q), args.rounds)
+    _report("backend /chat/stream", lambda q: _backend_stream(base, q), args.rounds)
+    _report("flask /chat", lambda q: _flask_blocking(client, q), args.rounds)
+    _report("flask /chat/stream", lambda q: _flask_stream(client, q), args.rounds)
+
+    backend.should_exit = True
+    fake.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# bench/bench_vector_index.py
+# Indexul NumPy memory-mapped (int8 / float16) vs. Chroma pe un catalog sintetic cu vectori grupați pe teme:
+#   - recall@k față de căutarea exactă în float32 și față de rezultatele Chroma;
+#   - latența per interogare într-un singur proces;
+#   - memoria per worker (RSS, din care anonimă vs. mapată din fișier, și PSS) cu N procese care caută în paralel.
+# Nu apelează OpenAI.
+#
+#   python -m bench.bench_vector_index --books 20000 --dim 512 --workers 4
+import argparse, multiprocessing as mp, os, shutil, statistics, tempfile, time
+import numpy as np
+import chromadb
+from chromadb.config import Settings
+
+from core import vector_store
+from core.vector_index import VectorIndex
+
+def _clustered(rng: np.random.Generator, n: int, dim: int, centers: np.ndarray, noise: float) -> np.ndarray:
+    x = centers[rng.integers(0, len(centers), n)] + rng.normal(0.0, noise, (n, dim))
+    return (x / np.linalg.norm(x, axis=1, keepdims=True)).astype(np.float32)
+
+def build_store(path: str, vectors: np.ndarray):
+    client = chromadb.PersistentClient(path=path, settings=Settings(anonymized_telemetry=False))
+    coll = client.get_or_create_collection(vector_store.COLLECTION_NAME, metadata={"hnsw:space": "cosine"})
+    batch = 1000
+    for start in range(0, len(vectors), batch):
+        ids = [f"book-{i}" for i in range(start, min(start + batch, len(vectors)))]
+        coll.add(ids=ids, embeddings=vectors[start:start + len(ids)],
+                 metadatas=[{"title": i} for i in ids], documents=[f"Title: {i}" for i in ids])
+    client.close()
+
+def _rows(vectors: np.ndarray):
+    for i, v in enumerate(vectors):
+        yield f"book-{i}", f"book-{i}", f"Title: book-{i}", v
+
+def _memory() -> dict:
+    out = {}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                key, _, val = line.partition(":")
+                if key in ("VmRSS", "RssAnon", "RssFile"):
+                    out[key] = int(val.split()[0]) / 1024.0
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    out["Pss"] = int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return out
+
+def _worker(backend: str, store: str, queries_path: str, k: int, start, results):
+    queries = np.load(queries_path)
+    before = _memory()
+    if backend == "chroma":
+        vector_store.CHROMA_DIR = store
+        coll = vector_store.get_collection()
+        search = lambda q: vector_store._query(coll, q.tolist(), k)
+    else:
+        index = VectorIndex.load(store)
+        search = lambda q: index.query(q, k)
+    search(queries[0])
+    start.wait()  # toți workerii caută în același timp, ca sub un server multi-proces
+    t0 = time.perf_counter()
+    for q in queries:
+        search(q)
+    elapsed = time.perf_counter() - t0
+    after = _memory()
+    results.put({"qps": len(queries) / elapsed,
+                 **{key: after.get(key, 0.0) - before.get(key, 0.0) for key in ("VmRSS", "RssAnon", "RssFile")},
+                 "Pss": after.get("Pss", 0.0) - before.get("Pss", 0.0)})
+
+def _per_worker(backend: str, store: str, queries_path: str, k: int, workers: int):
+    ctx = mp.get_context("spawn")
+    start, results = ctx.Barrier(workers), ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(backend, store, queries_path, k, start, results))
+             for _ in range(workers)]
+    for p in procs:
+        p.start()
+    out = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return {key: statistics.mean(r[key] for r in out) for key in out[0]} | {"total_qps": sum(r["qps"] for r in out)}
+
+def _latency(search, queries):
+    lat = []
+    for q in queries:
+        t0 = time.perf_counter()
+        search(q)
+        lat.append((time.perf_counter() - t0) * 1000.0)
+    lat.sort()
+    return statistics.mean(lat), lat[int(0.95 * (len(lat) - 1))]
+
+def _recall(got, expected):
+    return statistics.mean(len(set(g) & set(e)) / len(e) for g, e in zip(got, expected))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--books", type=int, default=20000)
+    ap.add_argument("--dim", type=int, default=512)
+    ap.add_argument("--topics", type=int, default=200)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--workers", type=int, default=4)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = rng.normal(0.0, 1.0, (args.topics, args.dim))
+    noise = 1.0 / np.sqrt(args.dim) * 6.0  # grupuri apropiate: vecinii nu sunt triviali de separat
+    vectors = _clustered(rng, args.books, args.dim, centers, noise)
+    queries = _clustered(rng, args.queries, args.dim, centers, noise)
+
+    tmp = tempfile.mkdtemp(prefix="rina_bench_vindex_")
+    try:
+        t0 = time.perf_counter()
+        build_store(tmp, vectors)
+        chroma_build = time.perf_counter() - t0
+        queries_path = os.path.join(tmp, "queries.npy")
+        np.save(queries_path, queries)
+
+        exact = [np.argsort(-(vectors @ q))[:args.k] for q in queries]
+        exact = [[f"book-{i}" for i in row] for row in exact]
+
+        vector_store.close_store()
+        vector_store.CHROMA_DIR = tmp
+        coll = vector_store.get_collection()
+        chroma_search = lambda q: vector_store._query(coll, q.tolist(), args.k)
+        chroma_ids = [[h["id"] for h in chroma_search(q)] for q in queries]
+
+        print(f"[BENCH] {args.books} vectors, dim={args.dim}, {args.queries} queries, k={args.k} "
+              f"(Chroma build {chroma_build:.1f} s)")
+        print(f"{'backend':<10} {'size MB':>8} {'build s':>8} {'recall/exact':>13} {'recall/chroma':>14} "
+              f"{'mean ms':>8} {'p95 ms':>8}")
+        mean, p95 = _latency(chroma_search, queries)
+        print(f"{'chroma':<10} {'-':>8} {chroma_build:>8.2f} {_recall(chroma_ids, exact):>13.3f} "
+              f"{1.0:>14.3f} {mean:>8.2f} {p95:>8.2f}")
+        stores = {"chroma": tmp}
+        for dtype in ("int8", "float16"):
+            path = os.path.join(tmp, f"{dtype}.json")
+            t0 = time.perf_counter()
+            index = VectorIndex.build(path, _rows(vectors), len(vectors), dtype=dtype)
+            build = time.perf_counter() - t0
+            size = sum(m.nbytes for m in (index.matrix, index.scales) if m is not None) / 2 ** 20
+            got = [[h["id"] for h in index.query(q, args.k)] for q in queries]
+            mean, p95 = _latency(lambda q: index.query(q, args.k), queries)
+            print(f"{dtype:<10} {size:>8.1f} {build:>8.2f} {_recall(got, exact):>13.3f} "
+                  f"{_recall(got, chroma_ids):>14.3f} {mean:>8.2f} {p95:>8.2f}")
+            stores[dtype] = path
+        vector_store.close_store()
+
+        print(f"\n[BENCH] {args.workers} worker processes searching concurrently; memory added per worker "
+              f"after opening the index and running all queries (MB)")
+        print(f"{'backend':<10} {'RSS':>8} {'anon':>8} {'file':>8} {'PSS':>8} {'total q/s':>10}")
+        for backend, store in stores.items():
+            r = _per_worker(backend, store, queries_path, args.k, args.workers)
+            print(f"{backend:<10} {r['VmRSS']:>8.1f} {r['RssAnon']:>8.1f} {r['RssFile']:>8.1f} "
+                  f"{r['Pss']:>8.1f} {r['total_qps']:>10.0f}")
+    finally:
+        vector_store.close_store()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
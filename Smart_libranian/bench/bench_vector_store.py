@@ -0,0 +1,76 @@
+# bench/bench_vector_store.py
+# Latența per interogare: client Chroma nou la fiecare căutare (vechiul _get_collection)
+# vs. handle-ul gestionat din core.vector_store. Nu apelează OpenAI: folosește vectori sintetici.
+#
+#   python -m bench.bench_vector_store --books 2000 --queries 200
+import argparse, random, shutil, statistics, tempfile, time
+import chromadb
+from chromadb.config import Settings
+
+from core import vector_store
+
+def _rand_vec(rng: random.Random, dim: int):
+    return [rng.uniform(-1.0, 1.0) for _ in range(dim)]
+
+def build_store(path: str, n_books: int, dim: int, rng: random.Random):
+    client = chromadb.PersistentClient(path=path, settings=Settings(anonymized_telemetry=False))
+    coll = client.get_or_create_collection(vector_store.COLLECTION_NAME, metadata={"hnsw:space": "cosine"})
+    batch = 500
+    for start in range(0, n_books, batch):
+        ids = [f"book-{i}" for i in range(start, min(start + batch, n_books))]
+        coll.add(
+            ids=ids,
+            embeddings=[_rand_vec(rng, dim) for _ in ids],
+            metadatas=[{"title": i} for i in ids],
+            documents=[f"Title: {i}" for i in ids],
+        )
+    client.close()
+
+def _timed(fn, queries):
+    lat = []
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(q)
+        lat.append((time.perf_counter() - t0) * 1000.0)
+    return lat
+
+def _report(name: str, lat):
+    lat = sorted(lat)
+    p95 = lat[int(0.95 * (len(lat) - 1))]
+    print(f"{name:<22} mean={statistics.mean(lat):8.2f} ms  p50={statistics.median(lat):8.2f} ms  p95={p95:8.2f} ms")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--books", type=int, default=2000)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--dim", type=int, default=1536)
+    ap.add_argument("--k", type=int, default=3)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    tmp = tempfile.mkdtemp(prefix="rina_bench_chroma_")
+    try:
+        build_store(tmp, args.books, args.dim, rng)
+        queries = [_rand_vec(rng, args.dim) for _ in range(args.queries)]
+
+        def per_query_client(qvec):
+            client = chromadb.PersistentClient(path=tmp, settings=Settings(anonymized_telemetry=False))
+            coll = client.get_or_create_collection(vector_store.COLLECTION_NAME, metadata={"hnsw:space": "cosine"})
+            vector_store._query(coll, qvec, args.k)
+
+        vector_store.CHROMA_DIR = tmp
+        vector_store.close_store()
+
+        def managed(qvec):
+            vector_store._query(vector_store.get_collection(), qvec, args.k)
+
+        print(f"[BENCH] {args.books} books, dim={args.dim}, {args.queries} queries, k={args.k}")
+        _report("client per query", _timed(per_query_client, queries))
+        vector_store.warm_store()
+        _report("managed handle", _timed(managed, queries))
+    finally:
+        vector_store.close_store()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# bench/bench_workers.py
+# serve.py cu 1, 2, 4... workeri pe backend și pe frontend, pe un store temporar și bench.fake_openai:
+# throughput-ul și latența /chat (direct pe backend) și ale paginii de login (GET / pe frontend) la
+# concurență fixă, plus RSS/PSS per worker citite din /proc, cu starea partajată preîncărcată în master și fără.
+#
+#   python -m bench.bench_workers --workers 1 2 4 --requests 400 --concurrency 16
+import argparse, asyncio, os, subprocess, sys, threading, time
+
+from bench import suite
+from bench.fake_openai import FakeConfig, start_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def serve_child(argv):
+    """Procesul lansat: serve.py pe store-ul și baza temporare ale benchmark-ului."""
+    import serve
+    from core import embeddings, vector_store
+    from backend import api
+    embeddings.OPENAI_API_KEY = api.OPENAI_API_KEY = "sk-fake"
+    vector_store.CHROMA_DIR = os.path.join(suite._TMP, "chroma")
+    serve.main(argv)
+
+def _children(pid: int):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+def _launch(workers: int, preload: bool):
+    bport, fport = suite._free_port(), suite._free_port()
+    argv = ["--backend-workers", str(workers), "--frontend-workers", str(workers), "--backend-port", str(bport),
+            "--frontend-port", str(fport), "--report-interval", "0"] + ([] if preload else ["--no-preload"])
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "bench.bench_workers", "--serve"] + argv, cwd=ROOT,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    log = []
+    for line in proc.stdout:
+        log.append(line)
+        if line.startswith("[INFO] Ready in"):
+            break
+    else:
+        raise RuntimeError("serve.py exited during startup:\n" + "".join(log[-20:]))
+    ready = time.perf_counter() - t0
+    # restul ieșirii (inclusiv raportul final) e citit în fundal, ca pipe-ul să nu se umple
+    drain = threading.Thread(target=lambda: log.extend(proc.stdout), daemon=True)
+    drain.start()
+    return proc, f"http://127.0.0.1:{bport}", f"http://127.0.0.1:{fport}", ready, log, drain
+
+async def _load(backend: str, frontend: str, requests: int, users: int):
+    api = await suite._drive(suite._client(backend, users), suite._api_chat, users, requests)
+
+    async def login_page(client, _u, _i):
+        (await client.get("/")).raise_for_status()
+
+    web = await suite._drive(suite._client(frontend, users), login_page, users, requests)
+    return api, web
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--requests", type=int, default=400)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--chat-latency", type=float, default=0.2)
+    ap.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args, rest = ap.parse_known_args()
+    if args.serve:
+        return serve_child(rest)
+
+    fake, base_url = start_server(FakeConfig(latency=0.02, per_item_latency=0.0, dim=256,
+                                             chat_latency=args.chat_latency))
+    os.environ.update(OPENAI_BASE_URL=base_url, ANSWER_CACHE="0", LOG_ANSWER_PATH="0")
+    from core import embeddings, vector_store
+    embeddings.OPENAI_API_KEY = embeddings.OPENAI_API_KEY or "sk-fake"
+    vector_store.CHROMA_DIR = os.path.join(suite._TMP, "chroma")
+    suite.micro_ingest()
+    vector_store.close_store()
+    from serve import memory_mib
+
+    print(f"[BENCH] {args.requests} requests per endpoint, {args.concurrency} concurrent clients, "
+          f"{os.cpu_count()} CPU, fake chat {args.chat_latency * 1000:.0f} ms")
+    print(f"{'workers':<8} {'preload':<8} {'ready s':>7} {'/chat r/s':>9} {'p95 ms':>7} {'login r/s':>10} "
+          f"{'p95 ms':>7} {'rss/worker':>10} {'pss/worker':>10} {'pss total (+master)':>19}")
+    try:
+        for n in args.workers:
+            for preload in (True, False):
+                proc, backend, frontend, ready, log, drain = _launch(n, preload)
+                try:
+                    api, web = asyncio.run(_load(backend, frontend, args.requests, args.concurrency))
+                    mem = [memory_mib(pid) for pid in _children(proc.pid)]
+                    master_pss = memory_mib(proc.pid)[1]   # cu preîncărcare, starea comună e numărată și aici
+                finally:
+                    suite.stop(proc)
+                    drain.join(timeout=10)
+                rss = sum(m[0] for m in mem) / max(len(mem), 1)
+                pss = sum(m[1] for m in mem)
+                total = pss + master_pss
+                print(f"{n:<8} {'yes' if preload else 'no':<8} {ready:>7.2f} {api['rps']:>9.1f} "
+                      f"{api['p95_ms']:>7.0f} {web['rps']:>10.1f} {web['p95_ms']:>7.0f} "
+                      f"{rss:>7.1f} MiB {pss / max(len(mem), 1):>6.1f} MiB {total:>15.0f} MiB")
+                if api["errors"] or web["errors"]:
+                    print(f"         errors: /chat {api['errors']}, login {web['errors']}")
+        print("\n[BENCH] launcher's own report for the last run:")
+        print("".join(l for l in log if "workers:" in l or "pss" in l), end="")
+    finally:
+        fake.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# bench/bench_write_behind.py
+# Rafale de "Good" (save + clear_pending) de la mulți workeri concurenți:
+# scrieri sincrone (un commit per rând) vs. coada write-behind cu group commit.
+# Verifică la final că toate rândurile au ajuns în baza de date, în ordine, și că fiecare worker
+# își vede imediat propriile mesaje (read-your-writes).
+#
+#   python -m bench.bench_write_behind --workers 4 16 64
+#   DB_SYNCHRONOUS=FULL python -m bench.bench_write_behind     # commit-uri cu fsync
+import argparse, os, statistics, tempfile, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.database import ConversationDB, DB_SYNCHRONOUS
+
+def _run(write_behind: bool, workers: int, per_worker: int, read_every: int):
+    db = ConversationDB(os.path.join(tempfile.mkdtemp(prefix="rina_bench_wb_"), "bench.sqlite3"),
+                        write_behind=write_behind)
+    db.create_user("bench", "bench")
+    uid = db.validate_user("bench", "bench")
+    sids = [db.create_session(uid) for _ in range(workers)]
+    latencies, stale = [], [0]
+    lock = threading.Lock()
+
+    def worker(w):
+        sid, lat = sids[w], []
+        for i in range(per_worker):
+            t0 = time.perf_counter()
+            db.save(uid, f"q{i}", f"a{i}", sid)
+            db.clear_pending(uid)
+            if read_every and i % read_every == 0:
+                rows = db.get_messages_page(sid, limit=1)
+                if not rows or rows[-1][1] != f"q{i}":
+                    with lock:
+                        stale[0] += 1
+            lat.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(lat)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        list(ex.map(worker, range(workers)))
+    db.flush()
+    elapsed = time.perf_counter() - t0
+
+    ok = all([r[1] for r in db.get_messages_page(sid, limit=per_worker)] == [f"q{i}" for i in range(per_worker)]
+             for sid in sids)
+    batches = db.batched_writes / db.batches if db.batches else 1.0
+    db.close()
+    latencies.sort()
+    return {
+        "rate": workers * per_worker / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(0.95 * (len(latencies) - 1))],
+        "ok": ok and not stale[0],
+        "batch": batches,
+    }
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, nargs="+", default=[4, 16, 64])
+    ap.add_argument("--per-worker", type=int, default=300)
+    ap.add_argument("--read-every", type=int, default=10, help="o citire a propriei sesiuni la fiecare N salvări")
+    args = ap.parse_args()
+
+    print(f"[BENCH] synchronous={DB_SYNCHRONOUS}, {args.per_worker} saves per worker")
+    print(f"{'workers':>8} {'mode':<13} {'saves/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'writes/commit':>14} {'consistent':>11}")
+    for w in args.workers:
+        for mode, wb in (("sync", False), ("write-behind", True)):
+            r = _run(wb, w, args.per_worker, args.read_every)
+            print(f"{w:>8} {mode:<13} {r['rate']:>9.0f} {r['p50'] * 1e3:>8.2f} {r['p95'] * 1e3:>8.2f} "
+                  f"{r['batch']:>14.1f} {str(r['ok']):>11}")
+
+if __name__ == "__main__":
+    main()
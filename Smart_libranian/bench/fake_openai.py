@@ -0,0 +1,159 @@
+# bench/fake_openai.py
+# Server local care imită API-ul OpenAI (doar ce folosește proiectul), pentru benchmark-uri fără rețea.
+#
+#   python -m bench.fake_openai --port 8900 --latency 0.05
+#   export OPENAI_BASE_URL=http://127.0.0.1:8900/v1
+import argparse
+import hashlib
+import json
+import random
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class FakeConfig:
+    def __init__(self, latency: float = 0.05, per_item_latency: float = 0.0005,
+                 dim: int = 1536, rate_limit_prob: float = 0.0, chat_latency: float = 0.3,
+                 token_interval: float = 0.0):
+        self.latency = latency                    # secunde / request
+        self.per_item_latency = per_item_latency  # secunde / text embeduit
+        self.chat_latency = chat_latency          # secunde până la primul token
+        self.token_interval = token_interval      # secunde între două token-uri generate
+        self.dim = dim
+        self.rate_limit_prob = rate_limit_prob    # probabilitatea unui 429
+        self.requests = 0
+        self.rate_limited = 0
+        self.lock = threading.Lock()
+
+def fake_vector(text: str, dim: int):
+    # determinist: același text -> același vector
+    seed = hashlib.sha256(text.encode("utf-8")).digest()
+    rng = random.Random(struct.unpack("<Q", seed[:8])[0])
+    return [rng.uniform(-1.0, 1.0) for _ in range(dim)]
+
+def fake_reply(messages) -> str:
+    prompt = (messages or [{}])[-1].get("content", "")
+    if "JSON" in prompt:
+        # detect_lang_and_to_ro: întoarcem textul neschimbat, marcat ca română
+        text = prompt.split("```")[1] if prompt.count("```") >= 2 else prompt
+        return json.dumps({"lang": "ro", "ro": text}, ensure_ascii=False)
+    return ("Îți recomand „1984” de George Orwell: un roman despre supraveghere și libertate, "
+            "în care Winston pune la îndoială adevărul oficial al Partidului.")
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # backlog-ul implicit (5) refuză conexiuni la concurență mare
+
+def _make_handler(cfg: FakeConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status: int, body: dict, headers: dict = None):
+            raw = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def _stream_chat(self, payload: dict, tokens):
+            # SSE în formatul OpenAI; corpul se termină la închiderea conexiunii
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            base = {"id": "chatcmpl-fake", "object": "chat.completion.chunk",
+                    "created": int(time.time()), "model": payload.get("model")}
+            for i, tok in enumerate(tokens):
+                if i:
+                    time.sleep(cfg.token_interval)
+                chunk = dict(base, choices=[{"index": 0, "delta": {"content": tok}, "finish_reason": None}])
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            done = dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+            self.wfile.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            self.wfile.flush()
+            self.close_connection = True
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            with cfg.lock:
+                cfg.requests += 1
+                limited = random.random() < cfg.rate_limit_prob
+                if limited:
+                    cfg.rate_limited += 1
+            if limited:
+                self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                                {"retry-after": "0.05"})
+                return
+
+            if self.path.endswith("/embeddings"):
+                inputs = payload.get("input") or []
+                if isinstance(inputs, str):
+                    inputs = [inputs]
+                time.sleep(cfg.latency + cfg.per_item_latency * len(inputs))
+                self._send_json(200, {
+                    "object": "list",
+                    "model": payload.get("model"),
+                    "data": [{"object": "embedding", "index": i, "embedding": fake_vector(t, cfg.dim)}
+                             for i, t in enumerate(inputs)],
+                    "usage": {"prompt_tokens": 0, "total_tokens": 0},
+                })
+                return
+
+            if self.path.endswith("/chat/completions"):
+                content = fake_reply(payload.get("messages"))
+                tokens = [w + " " for w in content.split(" ")]
+                tokens[-1] = tokens[-1].rstrip()
+                time.sleep(cfg.chat_latency)
+                if payload.get("stream"):
+                    self._stream_chat(payload, tokens)
+                    return
+                time.sleep(cfg.token_interval * len(tokens))
+                self._send_json(200, {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": payload.get("model"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)},
+                })
+                return
+
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    return Handler
+
+def start_server(cfg: FakeConfig = None, host: str = "127.0.0.1", port: int = 0):
+    """Pornește serverul într-un thread daemon. Returnează (server, base_url)."""
+    cfg = cfg or FakeConfig()
+    server = _Server((host, port), _make_handler(cfg))
+    server.cfg = cfg
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8900)
+    ap.add_argument("--latency", type=float, default=0.05)
+    ap.add_argument("--dim", type=int, default=1536)
+    ap.add_argument("--rate-limit-prob", type=float, default=0.0)
+    ap.add_argument("--chat-latency", type=float, default=0.3)
+    ap.add_argument("--token-interval", type=float, default=0.0)
+    args = ap.parse_args()
+    cfg = FakeConfig(latency=args.latency, dim=args.dim, rate_limit_prob=args.rate_limit_prob,
+                     chat_latency=args.chat_latency, token_interval=args.token_interval)
+    server = _Server(("127.0.0.1", args.port), _make_handler(cfg))
+    print(f"[INFO] Fake OpenAI on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+# bench/suite.py
+# Suita de benchmark end-to-end: pornește bench.fake_openai (latență + streaming configurabile), apoi backend-ul
+# FastAPI (uvicorn) și frontend-ul Flask (werkzeug, threaded) în procese separate, pe date temporare, și rulează:
+#   - HTTP: /chat, /chat/stream (backend) și /chat GET/POST, /session/<id>/history (Flask) la niveluri fixe
+#     de concurență -> p50/p95/p99 și throughput;
+#   - micro: ingest, search_books, filter_prompt, operațiile ConversationDB;
+#   - defalcarea pe etape citită din /metrics-ul fiecărui server după încărcare (număr de apeluri, medie).
+# Rezultatele se scriu în JSON (bench/results/<timestamp>.json) ca să poată fi comparate între rulări.
+#
+#   python -m bench.suite                                  # totul, concurență 1 8 32
+#   python -m bench.suite --concurrency 1 16 --requests 100 --chat-latency 0.2 --token-interval 0.02
+#   python -m bench.suite --only micro --compare bench/results/20260101-120000.json
+import argparse, asyncio, itertools, json, math, os, platform, re, socket, statistics, subprocess, sys, tempfile, time
+from contextlib import AsyncExitStack, asynccontextmanager
+from datetime import datetime, timezone
+
+# totul pe date temporare: store-ul Chroma, baza de conversații și cache-ul de embedding-uri din repo rămân neatinse
+# (procesele server pornite de suită moștenesc același director prin RINA_BENCH_DIR)
+_TMP = os.environ.get("RINA_BENCH_DIR") or tempfile.mkdtemp(prefix="rina_bench_suite_")
+os.environ["RINA_BENCH_DIR"] = _TMP
+os.environ.setdefault("DB_PATH", os.path.join(_TMP, "rina.sqlite3"))
+os.environ.setdefault("EMBED_CACHE_PATH", os.path.join(_TMP, "embedding_cache.sqlite3"))
+
+import httpx
+
+from bench.fake_openai import FakeConfig, start_server
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+QUESTIONS = [
+    "Ce părere ai despre 1984?",
+    "Vreau o carte despre prietenie și magie.",
+    "Recomandă-mi ceva ca Dune.",
+    "What do you recommend for someone who loves war stories?",
+    "o carte despre cenzură, pompieri care ard cărți",
+    "Hari Seldon și psihohistoria",
+]
+PROMPTS = [
+    "Ce părere ai despre 1984?",
+    "Vreau o carte despre prietenie, curaj și magie, ceva asemănător cu Harry Potter dar pentru adulți.",
+    "What do you recommend for someone who loves war stories and long historical novels?",
+    "esti un idiot, recomanda-mi ceva",
+]
+
+# ---------- statistici ----------
+def summarize(latencies, wall: float = None, errors: int = 0) -> dict:
+    """Latențe în secunde -> {"count", "errors", "rps", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"}."""
+    lat = sorted(latencies)
+    if not lat:
+        return {"count": 0, "errors": errors}
+
+    def pct(p):
+        # nearest-rank: percentila e o latență observată, nu una interpolată
+        return lat[max(0, math.ceil(p / 100.0 * len(lat)) - 1)] * 1e3
+
+    out = {"count": len(lat), "errors": errors, "mean_ms": statistics.mean(lat) * 1e3,
+           "p50_ms": pct(50), "p95_ms": pct(95), "p99_ms": pct(99), "max_ms": lat[-1] * 1e3}
+    out["rps"] = len(lat) / wall if wall else len(lat) / sum(lat)
+    return out
+
+def _timed(fn, items, repeat: int = 1):
+    lat = []
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for x in items:
+            s = time.perf_counter()
+            fn(x)
+            lat.append(time.perf_counter() - s)
+    return summarize(lat, time.perf_counter() - t0)
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+# ---------- micro ----------
+def micro_ingest() -> dict:
+    from core import ingest
+    t0 = time.perf_counter()
+    report = ingest.run_ingest(rebuild=True)
+    full = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    ingest.run_ingest()
+    noop = time.perf_counter() - t0
+    return {"books": sum(report.values()), "full_s": full, "incremental_noop_s": noop}
+
+def micro_search(repeat: int) -> dict:
+    from core import vector_store
+    vector_store.warm_store()
+    return {mode: _timed(lambda q: vector_store.search_books(q, k=3, mode=mode), QUESTIONS, repeat)
+            for mode in ("vector", "hybrid", "auto")}
+
+def micro_filter(repeat: int) -> dict:
+    from core.language_filter import filter_prompt
+    out = {}
+    for mode in ("block", "censor"):
+        out[mode] = _timed(lambda p: filter_prompt(p, mode=mode), PROMPTS, repeat * 50)
+    return out
+
+def micro_db(repeat: int) -> dict:
+    from core.database import ConversationDB
+    db = ConversationDB(os.path.join(_TMP, "micro.sqlite3"))
+    db.create_user("micro", "micro")
+    uid = db.validate_user("micro", "micro")
+    sid = db.create_session(uid)
+    n = range(repeat * 20)
+    out = {
+        "create_session": _timed(lambda _: db.create_session(uid), n),
+        "save": _timed(lambda i: db.save(uid, f"q{i}", f"a{i}", sid), n),
+        "get_messages_page": _timed(lambda _: db.get_messages_page(sid), n),
+        "get_sessions": _timed(lambda _: db.get_sessions(uid), n),
+        "set_pending": _timed(lambda i: db.set_pending(uid, sid, f"q{i}", f"a{i}"), n),
+        "get_pending": _timed(lambda _: db.get_pending(uid), n),
+        "validate_user": _timed(lambda _: db.validate_user("micro", "micro"), n),
+    }
+    db.close()
+    return out
+
+# ---------- servere (procese separate, ca în producție; clientul de încărcare nu le fură GIL-ul) ----------
+def serve(kind: str, port: int, backend_base: str):
+    """Punctul de intrare al proceselor server (python -m bench.suite --serve backend|frontend ...)."""
+    from core import embeddings, vector_store
+    embeddings.OPENAI_API_KEY = embeddings.OPENAI_API_KEY or "sk-fake"
+    vector_store.CHROMA_DIR = os.path.join(_TMP, "chroma")
+    if kind == "backend":
+        import uvicorn
+        from backend import api
+        api.OPENAI_API_KEY = api.OPENAI_API_KEY or "sk-fake"
+        uvicorn.run(api.app, host="127.0.0.1", port=port, log_level="warning")
+        return
+    import logging
+    from werkzeug.serving import make_server
+    from frontend import app as frontend
+    from frontend.backend_client import BackendClient
+    frontend.FASTAPI_URL = f"{backend_base}/chat"
+    frontend.FASTAPI_STREAM_URL = f"{backend_base}/chat/stream"
+    frontend.backend = BackendClient(f"{backend_base}/ping")
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)  # fără o linie de log per cerere
+    make_server("127.0.0.1", port, frontend.app, threaded=True).serve_forever()
+
+def spawn(kind: str, ready_path: str, backend_base: str = "", timeout: float = 60.0):
+    """Pornește un server într-un proces nou și așteaptă să răspundă. Returnează (proces, URL de bază)."""
+    port = _free_port()
+    cmd = [sys.executable, "-m", "bench.suite", "--serve", kind, "--port", str(port), "--backend-base", backend_base]
+    proc = subprocess.Popen(cmd, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{kind} exited with code {proc.returncode}")
+        try:
+            if httpx.get(base + ready_path, timeout=1).status_code == 200:
+                return proc, base
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError(f"{kind} did not start within {timeout:.0f} s")
+
+def stop(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+# ---------- HTTP ----------
+async def _drive(make_client, request, users: int, total: int) -> dict:
+    """
+    `users` utilizatori concurenți, până la `total` cereri în total. Clienții (și login-urile) se creează
+    înainte de cronometrare: un httpx.AsyncClient nou costă zeci de ms (context SSL) și ar apărea ca latență.
+    """
+    lat, errors, counter = [], [0], iter(range(total))
+
+    async def user(u, client):
+        for i in counter:
+            t0 = time.perf_counter()
+            try:
+                await request(client, u, i)
+                lat.append(time.perf_counter() - t0)
+            except Exception:
+                errors[0] += 1
+
+    async with AsyncExitStack() as stack:
+        clients = [await stack.enter_async_context(make_client(u)) for u in range(users)]
+        t0 = time.perf_counter()
+        await asyncio.gather(*(user(u, c) for u, c in enumerate(clients)))
+        wall = time.perf_counter() - t0
+    return summarize(lat, wall, errors[0])
+
+def _client(base: str, users: int):
+    """Un singur client (pool de `users` conexiuni) împărțit de toți utilizatorii: API-ul nu are cookie-uri."""
+    shared = {}
+
+    @asynccontextmanager
+    async def make(u):
+        if u == 0:
+            limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+            shared["client"] = httpx.AsyncClient(base_url=base, timeout=120, limits=limits)
+        try:
+            yield shared["client"]
+        finally:
+            if u == 0:
+                await shared["client"].aclose()
+
+    return make
+
+_SEQ = itertools.count()
+
+def _unique(i: int) -> str:
+    # întrebări distincte în toată rularea: fiecare cerere trece de cache-ul de răspunsuri și ajunge la LLM
+    return f"{QUESTIONS[i % len(QUESTIONS)]} (#{next(_SEQ)})"
+
+async def _api_chat(client, _u, i):
+    (await client.post("/chat", json={"user_id": "bench", "question": _unique(i)})).raise_for_status()
+
+async def _api_chat_cached(client, _u, i):
+    (await client.post("/chat", json={"user_id": "bench", "question": QUESTIONS[0]})).raise_for_status()
+
+async def _api_stream(client, _u, i):
+    async with client.stream("POST", "/chat/stream", json={"user_id": "bench", "question": _unique(i)}) as r:
+        r.raise_for_status()
+        async for _ in r.aiter_lines():
+            pass
+
+def flask_accounts(users: int):
+    """Un cont și o sesiune cu 50 de mesaje pentru fiecare utilizator virtual (în baza folosită de frontend)."""
+    from core.database import ConversationDB
+    db = ConversationDB()
+    out = []
+    for u in range(users):
+        name = f"bench{u}"
+        db.create_user(name, name)
+        uid = db.validate_user(name, name)
+        sid = db.create_session(uid)
+        for j in range(50):
+            db.save(uid, f"Întrebarea {j}", f"Răspunsul {j} " * 20, sid)
+        out.append((name, sid))
+    db.close()
+    return out
+
+def run_http(levels, total: int, backend_base: str, flask_base: str, accounts) -> dict:
+    results = {}
+
+    @asynccontextmanager
+    async def flask_client(u):
+        # fiecare utilizator are propriul cookie de sesiune Flask
+        name, _ = accounts[u]
+        async with httpx.AsyncClient(base_url=flask_base, timeout=120) as client:
+            r = await client.post("/", data={"username": name, "password": name})
+            if r.status_code != 302:
+                raise RuntimeError(f"login failed for {name}: {r.status_code}")
+            yield client
+
+    async def flask_get_chat(client, _u, _i):
+        r = await client.get("/chat")
+        if r.status_code != 200:
+            raise RuntimeError(r.status_code)
+
+    async def flask_post_chat(client, _u, i):
+        r = await client.post("/chat", data={"message": _unique(i)})
+        if r.status_code != 302:
+            raise RuntimeError(r.status_code)
+
+    async def flask_history(client, u, _i):
+        r = await client.get(f"/session/{accounts[u][1]}/history", params={"limit": 20})
+        r.raise_for_status()
+
+    scenarios = {
+        "api_chat": (_client, _api_chat),
+        "api_chat_cached": (_client, _api_chat_cached),
+        "api_chat_stream": (_client, _api_stream),
+        "flask_get_chat": (flask_client, flask_get_chat),
+        "flask_post_chat": (flask_client, flask_post_chat),
+        "flask_history": (flask_client, flask_history),
+    }
+    for name, (make_client, request) in scenarios.items():
+        results[name] = {}
+        for users in levels:
+            factory = make_client(backend_base, users) if make_client is _client else make_client
+            r = asyncio.run(_drive(factory, request, users, max(total, users)))
+            results[name][str(users)] = r
+            print(f"{name:<18} {users:>5} {r.get('rps', 0):>9.1f} {r.get('p50_ms', 0):>9.1f} "
+                  f"{r.get('p95_ms', 0):>9.1f} {r.get('p99_ms', 0):>9.1f} {r['errors']:>7}")
+    return results
+
+# ---------- rezultate ----------
+_STAGE_RE = re.compile(r'^rina_stage_seconds_(sum|count)\{stage="([^"]+)"\} (\S+)$', re.MULTILINE)
+
+def stage_breakdown(base: str) -> dict:
+    """{etapă: {"count", "mean_ms"}} din histogramele rina_stage_seconds de pe /metrics."""
+    sums, counts = {}, {}
+    for kind, name, value in _STAGE_RE.findall(httpx.get(f"{base}/metrics", timeout=5).text):
+        (sums if kind == "sum" else counts)[name] = float(value)
+    return {name: {"count": int(n), "mean_ms": round(sums.get(name, 0.0) / n * 1000.0, 3)}
+            for name, n in sorted(counts.items()) if n}
+
+def _meta(args) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(__file__), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {"timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"), "commit": commit,
+            "python": sys.version.split()[0], "platform": platform.platform(), "cpus": os.cpu_count(),
+            "config": vars(args)}
+
+def _flatten(d: dict, prefix: str = "") -> dict:
+    out = {}
+    for k, v in d.items():
+        key = f"{prefix}/{k}" if prefix else k
+        if isinstance(v, dict):
+            out.update(_flatten(v, key))
+        elif isinstance(v, (int, float)):
+            out[key] = v
+    return out
+
+def compare(old: dict, new: dict):
+    """Tabel cu metricile comune (p50/p95/p99, rps, durate) și variația procentuală."""
+    a, b = _flatten({k: old.get(k, {}) for k in ("http", "micro")}), _flatten({k: new.get(k, {}) for k in ("http", "micro")})
+    metrics = ("p50_ms", "p95_ms", "p99_ms", "rps")
+    keys = [k for k in b if k in a and (k.rsplit("/", 1)[-1] in metrics or k.endswith("_s"))]
+    print(f"\n[COMPARE] {old['meta'].get('commit')} ({old['meta']['timestamp']}) -> "
+          f"{new['meta'].get('commit')} ({new['meta']['timestamp']})")
+    for k in keys:
+        delta = (b[k] - a[k]) / a[k] * 100.0 if a[k] else float("nan")
+        print(f"{k:<52} {a[k]:>10.2f} {b[k]:>10.2f} {delta:>+8.1f}%")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    ap.add_argument("--requests", type=int, default=64, help="cereri per scenariu și nivel de concurență")
+    ap.add_argument("--repeat", type=int, default=5, help="repetări pentru micro-benchmark-uri")
+    ap.add_argument("--chat-latency", type=float, default=0.2, help="secunde până la primul token (fake LLM)")
+    ap.add_argument("--token-interval", type=float, default=0.01, help="secunde între token-uri (fake LLM)")
+    ap.add_argument("--embed-latency", type=float, default=0.02, help="secunde / request de embedding (fake)")
+    ap.add_argument("--only", choices=["http", "micro"], default=None)
+    ap.add_argument("--output", default=None, help="fișierul JSON (implicit bench/results/<timestamp>.json)")
+    ap.add_argument("--compare", default=None, help="un JSON anterior cu care se compară rezultatele")
+    ap.add_argument("--serve", choices=["backend", "frontend"], help=argparse.SUPPRESS)
+    ap.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    ap.add_argument("--backend-base", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.serve:
+        serve(args.serve, args.port, args.backend_base)
+        return
+
+    fake, base_url = start_server(FakeConfig(latency=args.embed_latency, per_item_latency=0.0, dim=256,
+                                             chat_latency=args.chat_latency, token_interval=args.token_interval))
+    os.environ["OPENAI_BASE_URL"] = base_url
+    from core import embeddings, vector_store
+    embeddings.OPENAI_API_KEY = embeddings.OPENAI_API_KEY or "sk-fake"
+    embeddings._client = None
+    vector_store.close_store()
+    vector_store.CHROMA_DIR = os.path.join(_TMP, "chroma")
+
+    result = {"meta": _meta(args)}
+    print(f"[BENCH] fake OpenAI: embed {args.embed_latency}s, chat {args.chat_latency}s + "
+          f"{args.token_interval}s/token; data in {_TMP}")
+    # ingest rulează oricum: backend-ul are nevoie de store
+    ingest = micro_ingest()
+    if args.only != "http":
+        result["micro"] = {"ingest": ingest, "search_books": micro_search(args.repeat),
+                           "filter_prompt": micro_filter(args.repeat), "conversation_db": micro_db(args.repeat)}
+        for group, rows in result["micro"].items():
+            for name, r in rows.items():
+                if isinstance(r, dict):
+                    print(f"[MICRO] {group}.{name:<20} p50={r['p50_ms']:8.3f} ms  p99={r['p99_ms']:8.3f} ms  "
+                          f"{r['rps']:10.0f} ops/s")
+                else:
+                    print(f"[MICRO] {group}.{name:<20} {r}")
+
+    if args.only != "micro":
+        vector_store.close_store()
+        accounts = flask_accounts(max(args.concurrency))
+        backend, backend_base = spawn("backend", "/ping")
+        try:
+            frontend, flask_base = spawn("frontend", "/", backend_base)
+            try:
+                calls0 = fake.cfg.requests
+                print(f"{'scenario':<18} {'users':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+                      f"{'errors':>7}")
+                result["http"] = run_http(args.concurrency, args.requests, backend_base, flask_base, accounts)
+                result["llm_calls"] = fake.cfg.requests - calls0
+                result["backend_stats"] = httpx.get(f"{backend_base}/stats", timeout=5).json()
+                result["stages"] = {"backend": stage_breakdown(backend_base), "frontend": stage_breakdown(flask_base)}
+                for app_name, stages in result["stages"].items():
+                    for name, r in stages.items():
+                        print(f"[STAGE] {app_name}.{name:<24} n={r['count']:<6} mean={r['mean_ms']:9.3f} ms")
+            finally:
+                stop(frontend)
+        finally:
+            stop(backend)
+    fake.shutdown()
+
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"[BENCH] results -> {output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), result)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+# core/answer_cache.py
+# Cache de răspunsuri în fața pipeline-ului /chat:
+#   - nivel exact: (limbă, întrebare normalizată) -> răspuns
+#   - nivel semantic: întrebare nouă cu embedding la distanță cosinus sub prag de una din cache
+# Intrările au TTL și evacuare LRU; tot cache-ul se golește când catalogul sau store-ul Chroma se schimbă.
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from core.catalog import get_catalog, normalize_title
+from core import vector_store
+
+ANSWER_CACHE_MAX_ITEMS = int(os.getenv("ANSWER_CACHE_MAX_ITEMS", "2048"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))              # secunde
+# similaritate cosinus minimă între întrebări; gol = după provider (backend.api.DEFAULT_CACHE_THRESHOLDS)
+ANSWER_CACHE_THRESHOLD = os.getenv("ANSWER_CACHE_THRESHOLD")
+_MIN_ROWS = 64   # matricea vectorilor crește prin dublare până la max_items
+
+def normalize_question(text: str) -> str:
+    t = normalize_title(text)
+    t = re.sub(r"[^\w\s]", " ", t)
+    return re.sub(r"\s+", " ", t).strip()
+
+class _Entry:
+    __slots__ = ("key", "answer", "expires", "vector", "slot")
+
+    def __init__(self, key: Tuple[str, str], answer: Dict, expires: float, vector: Optional[np.ndarray]):
+        self.key = key
+        self.answer = answer
+        self.expires = expires
+        self.vector = vector
+        self.slot = None   # rândul din matricea vectorilor, dacă are vector
+
+class AnswerCache:
+    def __init__(self, max_items: int = ANSWER_CACHE_MAX_ITEMS, ttl: float = ANSWER_CACHE_TTL,
+                 threshold: Union[float, Callable[[], float]] = 0.92,
+                 embed: Optional[Callable[[str], List[float]]] = None):
+        """threshold: număr sau funcție (pragul depinde de providerul de embedding, citit la fiecare căutare)."""
+        self.max_items = max_items
+        self.ttl = ttl
+        self.threshold = threshold
+        self.embed = embed
+        self._items: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        # nivelul semantic: vectorii intrărilor pe rânduri, actualizați la put/evacuare (nu re-stivuiți la fiecare get)
+        self._mat: Optional[np.ndarray] = None
+        self._expires = np.zeros(0)
+        self._langs = np.zeros(0, dtype=np.int32)      # -1 = rând liber
+        self._lang_ids: Dict[str, int] = {}
+        self._entries: List[Optional[_Entry]] = []
+        self._free: List[int] = []
+        self._version = None
+        self.hits_exact = 0
+        self.hits_semantic = 0
+        self.misses = 0
+
+    def _data_version(self):
+        return get_catalog().digest, vector_store.store_version()
+
+    def _check_version(self):
+        # apelat cu lock-ul luat
+        v = self._data_version()
+        if v != self._version:
+            self._reset()
+            self._version = v
+
+    def _threshold(self) -> float:
+        return self.threshold() if callable(self.threshold) else self.threshold
+
+    # --- matricea vectorilor (cu lock-ul luat) ---
+    def _reset(self):
+        self._items.clear()
+        self._mat = None
+        self._expires = np.zeros(0)
+        self._langs = np.zeros(0, dtype=np.int32)
+        self._entries = []
+        self._free = []
+
+    def _grow(self, dim: int):
+        rows = len(self._entries)
+        new = min(max(_MIN_ROWS, rows * 2), max(self.max_items + 1, _MIN_ROWS))
+        mat = np.zeros((new, dim), dtype=np.float32)
+        if self._mat is not None:
+            mat[:rows] = self._mat
+        self._mat = mat
+        self._expires = np.concatenate([self._expires, np.zeros(new - rows)])
+        self._langs = np.concatenate([self._langs, np.full(new - rows, -1, dtype=np.int32)])
+        self._entries.extend([None] * (new - rows))
+        self._free.extend(range(new - 1, rows - 1, -1))   # rândurile mici întâi: partea folosită rămâne compactă
+
+    def _attach(self, lang: str, e: _Entry):
+        if e.vector is None:
+            return
+        if self._mat is not None and self._mat.shape[1] != e.vector.shape[0]:
+            # alt model de embedding: vectorii vechi nu mai sunt comparabili
+            for old in self._entries:
+                if old is not None:
+                    old.slot = None
+            self._mat, self._entries, self._free = None, [], []
+            self._expires, self._langs = np.zeros(0), np.zeros(0, dtype=np.int32)
+        if not self._free:
+            self._grow(e.vector.shape[0])
+        slot = self._free.pop()
+        self._mat[slot] = e.vector
+        self._expires[slot] = e.expires
+        self._langs[slot] = self._lang_ids.setdefault(lang, len(self._lang_ids))
+        self._entries[slot] = e
+        e.slot = slot
+
+    def _detach(self, e: _Entry):
+        if e.slot is None:
+            return
+        self._langs[e.slot] = -1
+        self._entries[e.slot] = None
+        self._free.append(e.slot)
+        e.slot = None
+
+    def _nearest(self, lang: str, vec: np.ndarray, now: float) -> Tuple[Optional[_Entry], float]:
+        lid = self._lang_ids.get(lang)
+        if lid is None or self._mat is None or self._mat.shape[1] != vec.shape[0]:
+            return None, -1.0
+        hi = len(self._entries)
+        while hi and self._entries[hi - 1] is None:   # după evacuări, rândurile de la coadă pot fi libere
+            hi -= 1
+        if not hi:
+            return None, -1.0
+        sims = self._mat[:hi] @ vec
+        sims[(self._langs[:hi] != lid) | (self._expires[:hi] <= now)] = -np.inf
+        best = int(np.argmax(sims))
+        return self._entries[best], float(sims[best])
+
+    def _purge_expired(self, now: float):
+        dead = [k for k, e in self._items.items() if e.expires <= now]
+        for k in dead:
+            self._detach(self._items.pop(k))
+
+    @staticmethod
+    def _unit(vector) -> Optional[np.ndarray]:
+        v = np.asarray(vector, dtype=np.float32)
+        n = float(np.linalg.norm(v))
+        return v / n if n else None
+
+    def _embed(self, question: str) -> Optional[np.ndarray]:
+        if self.embed is None:
+            return None
+        try:
+            return self._unit(self.embed(question))
+        except Exception as e:
+            print("[WARN] Answer cache embedding failed:", e)
+            return None
+
+    def get(self, lang: str, question: str, vector=None) -> Tuple[Optional[Dict], str, Optional[np.ndarray]]:
+        """
+        Returnează (răspuns, tip, vector): tip este "exact", "semantic" sau "miss".
+        Vectorul calculat la miss se poate refolosi la put(), ca să nu embeduim de două ori;
+        `vector` (embedding-ul întrebării, deja calculat în lot) evită apelul de embedding.
+        """
+        key = (lang or "", normalize_question(question))
+        now = time.time()
+        with self._lock:
+            self._check_version()
+            e = self._items.get(key)
+            if e is not None and e.expires > now:
+                self._items.move_to_end(key)
+                self.hits_exact += 1
+                return e.answer, "exact", e.vector
+            has_candidates = key[0] in self._lang_ids and self._mat is not None
+
+        vec = None
+        threshold = self._threshold()
+        if self.embed is not None and threshold < 1.0:
+            vec = self._unit(vector) if vector is not None else self._embed(question)
+        if vec is not None and has_candidates:
+            with self._lock:
+                e, sim = self._nearest(key[0], vec, now)
+                if e is not None and sim >= threshold:
+                    self._items.move_to_end(e.key)
+                    self.hits_semantic += 1
+                    return e.answer, "semantic", vec
+        with self._lock:
+            self.misses += 1
+        return None, "miss", vec
+
+    def put(self, lang: str, question: str, answer: Dict, vector: Optional[np.ndarray] = None):
+        key = (lang or "", normalize_question(question))
+        now = time.time()
+        with self._lock:
+            self._check_version()
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._detach(old)
+            if vector is not None:
+                vector = np.asarray(vector, dtype=np.float32)
+            e = self._items[key] = _Entry(key, answer, now + self.ttl, vector)
+            self._attach(key[0], e)
+            if len(self._items) > self.max_items:
+                self._purge_expired(now)
+            while len(self._items) > self.max_items:
+                self._detach(self._items.popitem(last=False)[1])
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits_exact": self.hits_exact,
+                "hits_semantic": self.hits_semantic,
+                "misses": self.misses,
+                "items": len(self._items),
+            }
@@ -0,0 +1,119 @@
+# core/catalog.py
+# Index în memorie al catalogului (book_summaries.json), partajat de backend, tools, vector_store și ingest.
+# Se reîncarcă doar când fișierul se schimbă (mtime/mărime, apoi hash al conținutului).
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import unicodedata
+from typing import Dict, List, Optional
+
+BASE_DIR = os.path.dirname(__file__)
+BOOKS_PATH = os.path.join(BASE_DIR, "book_summaries.json")
+CHECK_INTERVAL = float(os.getenv("CATALOG_CHECK_INTERVAL", "1.0"))  # secunde între două stat()-uri
+
+def normalize_title(title: str) -> str:
+    """lowercase, fără diacritice, spații comprimate."""
+    t = unicodedata.normalize("NFKD", title or "")
+    t = "".join(c for c in t if not unicodedata.combining(c)).lower()
+    return re.sub(r"\s+", " ", t).strip()
+
+def book_id(title: str, seen: Dict[str, int]) -> str:
+    """ID stabil derivat din titlu (nu din poziția în listă); titlurile duplicate primesc sufix."""
+    base = "book-" + hashlib.sha1(normalize_title(title).encode("utf-8")).hexdigest()[:16]
+    n = seen.get(base, 0)
+    seen[base] = n + 1
+    return base if n == 0 else f"{base}-{n}"
+
+class _Snapshot:
+    __slots__ = ("books", "by_title", "by_alias", "by_id", "digest")
+
+    def __init__(self, books: List[Dict], digest: str):
+        self.books = books
+        self.by_title: Dict[str, Dict] = {}
+        self.by_alias: Dict[str, Dict] = {}
+        self.by_id: Dict[str, Dict] = {}
+        self.digest = digest
+        seen: Dict[str, int] = {}
+        for i, b in enumerate(books):
+            title = b.get("title", f"Unknown {i}")
+            self.by_id[book_id(title, seen)] = b
+            # la titluri duplicate păstrăm prima apariție (ca vechea căutare liniară)
+            self.by_title.setdefault(normalize_title(title), b)
+            for alias in b.get("aliases", []) or []:
+                self.by_alias.setdefault(normalize_title(alias), b)
+
+class CatalogIndex:
+    def __init__(self, path: str = BOOKS_PATH, check_interval: float = CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snap = _Snapshot([], "")
+        self._stat = None
+        self._next_check = 0.0
+        self.reloads = 0
+
+    def _refresh(self) -> _Snapshot:
+        now = time.monotonic()
+        if now < self._next_check:
+            return self._snap
+        with self._lock:
+            if now < self._next_check:
+                return self._snap
+            self._next_check = now + self.check_interval
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                self._snap, self._stat = _Snapshot([], ""), None
+                return self._snap
+            sig = (st.st_mtime_ns, st.st_size)
+            if sig == self._stat:
+                return self._snap
+            try:
+                with open(self.path, "rb") as f:
+                    raw = f.read()
+                digest = hashlib.sha256(raw).hexdigest()
+                if digest != self._snap.digest:
+                    self._snap = _Snapshot(json.loads(raw.decode("utf-8")), digest)
+                    self.reloads += 1
+                self._stat = sig
+            except Exception as e:
+                # fișier scris pe jumătate / JSON invalid: păstrăm ultima versiune bună
+                print("[WARN] Catalog reload failed:", e)
+            return self._snap
+
+    @property
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    @property
+    def books(self) -> List[Dict]:
+        return self._refresh().books
+
+    @property
+    def digest(self) -> str:
+        return self._refresh().digest
+
+    def get(self, title: str) -> Optional[Dict]:
+        snap = self._refresh()
+        key = normalize_title(title)
+        return snap.by_title.get(key) or snap.by_alias.get(key)
+
+    def get_by_id(self, _id: str) -> Optional[Dict]:
+        return self._refresh().by_id.get(_id)
+
+    def titles(self) -> List[str]:
+        return [b.get("title", "") for b in self.books]
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+def get_catalog() -> CatalogIndex:
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = CatalogIndex()
+    return _catalog
@@ -1,47 +1,52 @@
-
 # core/database.py
-import os, sqlite3, time
-from typing import List, Tuple, Optional
+# Conexiuni SQLite reutilizate per thread (WAL, pragma-uri reglate), statement-uri preparate din cache-ul
+# conexiunii și migrări de schemă versionate prin PRAGMA user_version.
+# Opțional (DB_WRITE_BEHIND=1): scrierile fără valoare de retur trec printr-o coadă și un thread care
+# le grupează într-o singură tranzacție (group commit).
+import os, sqlite3, time, threading, weakref, queue, atexit
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, List, Tuple, Optional
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "rina.sqlite3")
+from core import metrics
 
-class ConversationDB:
-    def __init__(self, path: str = DB_PATH):
-        self.path = path
-        self._init_db()
+DB_PATH = os.getenv("DB_PATH", os.path.join(os.path.dirname(__file__), "rina.sqlite3"))
+DB_BUSY_TIMEOUT = float(os.getenv("DB_BUSY_TIMEOUT", "5.0"))  # secunde de așteptare după lock-ul de scriere
+DB_MAX_IDLE = int(os.getenv("DB_MAX_IDLE", "8"))              # conexiuni păstrate după ce thread-ul lor s-a terminat
+DB_CACHED_STATEMENTS = 256
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")         # FULL = fsync la fiecare commit
+DB_WRITE_BEHIND = os.getenv("DB_WRITE_BEHIND", "0") == "1"
+DB_WRITE_QUEUE_SIZE = int(os.getenv("DB_WRITE_QUEUE_SIZE", "1024"))  # plin -> cererile așteaptă (backpressure)
+DB_WRITE_BATCH_MAX = int(os.getenv("DB_WRITE_BATCH_MAX", "256"))     # scrieri per tranzacție
+DB_WRITE_LINGER = float(os.getenv("DB_WRITE_LINGER", "0.002"))       # secunde de adunat scrieri după prima din lot
 
-    def _execute(self, sql: str, params: tuple = (), fetch: bool = False, many: bool = False):
-        con = sqlite3.connect(self.path)
-        try:
-            cur = con.cursor()
-            if many and isinstance(params, list):
-                cur.executemany(sql, params)
-            else:
-                cur.execute(sql, params)
-            con.commit()
-            if fetch:
-                return cur.fetchall()
-            return None
-        finally:
-            con.close()
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",      # cititorii nu mai blochează scriitorul (și invers)
+    f"PRAGMA synchronous={DB_SYNCHRONOUS}",  # NORMAL în WAL: fsync doar la checkpoint, nu la fiecare commit
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",      # ~8 MB cache de pagini per conexiune
+    "PRAGMA mmap_size=67108864",
+)
 
-    def _init_db(self):
-        self._execute("""
+# MIGRATIONS[i] aduce schema de la versiunea i la i + 1
+MIGRATIONS = [
+    [
+        """
         CREATE TABLE IF NOT EXISTS users(
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             username TEXT UNIQUE NOT NULL,
             password TEXT NOT NULL,
             created_at REAL DEFAULT (strftime('%s','now'))
-        );""")
-        self._execute("""
+        );""",
+        """
         CREATE TABLE IF NOT EXISTS sessions(
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER NOT NULL,
             title TEXT DEFAULT 'New Chat',
             created_at REAL DEFAULT (strftime('%s','now')),
             FOREIGN KEY(user_id) REFERENCES users(id)
-        );""")
-        self._execute("""
+        );""",
+        """
         CREATE TABLE IF NOT EXISTS messages(
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER NOT NULL,
@@ -51,9 +56,237 @@ class ConversationDB:
             created_at REAL DEFAULT (strftime('%s','now')),
             FOREIGN KEY(user_id) REFERENCES users(id),
             FOREIGN KEY(session_id) REFERENCES sessions(id)
-        );""")
+        );""",
+    ],
+    [
+        "CREATE INDEX IF NOT EXISTS idx_sessions_user_created ON sessions(user_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_messages_session_id ON messages(session_id, id)",
+    ],
+    [
+        # răspunsul care așteaptă Good/Bad, ținut pe server în loc de cookie-ul de sesiune
+        """
+        CREATE TABLE IF NOT EXISTS pending(
+            user_id INTEGER PRIMARY KEY,
+            session_id INTEGER,
+            question TEXT,
+            answer TEXT,
+            created_at REAL DEFAULT (strftime('%s','now'))
+        );""",
+    ],
+    [
+        # răspunsurile terminate pe /chat/stream, până le confirmă /chat/stream/finish; în baza de date și nu
+        # în memorie, pentru că finish-ul poate ajunge la alt worker al frontend-ului decât fluxul
+        """
+        CREATE TABLE IF NOT EXISTS stream_results(
+            token TEXT PRIMARY KEY,
+            user_id INTEGER,
+            question TEXT,
+            answer TEXT,
+            created_at REAL
+        );""",
+    ],
+]
+
+_STOP = object()
+
+def _db_op(fn):
+    """Numără operația (rina_db_ops_total{op}) și o cronometrează ca etapa db.<op>."""
+    stage = "db." + fn.__name__
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        metrics.inc("rina_db_ops_total", op=fn.__name__)
+        with metrics.stage(stage):
+            return fn(*args, **kwargs)
+    return wrapper
+
+class ConversationDB:
+    def __init__(self, path: str = DB_PATH, write_behind: bool = DB_WRITE_BEHIND):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._idle: List[sqlite3.Connection] = []
+        self._all = set()
+        self._closed = False
+        self.connections = 0  # conexiuni deschise în total (pentru benchmark-uri)
+        self._init_db()
+
+        self.write_behind = write_behind
+        self._queue: Optional[queue.Queue] = None
+        self._writer = None
+        self._dirty: Dict[tuple, int] = {}   # cheie (sesiune/utilizator) -> scrieri încă necomise
+        self._dirty_cond = threading.Condition()
+        self.batches = 0
+        self.batched_writes = 0
+        if write_behind:
+            self._queue = queue.Queue(maxsize=DB_WRITE_QUEUE_SIZE)
+            self._writer = threading.Thread(target=self._writer_loop, name="db-writer", daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+
+    # --- conexiuni ---
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: autocommit; tranzacțiile cu mai multe statement-uri sunt explicite (_transaction)
+        con = sqlite3.connect(self.path, timeout=DB_BUSY_TIMEOUT, isolation_level=None,
+                              check_same_thread=False, cached_statements=DB_CACHED_STATEMENTS)
+        for pragma in PRAGMAS:
+            con.execute(pragma)
+        return con
+
+    def _conn(self) -> sqlite3.Connection:
+        """Conexiunea thread-ului curent; la terminarea thread-ului ajunge în lista de conexiuni libere."""
+        con = getattr(self._local, "con", None)
+        if con is not None:
+            return con
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("ConversationDB is closed")
+            con = self._idle.pop() if self._idle else None
+        if con is None:
+            con = self._connect()
+            with self._lock:
+                self._all.add(con)
+                self.connections += 1
+        self._local.con = con
+        # serverele WSGI cu thread per cerere: conexiunea e refolosită de thread-urile următoare
+        weakref.finalize(threading.current_thread(), self._release, con)
+        return con
+
+    def _release(self, con: sqlite3.Connection):
+        with self._lock:
+            if not self._closed and len(self._idle) < DB_MAX_IDLE:
+                self._idle.append(con)
+                return
+            self._all.discard(con)
+        con.close()
+
+    def close(self):
+        """Golește coada de scrieri (dacă există), apoi închide toate conexiunile."""
+        if self._writer is not None:
+            self.flush()
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+        with self._lock:
+            self._closed = True
+            cons, self._all, self._idle = list(self._all), set(), []
+        for con in cons:
+            try:
+                con.close()
+            except Exception:
+                pass
+
+    @contextmanager
+    def _transaction(self):
+        con = self._conn()
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            yield con
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+        con.execute("COMMIT")
+
+    def _execute(self, sql: str, params: tuple = (), fetch: bool = False, many: bool = False):
+        if many and isinstance(params, list):
+            with self._transaction() as con:
+                con.executemany(sql, params)
+            return None
+        cur = self._conn().execute(sql, params)
+        if fetch:
+            return cur.fetchall()
+        return None
+
+    # --- write-behind ---
+    def _write(self, keys: tuple, sql: str, params: tuple):
+        """Scriere fără rezultat: direct, sau pusă în coadă în modul write-behind."""
+        if self._writer is None:
+            self._conn().execute(sql, params)
+            return
+        with self._dirty_cond:
+            for k in keys:
+                self._dirty[k] = self._dirty.get(k, 0) + 1
+        self._queue.put((keys, sql, params))  # blochează cât timp coada e plină
+
+    def _wait_clean(self, *keys):
+        """Read-your-writes: o citire așteaptă doar scrierile încă în coadă pentru aceleași chei."""
+        if self._writer is None:
+            return
+        with self._dirty_cond:
+            self._dirty_cond.wait_for(lambda: not any(self._dirty.get(k) for k in keys))
+
+    def flush(self):
+        """Așteaptă până când toate scrierile din coadă sunt comise."""
+        if self._queue is not None:
+            self._queue.join()
+
+    def _writer_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            batch = [item]
+            deadline = time.monotonic() + DB_WRITE_LINGER
+            stop = False
+            while len(batch) < DB_WRITE_BATCH_MAX:
+                try:
+                    nxt = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stop = True
+                    break
+                batch.append(nxt)
+            self._commit_batch(batch)
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                self._queue.task_done()
+                return
+
+    def _commit_batch(self, batch: List[tuple]):
+        # statement-urile consecutive identice merg într-un singur executemany; ordinea se păstrează
+        groups: List[Tuple[str, list]] = []
+        for _, sql, params in batch:
+            if groups and groups[-1][0] == sql:
+                groups[-1][1].append(params)
+            else:
+                groups.append((sql, [params]))
+        try:
+            with self._transaction() as con:
+                for sql, rows in groups:
+                    con.executemany(sql, rows)
+        except Exception as e:
+            # un rând invalid nu trebuie să piardă tot lotul: reluăm scrierile una câte una
+            print(f"[WARN] Group commit of {len(batch)} writes failed ({e}); retrying one by one.")
+            for _, sql, params in batch:
+                try:
+                    self._conn().execute(sql, params)
+                except Exception as e2:
+                    print("[WARN] Dropped write:", e2)
+        self.batches += 1
+        self.batched_writes += len(batch)
+        with self._dirty_cond:
+            for keys, _, _ in batch:
+                for k in keys:
+                    n = self._dirty.get(k, 0) - 1
+                    if n > 0:
+                        self._dirty[k] = n
+                    else:
+                        self._dirty.pop(k, None)
+            self._dirty_cond.notify_all()
+
+    def _init_db(self):
+        with self._transaction() as con:
+            version = con.execute("PRAGMA user_version").fetchone()[0]
+            for v in range(version, len(MIGRATIONS)):
+                for stmt in MIGRATIONS[v]:
+                    con.execute(stmt)
+                con.execute(f"PRAGMA user_version={v + 1}")
 
     # --- Users ---
+    @_db_op
     def create_user(self, username: str, password: str) -> tuple[bool, Optional[str]]:
         try:
             self._execute("INSERT INTO users(username,password) VALUES(?,?)", (username, password))
@@ -61,6 +294,7 @@ class ConversationDB:
         except Exception as e:
             return False, str(e)
 
+    @_db_op
     def validate_user(self, username: str, password: str) -> Optional[int]:
         rows = self._execute("SELECT id FROM users WHERE username=? AND password=?", (username, password), fetch=True)
         if rows:
@@ -68,36 +302,121 @@ class ConversationDB:
         return None
 
     # --- Sessions ---
+    @_db_op
     def create_session(self, user_id: int, title: str = None) -> int:
         title = title or f"Chat {int(time.time())}"
-        self._execute("INSERT INTO sessions(user_id,title) VALUES(?,?)", (user_id, title))
-        rows = self._execute("SELECT last_insert_rowid()", fetch=True)
-        return int(rows[0][0])
+        cur = self._conn().execute("INSERT INTO sessions(user_id,title) VALUES(?,?)", (user_id, title))
+        return int(cur.lastrowid)
 
+    @_db_op
     def get_latest_session(self, user_id: int) -> Optional[int]:
+        self._wait_clean(("sessions",))
         rows = self._execute("SELECT id FROM sessions WHERE user_id=? ORDER BY created_at DESC LIMIT 1", (user_id,), fetch=True)
         return rows[0][0] if rows else None
 
+    @_db_op
     def get_sessions(self, user_id: int) -> List[tuple]:
+        self._wait_clean(("sessions",))
         return self._execute("SELECT id, title FROM sessions WHERE user_id=? ORDER BY created_at DESC", (user_id,), fetch=True) or []
 
+    @_db_op
+    def get_session_owner(self, session_id: int) -> Optional[int]:
+        rows = self._execute("SELECT user_id FROM sessions WHERE id=?", (session_id,), fetch=True)
+        return rows[0][0] if rows else None
+
+    @_db_op
     def rename_session(self, session_id: int, new_title: str):
-        self._execute("UPDATE sessions SET title=? WHERE id=?", (new_title, session_id))
+        # titlurile apar în lista de sesiuni a utilizatorului: cheia e comună tuturor sesiunilor
+        self._write((("sessions",),), "UPDATE sessions SET title=? WHERE id=?", (new_title, session_id))
 
+    @_db_op
     def delete_session(self, session_id: int):
-        self._execute("DELETE FROM messages WHERE session_id=?", (session_id,))
-        self._execute("DELETE FROM sessions WHERE id=?", (session_id,))
+        self.flush()  # nimic din coadă nu trebuie să reapară după ștergere
+        with self._transaction() as con:
+            con.execute("DELETE FROM messages WHERE session_id=?", (session_id,))
+            con.execute("DELETE FROM sessions WHERE id=?", (session_id,))
 
     # --- Messages ---
+    @_db_op
     def save(self, user_id: int, question: str, answer: str, session_id: int):
-        self._execute(
+        self._write(
+            (("session", session_id),),
             "INSERT INTO messages(user_id, session_id, question, answer) VALUES(?,?,?,?)",
             (user_id, session_id, question, answer)
         )
 
+    @_db_op
     def get_conversation_by_session(self, session_id: int) -> List[tuple]:
+        self._wait_clean(("session", session_id))
         # Return as list of (question, answer, created_at)
         return self._execute(
             "SELECT question, answer, created_at FROM messages WHERE session_id=? ORDER BY id ASC",
             (session_id,), fetch=True
         ) or []
+
+    @_db_op
+    def get_messages_page(self, session_id: int, before_id: Optional[int] = None, limit: int = 20) -> List[tuple]:
+        """
+        Paginare keyset după messages.id: cele mai recente `limit` mesaje cu id < before_id
+        (sau ale sesiunii, dacă before_id lipsește), în ordine cronologică: (id, question, answer, created_at).
+        """
+        self._wait_clean(("session", session_id))
+        if before_id is None:
+            rows = self._execute(
+                "SELECT id, question, answer, created_at FROM messages WHERE session_id=? ORDER BY id DESC LIMIT ?",
+                (session_id, limit), fetch=True
+            )
+        else:
+            rows = self._execute(
+                "SELECT id, question, answer, created_at FROM messages WHERE session_id=? AND id<? ORDER BY id DESC LIMIT ?",
+                (session_id, before_id, limit), fetch=True
+            )
+        rows.reverse()
+        return rows
+
+    # --- Pending (răspuns încă neevaluat) ---
+    # Scris direct și în modul write-behind: evaluarea (și redirect-ul de după POST /chat) poate ajunge la alt
+    # worker, care nu vede coada acestui proces.
+    @_db_op
+    def set_pending(self, user_id: int, session_id: Optional[int], question: str, answer: str):
+        self._execute(
+            "INSERT OR REPLACE INTO pending(user_id, session_id, question, answer) VALUES(?,?,?,?)",
+            (user_id, session_id, question, answer)
+        )
+
+    @_db_op
+    def get_pending(self, user_id: int) -> Optional[Tuple[str, str]]:
+        rows = self._execute("SELECT question, answer FROM pending WHERE user_id=?", (user_id,), fetch=True)
+        return (rows[0][0], rows[0][1]) if rows else None
+
+    @_db_op
+    def clear_pending(self, user_id: int):
+        self._execute("DELETE FROM pending WHERE user_id=?", (user_id,))
+
+    # --- Răspunsuri pe flux, încă neconfirmate de browser ---
+    @_db_op
+    def put_stream_result(self, token: str, user_id: int, question: str, answer: str, ttl: float):
+        """
+        Salvează rezultatul unui flux; cele mai vechi de `ttl` secunde (niciodată confirmate) sunt șterse.
+        Scris direct și în modul write-behind: confirmarea poate ajunge la alt worker (alt proces), pentru
+        care coada acestuia nu există.
+        """
+        now = time.time()
+        with self._transaction() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO stream_results(token, user_id, question, answer, created_at) "
+                "VALUES(?,?,?,?,?)",
+                (token, user_id, question, answer, now)
+            )
+            con.execute("DELETE FROM stream_results WHERE created_at<?", (now - ttl,))
+
+    @_db_op
+    def pop_stream_result(self, token: str, ttl: float) -> Optional[Tuple[int, str, str]]:
+        """(user_id, întrebare, răspuns) pentru token, o singură dată; None dacă lipsește sau a expirat."""
+        with self._transaction() as con:
+            rows = con.execute(
+                "SELECT user_id, question, answer FROM stream_results WHERE token=? AND created_at>=?",
+                (token, time.time() - ttl)
+            ).fetchall()
+            con.execute("DELETE FROM stream_results WHERE token=?", (token,))
+        return tuple(rows[0]) if rows else None
@@ -0,0 +1,221 @@
+# core/embedding_cache.py
+# Cache pe două niveluri pentru embed_texts: LRU în memorie + SQLite pe disc (lângă .chroma_store).
+# Cheia este (model, sha256(text normalizat)), deci schimbarea modelului nu poate întoarce vectori vechi.
+import os
+import re
+import atexit
+import sqlite3
+import threading
+import time
+import hashlib
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+BASE_DIR = os.path.dirname(__file__)
+CACHE_PATH = os.getenv("EMBED_CACHE_PATH", os.path.join(BASE_DIR, ".embedding_cache.sqlite3"))
+MEMORY_MAX_ITEMS = int(os.getenv("EMBED_CACHE_MEMORY_ITEMS", "4096"))
+DISK_MAX_ITEMS = int(os.getenv("EMBED_CACHE_DISK_ITEMS", "200000"))
+# last_used al citirilor de pe disc se scrie grupat (la scrieri, la trim sau la interval), nu la fiecare hit:
+# fișierul e partajat între workeri și fiecare commit ar serializa citirile
+TOUCH_FLUSH_INTERVAL = float(os.getenv("EMBED_CACHE_TOUCH_INTERVAL", "60"))   # secunde
+TOUCH_FLUSH_ITEMS = 1024
+
+def normalize_text(text: str) -> str:
+    t = unicodedata.normalize("NFC", text or "")
+    return re.sub(r"\s+", " ", t).strip()
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+def _pack(vec: List[float]) -> bytes:
+    return array("f", vec).tobytes()
+
+def _unpack(blob: bytes) -> List[float]:
+    a = array("f")
+    a.frombytes(blob)
+    return a.tolist()
+
+class EmbeddingCache:
+    def __init__(self, path: Optional[str] = CACHE_PATH,
+                 memory_max_items: int = MEMORY_MAX_ITEMS, disk_max_items: int = DISK_MAX_ITEMS):
+        self.path = path
+        self.memory_max_items = memory_max_items
+        self.disk_max_items = disk_max_items
+        self._mem: "OrderedDict[tuple, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._con = None
+        self._writes_since_trim = 0
+        self._touched: Dict[tuple, float] = {}   # (model, cheie) -> ultima citire de pe disc, încă nescrisă
+        self._touched_since = time.monotonic()
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        if path:
+            self._init_db()
+
+    def _init_db(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._con = sqlite3.connect(self.path, check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("""
+        CREATE TABLE IF NOT EXISTS embeddings(
+            model TEXT NOT NULL,
+            key TEXT NOT NULL,
+            dim INTEGER NOT NULL,
+            vector BLOB NOT NULL,
+            last_used REAL NOT NULL,
+            PRIMARY KEY(model, key)
+        );""")
+        self._con.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+        self._con.commit()
+
+    # --- memorie (LRU) ---
+    def _mem_get(self, k: tuple) -> Optional[List[float]]:
+        v = self._mem.get(k)
+        if v is not None:
+            self._mem.move_to_end(k)
+        return v
+
+    def _mem_put(self, k: tuple, vec: List[float]):
+        self._mem[k] = vec
+        self._mem.move_to_end(k)
+        while len(self._mem) > self.memory_max_items:
+            self._mem.popitem(last=False)
+
+    # --- API ---
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        keys = [text_key(t) for t in texts]
+        out: List[Optional[List[float]]] = [None] * len(texts)
+        with self._lock:
+            to_disk: Dict[str, List[int]] = {}
+            for i, k in enumerate(keys):
+                v = self._mem_get((model, k))
+                if v is not None:
+                    out[i] = v
+                    self.hits_memory += 1
+                else:
+                    to_disk.setdefault(k, []).append(i)
+
+            if to_disk and self._con is not None:
+                found = self._disk_get(model, list(to_disk))
+                for k, vec in found.items():
+                    self._mem_put((model, k), vec)
+                    for i in to_disk.pop(k):
+                        out[i] = vec
+                        self.hits_disk += 1
+            self.misses += sum(len(v) for v in to_disk.values())
+        return out
+
+    def _disk_get(self, model: str, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        for start in range(0, len(keys), 500):  # limita de parametri SQLite
+            chunk = keys[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            rows = self._con.execute(
+                f"SELECT key, vector FROM embeddings WHERE model=? AND key IN ({marks})",
+                (model, *chunk),
+            ).fetchall()
+            for k, blob in rows:
+                found[k] = _unpack(blob)
+        if found:
+            now = time.time()
+            for k in found:
+                self._touched[(model, k)] = now
+            if len(self._touched) >= TOUCH_FLUSH_ITEMS or \
+                    time.monotonic() - self._touched_since >= TOUCH_FLUSH_INTERVAL:
+                self._flush_touched()
+                self._con.commit()
+        return found
+
+    def _flush_touched(self):
+        """Scrie last_used pentru citirile adunate (fără commit: apelantul îl face, eventual cu alte scrieri)."""
+        self._touched_since = time.monotonic()
+        if not self._touched:
+            return
+        self._con.executemany(
+            "UPDATE embeddings SET last_used=? WHERE model=? AND key=?",
+            [(t, model, k) for (model, k), t in self._touched.items()],
+        )
+        self._touched = {}
+
+    def put_many(self, model: str, texts: List[str], vectors: List[List[float]]):
+        now = time.time()
+        rows = []
+        with self._lock:
+            for t, vec in zip(texts, vectors):
+                k = text_key(t)
+                self._mem_put((model, k), list(vec))
+                rows.append((model, k, len(vec), _pack(vec), now))
+            if self._con is not None and rows:
+                self._flush_touched()   # în aceeași tranzacție cu scrierea
+                self._con.executemany(
+                    "INSERT OR REPLACE INTO embeddings(model, key, dim, vector, last_used) VALUES(?,?,?,?,?)",
+                    rows,
+                )
+                self._con.commit()
+                self._writes_since_trim += len(rows)
+                if self._writes_since_trim >= 1000:
+                    self._trim_disk()
+
+    def _trim_disk(self):
+        self._writes_since_trim = 0
+        self._flush_touched()   # evacuarea după last_used trebuie să vadă citirile recente
+        (n,) = self._con.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        extra = n - self.disk_max_items
+        if extra > 0:
+            self._con.execute(
+                "DELETE FROM embeddings WHERE rowid IN "
+                "(SELECT rowid FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                (extra,),
+            )
+            self._con.commit()
+
+    def clear(self, model: Optional[str] = None):
+        with self._lock:
+            if model is None:
+                self._mem.clear()
+                self._touched = {}
+            else:
+                for k in [k for k in self._mem if k[0] == model]:
+                    del self._mem[k]
+                self._touched = {k: t for k, t in self._touched.items() if k[0] != model}
+            if self._con is not None:
+                if model is None:
+                    self._con.execute("DELETE FROM embeddings")
+                else:
+                    self._con.execute("DELETE FROM embeddings WHERE model=?", (model,))
+                self._con.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "memory_items": len(self._mem),
+            }
+
+    def close(self):
+        with self._lock:
+            if self._con is not None:
+                try:
+                    self._flush_touched()
+                    self._con.commit()
+                except sqlite3.Error:
+                    pass
+                self._con.close()
+                self._con = None
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> EmbeddingCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache()
+                atexit.register(_cache.close)   # last_used încă nescris
+    return _cache
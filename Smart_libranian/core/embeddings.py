@@ -1,9 +1,39 @@
 # core/embeddings.py
 import os
-from typing import List
-from openai import OpenAI
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from core.embedding_cache import get_cache, text_key
+from core import metrics
 
 OPENAI_API_KEY = ""
+EMBED_CACHE_ENABLED = os.getenv("EMBED_CACHE", "1") != "0"
+
+# --- provider de embedding ---
+# openai: API-ul OpenAI (implicit); hashed: n-grame hash-uite pe CPU (NumPy, offline);
+# onnx: model sentence-transformer local; local: onnx dacă modelul e pe disc, altfel hashed
+EMBED_PROVIDER = os.getenv("EMBED_PROVIDER", "openai")
+OPENAI_EMBED_MODEL = os.getenv("OPENAI_EMBED_MODEL", "text-embedding-3-small")
+
+# --- împărțire în loturi / concurență / retry ---
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "256"))         # max. texte pe request (limita API: 2048)
+EMBED_BATCH_TOKENS = int(os.getenv("EMBED_BATCH_TOKENS", "100000"))  # buget estimat de tokeni pe request
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "6"))
+EMBED_BACKOFF_BASE = 0.5   # secunde
+EMBED_BACKOFF_MAX = 30.0
+
+def retryable_errors() -> tuple:
+    # openai se importă la primul apel remote, nu la pornire (~0.7 s)
+    import openai
+    return (
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+    )
 
 _client = None
 def get_openai():
@@ -11,11 +41,181 @@ def get_openai():
     if _client is None:
         if not OPENAI_API_KEY:
             raise RuntimeError("Set OPENAI_API_KEY in environment.")
-        _client = OpenAI(api_key=OPENAI_API_KEY)
+        from openai import OpenAI
+        # retry-urile le facem noi (cu jitter), nu clientul
+        _client = OpenAI(api_key=OPENAI_API_KEY, max_retries=0)
     return _client
 
-def embed_texts(texts: List[str], model: str = "text-embedding-3-small") -> List[List[float]]:
+def estimate_tokens(text: str) -> int:
+    # aproximare fără tokenizer: ~3 caractere / token pentru RO/EN
+    return len(text) // 3 + 1
+
+def make_batches(texts: List[str], max_items: int = None, max_tokens: int = None) -> List[List[int]]:
+    """Grupează indicii textelor în loturi limitate atât după număr, cât și după bugetul de tokeni."""
+    max_items = max_items or EMBED_BATCH_SIZE
+    max_tokens = max_tokens or EMBED_BATCH_TOKENS
+    batches, cur, cur_tokens = [], [], 0
+    for i, t in enumerate(texts):
+        n = estimate_tokens(t)
+        if cur and (len(cur) >= max_items or cur_tokens + n > max_tokens):
+            batches.append(cur)
+            cur, cur_tokens = [], 0
+        cur.append(i)
+        cur_tokens += n
+    if cur:
+        batches.append(cur)
+    return batches
+
+def _backoff_delay(attempt: int, err: Exception) -> float:
+    retry_after = None
+    resp = getattr(err, "response", None)
+    if resp is not None:
+        try:
+            retry_after = float(resp.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            retry_after = None
+    if retry_after is not None:
+        return min(retry_after, EMBED_BACKOFF_MAX)
+    # "full jitter": uniform între 0 și plafonul exponențial
+    return random.uniform(0, min(EMBED_BACKOFF_MAX, EMBED_BACKOFF_BASE * (2 ** attempt)))
+
+def _embed_batch(texts: List[str], model: str) -> List[List[float]]:
     client = get_openai()
+    retryable = retryable_errors()
+    for attempt in range(EMBED_MAX_RETRIES + 1):
+        try:
+            resp = client.embeddings.create(model=model, input=texts)
+            metrics.inc("rina_llm_calls_total", kind="embedding", outcome="ok")
+            usage = getattr(resp, "usage", None)
+            if usage is not None:
+                metrics.inc("rina_llm_tokens_total", usage.prompt_tokens or 0, kind="embedding", type="prompt")
+            data = sorted(resp.data, key=lambda d: d.index)
+            return [d.embedding for d in data]
+        except retryable as e:
+            metrics.inc("rina_llm_calls_total", kind="embedding", outcome="retry")
+            if attempt == EMBED_MAX_RETRIES:
+                raise
+            delay = _backoff_delay(attempt, e)
+            print(f"[WARN] Embedding batch failed ({type(e).__name__}), retry {attempt + 1} in {delay:.1f}s")
+            time.sleep(delay)
+
+def _embed_remote(texts: List[str], model: str) -> List[List[float]]:
+    batches = make_batches(texts)
+    if len(batches) == 1:
+        return _embed_batch(texts, model)
+
+    out: List[List[float]] = [None] * len(texts)
+    workers = max(1, min(EMBED_CONCURRENCY, len(batches)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed") as pool:
+        futures = [(idx, pool.submit(_embed_batch, [texts[i] for i in idx], model)) for idx in batches]
+        for idx, fut in futures:
+            for i, vec in zip(idx, fut.result()):
+                out[i] = vec
+    return out
+
+class OpenAIEmbedder:
+    name = "openai"
+    cacheable = True
+
+    def __init__(self, model: str = OPENAI_EMBED_MODEL):
+        self.model = model
+        self.dim = None  # aflată din primul răspuns (serverele compatibile pot întoarce alte dimensiuni)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        out = _embed_remote(texts, self.model)
+        if self.dim is None and out:
+            self.dim = len(out[0])
+        return out
+
+class EmbeddingMismatchError(RuntimeError):
+    """Colecția a fost construită cu alt provider/model/dimensiune decât cel configurat acum."""
+
+def provider_key(provider) -> str:
+    """Cheia folosită în cache și în hash-urile de conținut; pentru OpenAI rămâne numele modelului (compatibil)."""
+    return provider.model if provider.name == "openai" else f"{provider.name}:{provider.model}"
+
+def provider_info(provider) -> Dict:
+    """Ce se scrie în metadatele colecției Chroma."""
+    info = {"embed_provider": provider.name, "embed_model": provider.model}
+    if provider.dim:
+        info["embed_dim"] = int(provider.dim)
+    return info
+
+def make_provider(name: str):
+    from core import local_embeddings
+    if name == "openai":
+        return OpenAIEmbedder()
+    if name == "hashed":
+        return local_embeddings.HashedNgramEmbedder()
+    if name in ("onnx", "local"):
+        model_dir = local_embeddings.find_onnx_model()
+        if model_dir:
+            return local_embeddings.OnnxEmbedder(model_dir)
+        if name == "onnx":
+            raise RuntimeError("EMBED_PROVIDER=onnx: no model.onnx + tokenizer.json found "
+                               f"in {local_embeddings.ONNX_DIRS} (or onnxruntime/tokenizers missing).")
+        print("[INFO] No local ONNX model found; using the hashed n-gram embedder.")
+        return local_embeddings.HashedNgramEmbedder()
+    raise ValueError(f"Unknown EMBED_PROVIDER: {name!r} (expected openai, hashed, onnx or local)")
+
+_provider = None
+_provider_lock = threading.Lock()
+
+def get_provider():
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = make_provider(EMBED_PROVIDER)
+    return _provider
+
+def check_compatible(metadata: Optional[Dict], count: int, provider=None):
+    """Ridică EmbeddingMismatchError dacă o colecție cu `count` documente a fost construită cu alt provider."""
+    if not count:
+        return
+    provider = provider or get_provider()
+    meta = dict(metadata or {})
+    # colecțiile dinaintea metadatelor au fost construite mereu cu OpenAI text-embedding-3-small
+    built = (meta.get("embed_provider", "openai"), meta.get("embed_model", "text-embedding-3-small"))
+    current = (provider.name, provider.model)
+    dim = meta.get("embed_dim")
+    if built != current or (dim and provider.dim and int(dim) != int(provider.dim)):
+        raise EmbeddingMismatchError(
+            f"Vector store was built with {built[0]}:{built[1]} (dim={dim or '?'}), but EMBED_PROVIDER is "
+            f"{current[0]}:{current[1]} (dim={provider.dim or '?'}). Re-run: python -m core.ingest --rebuild"
+        )
+
+@metrics.timed("embed_texts")
+def embed_texts(texts: List[str], model: str = None, use_cache: bool = None) -> List[List[float]]:
+    """
+    Embedding-uri cu providerul configurat (EMBED_PROVIDER). `model` alege alt model OpenAI
+    doar când providerul activ este openai.
+    """
+    provider = get_provider()
+    if model and provider.name == "openai" and model != provider.model:
+        provider = OpenAIEmbedder(model)
+    if use_cache is None:
+        use_cache = EMBED_CACHE_ENABLED
+    if not use_cache or not provider.cacheable:
+        return provider.embed(texts)
+
+    key = provider_key(provider)
+    cache = get_cache()
+    vectors = cache.get_many(key, texts)
 
-    resp = client.embeddings.create(model=model, input=texts)
-    return [d.embedding for d in resp.data]
+    # doar textele lipsă (fără duplicate) ajung la provider
+    missing = {}
+    for i, v in enumerate(vectors):
+        if v is None:
+            missing.setdefault(text_key(texts[i]), []).append(i)
+    misses = sum(len(idx) for idx in missing.values())
+    metrics.inc("rina_cache_total", len(texts) - misses, cache="embedding", result="hit")
+    metrics.inc("rina_cache_total", misses, cache="embedding", result="miss")
+    if missing:
+        todo = [texts[idx[0]] for idx in missing.values()]
+        fresh = provider.embed(todo)
+        cache.put_many(key, todo, fresh)
+        for idx, vec in zip(missing.values(), fresh):
+            for i in idx:
+                vectors[i] = vec
+    return vectors
@@ -1,18 +1,24 @@
 # core/ingest.py
-import os, json
-import chromadb
-from chromadb.config import Settings
-from core.embeddings import embed_texts
+import os, json, hashlib, argparse, threading, queue
+from typing import Dict, Iterable, Iterator, List, Tuple
+from core.embeddings import embed_texts, get_provider, provider_key, EmbeddingMismatchError
+from core import vector_store
+from core.catalog import get_catalog, book_id
 import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 BASE_DIR = os.path.dirname(__file__)
 BOOKS_PATH = os.path.join(BASE_DIR, "book_summaries.json")
-CHROMA_DIR = os.path.join(BASE_DIR, ".chroma_store")
-COLLECTION_NAME = "books"
+CHROMA_DIR = vector_store.CHROMA_DIR
+COLLECTION_NAME = vector_store.COLLECTION_NAME
+UPSERT_BATCH = 1000
+STREAM_BATCH = 256        # documente pe lot în modul streaming
+STREAM_QUEUE_SIZE = 4     # loturi în așteptare între etape (memorie plafonată)
+CHECKPOINT_FILE = ".ingest_checkpoint.json"
 
 def get_client():
-    return chromadb.PersistentClient(path=CHROMA_DIR, settings=Settings(anonymized_telemetry=False))
+    # același client ca search_books: un singur PersistentClient pe proces
+    return vector_store.get_client()
 
 def recreate_collection():
     client = get_client()
@@ -20,29 +26,309 @@ def recreate_collection():
         client.delete_collection(COLLECTION_NAME)
     except Exception:
         pass
-    return client.create_collection(COLLECTION_NAME, metadata={"hnsw:space": "cosine"})
+    coll = client.create_collection(COLLECTION_NAME, metadata=vector_store.collection_metadata())
+    vector_store.bump_generation()
+    _clear_checkpoint()  # checkpoint-ul descrie colecția ștearsă: un resume ar sări cărți care nu mai există
+    return coll
 
-def run_ingest():
-    if not os.path.exists(BOOKS_PATH):
-        raise FileNotFoundError(f"Missing {BOOKS_PATH}. Place your JSON summaries file there.")
-    with open(BOOKS_PATH, "r", encoding="utf-8") as f:
-        books = json.load(f)
+def _seen_id(_id: str, seen: Dict[str, int]) -> bool:
+    if _id in seen:
+        return True
+    base, _, n = _id.rpartition("-")
+    return n.isdigit() and seen.get(base, 0) > int(n)
 
-    coll = recreate_collection()
+def content_hash(text: str, model: str = None) -> str:
+    # providerul/modelul intră în hash: schimbarea lui re-embeduiește tot
+    model = model or provider_key(get_provider())
+    return hashlib.sha256(f"{model}\n{text}".encode("utf-8")).hexdigest()
 
-    docs, metadatas, ids = [], [], []
+def _compatible_collection(coll):
+    """Colecția existentă, sau una nouă dacă a fost construită cu alt provider de embedding."""
+    try:
+        vector_store.check_embeddings(coll)
+        return coll
+    except EmbeddingMismatchError as e:
+        print(f"[INFO] {e}\n[INFO] Rebuilding the collection with the configured provider.")
+        return recreate_collection()
+
+def build_document(b: Dict, i: int, seen: Dict[str, int]) -> Tuple[str, str, Dict]:
+    title = b.get("title", f"Unknown {i}")
+    themes = ", ".join(b.get("themes", []))
+    summary = b.get("summary", "")
+    text = f"Title: {title}\nThemes: {themes}\nSummary: {summary}"
+    return book_id(title, seen), text, {"title": title, "content_hash": content_hash(text)}
+
+def load_books(path: str = None) -> List[Dict]:
+    path = path or BOOKS_PATH
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Missing {path}. Place your JSON summaries file there.")
+    catalog = get_catalog()
+    if os.path.abspath(path) == os.path.abspath(catalog.path):
+        return catalog.books
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _existing_hashes(coll) -> Dict[str, str]:
+    out, offset = {}, 0
+    while True:
+        page = coll.get(include=["metadatas"], limit=UPSERT_BATCH, offset=offset)
+        ids = page.get("ids") or []
+        for _id, meta in zip(ids, page.get("metadatas") or []):
+            out[_id] = (meta or {}).get("content_hash")
+        if len(ids) < UPSERT_BATCH:
+            return out
+        offset += len(ids)
+
+def run_ingest(rebuild: bool = False) -> Dict[str, int]:
+    """
+    Ingest incremental: embeduiește și face upsert doar pentru cărțile noi/modificate,
+    șterge cărțile dispărute din sursă. Colecția nu e recreată, deci căutările merg în paralel.
+    rebuild=True păstrează vechiul comportament (ștergere + reconstruire completă).
+    """
+    books = load_books()
+    coll = recreate_collection() if rebuild else _compatible_collection(vector_store.get_collection())
+
+    seen: Dict[str, int] = {}
+    docs = {}
     for i, b in enumerate(books):
-        title = b.get("title", f"Unknown {i}")
-        themes = ", ".join(b.get("themes", []))
-        summary = b.get("summary", "")
-        text = f"Title: {title}\nThemes: {themes}\nSummary: {summary}"
-        docs.append(text)
-        metadatas.append({"title": title})
-        ids.append(f"book-{i}")
-
-    vectors = embed_texts(docs)  # list[list[float]]
-    coll.add(ids=ids, embeddings=vectors, metadatas=metadatas, documents=docs)
-    print(f"[INGEST DONE] {len(ids)} books -> {CHROMA_DIR}")
+        _id, text, meta = build_document(b, i, seen)
+        docs[_id] = (text, meta)
+
+    existing = {} if rebuild else _existing_hashes(coll)
+    added = [i for i in docs if i not in existing]
+    changed = [i for i in docs if i in existing and existing[i] != docs[i][1]["content_hash"]]
+    removed = [i for i in existing if i not in docs]
+
+    todo = added + changed
+    dim = None
+    for start in range(0, len(todo), UPSERT_BATCH):
+        ids = todo[start:start + UPSERT_BATCH]
+        texts = [docs[i][0] for i in ids]
+        vectors = embed_texts(texts)
+        dim = dim or len(vectors[0])
+        coll.upsert(ids=ids, embeddings=vectors, metadatas=[docs[i][1] for i in ids], documents=texts)
+    if todo:
+        vector_store.record_embedding_info(coll, dim)
+    for start in range(0, len(removed), UPSERT_BATCH):
+        coll.delete(ids=removed[start:start + UPSERT_BATCH])
+
+    vector_store.refresh_indexes(coll, bool(todo or removed))  # BM25 (+ indexul NumPy, dacă e folosit)
+    if todo or removed:
+        vector_store.bump_generation()  # invalidează cache-urile care depind de conținutul store-ului
+
+    report = {
+        "added": len(added),
+        "changed": len(changed),
+        "removed": len(removed),
+        "unchanged": len(docs) - len(todo),
+    }
+    print(f"[INGEST DONE] {len(docs)} books -> {vector_store.CHROMA_DIR} "
+          f"(added={report['added']}, changed={report['changed']}, "
+          f"removed={report['removed']}, unchanged={report['unchanged']})")
+    return report
+
+# ---------- streaming (cataloage mari, memorie constantă) ----------
+def iter_records(path: str, chunk_size: int = 1 << 16) -> Iterator[Dict]:
+    """Citește pe rând înregistrările dintr-un fișier JSONL sau dintr-un array JSON, fără json.load pe tot fișierul."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+            return
+
+        decoder = json.JSONDecoder()
+        buf, pos, started, eof = "", 0, False, False
+        while True:
+            # sărim peste spații, '[' inițial și virgulele dintre obiecte
+            while pos < len(buf) and (buf[pos].isspace() or buf[pos] == "," or (not started and buf[pos] == "[")):
+                started = started or buf[pos] == "["
+                pos += 1
+            if pos < len(buf) and buf[pos] == "]":
+                return
+            if pos < len(buf):
+                try:
+                    obj, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    yield obj
+                    pos = end
+                    continue
+            if eof:
+                return
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+
+def _staged(source: Iterable, maxsize: int = STREAM_QUEUE_SIZE) -> Iterator:
+    """Rulează un generator într-un thread separat și îi livrează elementele printr-o coadă mărginită."""
+    q: "queue.Queue" = queue.Queue(maxsize=maxsize)
+    done = object()
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # consumatorul se poate opri cu coada plină (eroare într-o etapă din aval, generator abandonat)
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker():
+        try:
+            for item in source:
+                if not put(item):
+                    return
+        except BaseException as e:  # propagăm eroarea în consumator
+            put(e)
+        finally:
+            put(done)
+
+    t = threading.Thread(target=worker, daemon=True)
+    t.start()
+    try:
+        while True:
+            item = q.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+def _checkpoint_path() -> str:
+    return os.path.join(vector_store.CHROMA_DIR, CHECKPOINT_FILE)
+
+def _source_signature(path: str) -> Dict:
+    st = os.stat(path)
+    return {"source": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def _load_checkpoint(path: str) -> int:
+    try:
+        with open(_checkpoint_path(), "r", encoding="utf-8") as f:
+            cp = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    sig = _source_signature(path)
+    if all(cp.get(k) == v for k, v in sig.items()):
+        return int(cp.get("records_done", 0))
+    return 0
+
+def _save_checkpoint(path: str, records_done: int):
+    cp = dict(_source_signature(path), records_done=records_done)
+    tmp = _checkpoint_path() + ".tmp"
+    os.makedirs(os.path.dirname(tmp), exist_ok=True)
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cp, f)
+    os.replace(tmp, _checkpoint_path())
+
+def _clear_checkpoint():
+    try:
+        os.remove(_checkpoint_path())
+    except OSError:
+        pass
+
+def run_ingest_streaming(path: str = None, batch_size: int = STREAM_BATCH,
+                         queue_size: int = STREAM_QUEUE_SIZE, resume: bool = True) -> Dict[str, int]:
+    """
+    Ingest pe flux: parse -> document -> embed pe loturi -> upsert, cu cozi mărginite între etape,
+    astfel încât memoria nu crește cu mărimea catalogului. După fiecare lot scrie un checkpoint;
+    o rulare întreruptă continuă de la ultimul lot confirmat. Semantica e cea incrementală din run_ingest.
+    """
+    path = path or BOOKS_PATH
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Missing {path}. Place your JSON summaries file there.")
+    coll = vector_store.get_collection()
+    rebuilt = _compatible_collection(coll)
+    resume = resume and rebuilt is coll  # un checkpoint pentru colecția veche nu mai e valid
+    coll = rebuilt
+    skip = _load_checkpoint(path) if resume else 0
+    if skip:
+        print(f"[INGEST] Resuming {path} after {skip} records")
+
+    seen: Dict[str, int] = {}
+    stats = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+    dims = []
+
+    def documents():
+        for i, b in enumerate(iter_records(path)):
+            _id, text, meta = build_document(b, i, seen)
+            yield i, _id, text, meta
+
+    def batches():
+        batch = []
+        for i, _id, text, meta in documents():
+            if i < skip:
+                continue
+            batch.append((i, _id, text, meta))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def embedded():
+        for batch in _staged(batches(), queue_size):
+            ids = [d[1] for d in batch]
+            got = coll.get(ids=ids, include=["metadatas"])
+            old = {_id: (m or {}).get("content_hash") for _id, m in zip(got["ids"], got["metadatas"] or [])}
+            todo = [d for d in batch if old.get(d[1]) != d[3]["content_hash"]]
+            vectors = embed_texts([d[2] for d in todo]) if todo else []
+            for d in todo:
+                stats["changed" if d[1] in old else "added"] += 1
+            stats["unchanged"] += len(batch) - len(todo)
+            yield batch[-1][0] + 1, todo, vectors
+
+    for records_done, todo, vectors in _staged(embedded(), queue_size):
+        if todo:
+            if not dims:
+                dims.append(len(vectors[0]))
+                vector_store.record_embedding_info(coll, dims[0])
+            coll.upsert(ids=[d[1] for d in todo], embeddings=vectors,
+                        metadatas=[d[3] for d in todo], documents=[d[2] for d in todo])
+        _save_checkpoint(path, records_done)
+
+    # cărțile care nu mai apar în sursă (seen conține și înregistrările sărite la resume)
+    removed, offset = [], 0
+    while True:
+        page = coll.get(include=[], limit=UPSERT_BATCH, offset=offset)
+        ids = page.get("ids") or []
+        removed.extend(i for i in ids if not _seen_id(i, seen))
+        if len(ids) < UPSERT_BATCH:
+            break
+        offset += len(ids)
+    for start in range(0, len(removed), UPSERT_BATCH):
+        coll.delete(ids=removed[start:start + UPSERT_BATCH])
+    stats["removed"] = len(removed)
+    _clear_checkpoint()
+    changed = stats["added"] or stats["changed"] or stats["removed"]
+    vector_store.refresh_indexes(coll, bool(changed))
+    if changed:
+        vector_store.bump_generation()
+
+    print(f"[INGEST DONE] {sum(seen.values())} books (stream) -> {vector_store.CHROMA_DIR} "
+          f"(added={stats['added']}, changed={stats['changed']}, "
+          f"removed={stats['removed']}, unchanged={stats['unchanged']})")
+    return stats
 
 if __name__ == "__main__":
-    run_ingest()
+    ap = argparse.ArgumentParser(description="Seed/update the Chroma store from book_summaries.json")
+    ap.add_argument("--rebuild", action="store_true", help="delete the collection and re-embed everything")
+    ap.add_argument("--stream", action="store_true", help="bounded-memory streaming ingest (JSON array or JSONL)")
+    ap.add_argument("--source", default=None, help="catalog path (default: core/book_summaries.json)")
+    ap.add_argument("--no-resume", action="store_true", help="ignore an existing streaming checkpoint")
+    args = ap.parse_args()
+    if args.stream:
+        if args.rebuild:
+            recreate_collection()
+        run_ingest_streaming(args.source, resume=not args.no_resume)
+    else:
+        if args.source:
+            BOOKS_PATH = args.source
+        run_ingest(rebuild=args.rebuild)
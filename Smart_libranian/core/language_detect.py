@@ -0,0 +1,56 @@
+# core/language_detect.py
+# Detector local RO/EN (fără apel LLM): diacritice românești + profile de cuvinte frecvente.
+# Reutilizează listele RO/EN și eliminarea diacriticelor din filtrul de limbaj.
+from __future__ import annotations
+import re
+from typing import Optional, Tuple
+
+from core.language_filter import _strip_accents, BAD_WORDS_RO, BAD_WORDS_EN
+
+RO_DIACRITICS = set("ăâîșşțţĂÂÎȘŞȚŢ")
+
+STOPWORDS_RO = {
+    "si", "sau", "dar", "care", "ce", "cine", "unde", "cand", "cum", "de", "la", "din", "pe", "cu",
+    "pentru", "despre", "este", "sunt", "esti", "am", "ai", "are", "avem", "nu", "da", "o", "un",
+    "unei", "unui", "mai", "foarte", "vreau", "vrea", "doresc", "imi", "mi", "ma", "te", "ti", "eu",
+    "tu", "el", "ea", "noi", "voi", "ei", "ele", "acest", "aceasta", "asta", "ceva", "carte", "cartea",
+    "carti", "recomanda", "recomandati", "recomandare", "poti", "puteti", "spune", "ca",
+    "fie", "in", "intr", "dintr", "prin", "catre", "fara", "iubeste", "iubesc", "placut", "place",
+    "buna", "salut", "multumesc", "rog", "roman", "povestea", "rezumat",
+}
+STOPWORDS_EN = {
+    "the", "and", "or", "but", "which", "what", "who", "where", "when", "how", "of", "to", "from",
+    "on", "with", "for", "about", "is", "are", "am", "was", "were", "be", "have", "has", "do", "does",
+    "not", "no", "yes", "an", "more", "very", "want", "would", "like", "me", "my", "you", "your",
+    "i", "he", "she", "we", "they", "it", "this", "that", "something", "book", "books", "recommend",
+    "recommendation", "can", "could", "tell", "please", "thanks", "hello", "hi", "someone",
+    "loves", "love", "story", "stories", "novel", "summary", "in", "into", "by", "any", "some",
+}
+# cuvinte comune ambelor liste nu aduc informație
+_AMBIGUOUS = STOPWORDS_RO & STOPWORDS_EN
+_RO = (STOPWORDS_RO | BAD_WORDS_RO) - _AMBIGUOUS
+_EN = (STOPWORDS_EN | BAD_WORDS_EN) - _AMBIGUOUS
+
+MIN_MARGIN = 2.0  # diferența minimă de scor pentru un verdict sigur
+
+def detect_lang(text: str) -> Tuple[Optional[str], float]:
+    """
+    Returnează (lang, scor): lang este 'ro', 'en' sau None când textul nu e concludent
+    (altă limbă, prea scurt, amestecat) și trebuie lăsat pe seama LLM-ului.
+    """
+    raw = text or ""
+    ro = 2.0 * sum(1 for c in raw if c in RO_DIACRITICS)
+    en = 0.0
+    # fără LEET_MAP: aici cifrele ("1984") nu trebuie să devină litere
+    for w in re.findall(r"[a-z]+", _strip_accents(raw.lower())):
+        # cuvintele de 1-2 litere ("un", "la", "is") apar și în alte limbi: contează pe jumătate
+        weight = 0.5 if len(w) <= 2 else 1.0
+        if w in _RO:
+            ro += weight
+        elif w in _EN:
+            en += weight
+    if ro - en >= MIN_MARGIN:
+        return "ro", ro - en
+    if en - ro >= MIN_MARGIN:
+        return "en", en - ro
+    return None, abs(ro - en)
@@ -1,123 +1,164 @@
-from __future__ import annotations
-import re
-import unicodedata
-from typing import Tuple
-
-POLITE_REPLY_RO = (
-    "Îți răspund cu respect. Te rog să păstrăm o conversație civilizată. "
-    "Dacă ai o întrebare sau cauți o recomandare, sunt aici să te ajut."
-)
-
-POLITE_REPLY_EN = (
-    "I will answer you with respect. Please keep our conversation polite. "
-    "If you have a question or need a recommendation, I’m here to help."
-)
-
-# --- seturi separate RO / EN, apoi uniune (util pentru detectarea limbii) ---
-BAD_WORDS_RO = {
-    "pula", "pizda", "muie", "futut", "fute", "dracului", "javra",
-    "prost", "proasta", "idiot", "idiota", "imbecil", "tampit", "tampita",
-    "cretin", "cretina", "nesimtit", "nesimtita", "bou", "dobitoc", "jigar",
-    "handicapat", "handicapata", "retard", "retardat",
-}
-BAD_WORDS_EN = {
-    "fuck", "fucking", "fucker", "motherfucker", "shit", "bitch", "bastard",
-    "asshole", "dick", "cock", "pussy", "cunt", "slut",
-}
-BAD_WORDS = BAD_WORDS_RO | BAD_WORDS_EN
-
-# Substituții de „leet”
-LEET_MAP = str.maketrans({
-    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "@": "a", "$": "s"
-})
-
-def _strip_accents(s: str) -> str:
-    return "".join(c for c in unicodedata.normalize("NFKD", s) if not unicodedata.combining(c))
-
-def _normalize(text: str) -> str:
-    t = (text or "").lower()
-    t = _strip_accents(t)
-    t = t.translate(LEET_MAP)
-    t = re.sub(r"(.)\1{2,}", r"\1\1", t)  # reduce repetări (fuuuuck -> fuuck)
-    t = re.sub(r"\s+", " ", t)            # spații multiple -> unul singur
-    return t.strip()
-
-def _profanity_lang(norm_text: str) -> str:
-    """Returnează 'ro' sau 'en' în funcție de limba injuriei detectate."""
-    tokens = norm_text.split()
-
-    # 1) potrivire exactă pe token
-    for w in tokens:
-        if w in BAD_WORDS_RO:
-            return "ro"
-        if w in BAD_WORDS_EN:
-            return "en"
-
-    # 2) fallback substring (ex: 'idiot!!', 'ass-hole' după normalizare)
-    for bad in BAD_WORDS_RO:
-        if re.search(rf"{re.escape(bad)}", norm_text):
-            return "ro"
-    for bad in BAD_WORDS_EN:
-        if re.search(rf"{re.escape(bad)}", norm_text):
-            return "en"
-
-    # default rezonabil
-    return "ro"
-
-def polite_reply_for(text: str) -> str:
-    norm = _normalize(text)
-    return POLITE_REPLY_EN if _profanity_lang(norm) == "en" else POLITE_REPLY_RO
-
-def contains_profanity(text: str) -> bool:
-    norm = _normalize(text)
-
-    # 1) verificare directă pe cuvinte
-    words = norm.split()
-    for w in words:
-        if w in BAD_WORDS:
-            return True
-
-    # 2) fallback regex pentru forme cu simboluri sau intercalări (cr*etin, pr0st etc.)
-    for bad in BAD_WORDS:
-        if re.search(rf"{re.escape(bad)}", norm):
-            return True
-
-    # 3) expresii tip „esti bou/prost/cretin...”
-    if re.search(
-        r"\b(esti|eşti|sunt|pari|erai)\s+(foarte\s+)?"
-        r"(prost|proasta|bou|cretin|cretina|idiot|idiota|imbecil|tampit|tampita|nesimtit|nesimtita|dobitoc|handicapat|handicapata|retard|retardat)\b",
-        norm,
-    ):
-        return True
-
-    return False
-
-def censor(text: str) -> str:
-    def mask_word(w: str) -> str:
-        if len(w) <= 2:
-            return "★" * len(w)
-        return w[0] + "★" * (len(w) - 2) + w[-1]
-
-    tokens = re.findall(r"\w+|\W+", text, flags=re.UNICODE)
-    out = []
-    for t in tokens:
-        if re.search(r"\w", t) and contains_profanity(t):
-            out.append(mask_word(t))
-        else:
-            out.append(t)
-    return "".join(out)
-
-def filter_prompt(text: str, mode: str = "block") -> Tuple[bool, str]:
-    """
-    mode:
-      - "block": blochează complet → returnează mesaj politicos (RO/EN)
-      - "censor": cenzurează și lasă să treacă la LLM
-    returnează: (ok, text|mesaj)
-      - ok=False → NU trimitem la LLM, returnăm direct răspunsul
-      - ok=True  → text curățat (poate fi trimis la LLM)
-    """
-    if contains_profanity(text):
-        if mode == "censor":
-            return True, censor(text)
-        return False, polite_reply_for(text)
-    return True, text
+from __future__ import annotations
+import re
+import bisect
+import unicodedata
+from typing import Dict, List, Tuple
+
+POLITE_REPLY_RO = (
+    "Îți răspund cu respect. Te rog să păstrăm o conversație civilizată. "
+    "Dacă ai o întrebare sau cauți o recomandare, sunt aici să te ajut."
+)
+
+POLITE_REPLY_EN = (
+    "I will answer you with respect. Please keep our conversation polite. "
+    "If you have a question or need a recommendation, I’m here to help."
+)
+
+# --- seturi separate RO / EN, apoi uniune (util pentru detectarea limbii) ---
+BAD_WORDS_RO = {
+    "pula", "pizda", "muie", "futut", "fute", "dracului", "javra",
+    "prost", "proasta", "idiot", "idiota", "imbecil", "tampit", "tampita",
+    "cretin", "cretina", "nesimtit", "nesimtita", "bou", "dobitoc", "jigar",
+    "handicapat", "handicapata", "retard", "retardat",
+}
+BAD_WORDS_EN = {
+    "fuck", "fucking", "fucker", "motherfucker", "shit", "bitch", "bastard",
+    "asshole", "dick", "cock", "pussy", "cunt", "slut",
+}
+BAD_WORDS = BAD_WORDS_RO | BAD_WORDS_EN
+
+# Substituții de „leet”
+LEET_MAP = str.maketrans({
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "@": "a", "$": "s"
+})
+
+def _strip_accents(s: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", s) if not unicodedata.combining(c))
+
+def _normalize(text: str) -> str:
+    t = (text or "").lower()
+    t = _strip_accents(t)
+    t = t.translate(LEET_MAP)
+    t = re.sub(r"(.)\1{2,}", r"\1\1", t)  # reduce repetări (fuuuuck -> fuuck)
+    t = re.sub(r"\s+", " ", t)            # spații multiple -> unul singur
+    return t.strip()
+
+# --- un singur automat compilat (regex construit dintr-un trie) pentru toate cuvintele RO + EN ---
+def _trie_regex(words) -> str:
+    trie: dict = {}
+    for w in words:
+        node = trie
+        for c in w:
+            node = node.setdefault(c, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        end = "" in node
+        alts = [re.escape(c) + build(child) for c, child in sorted(node.items()) if c]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if end:
+            # cuvântul se poate opri aici; quantifier-ul greedy preferă continuarea (potrivirea cea mai lungă)
+            return "(?:" + body + ")?" if len(alts) > 1 or len(body) > 1 else body + "?"
+        return body
+
+    return build(trie)
+
+# lookahead: găsește potrivirea cea mai lungă la FIECARE poziție, inclusiv cele suprapuse
+_BAD_RE = re.compile("(?=(" + _trie_regex(BAD_WORDS) + "))")
+
+def _scan(norm_text: str) -> List[Tuple[int, int, str]]:
+    """O singură trecere peste textul normalizat: (start, end, limbă) pentru fiecare injurie găsită."""
+    return [
+        (m.start(), m.start() + len(m.group(1)), "ro" if m.group(1) in BAD_WORDS_RO else "en")
+        for m in _BAD_RE.finditer(norm_text)
+    ]
+
+def _lang_from_matches(norm_text: str, matches) -> str:
+    # 1) potrivire exactă pe token (primul token, în ordine, care este o injurie)
+    n = len(norm_text)
+    for start, end, lang in matches:
+        if (start == 0 or norm_text[start - 1] == " ") and (end == n or norm_text[end] == " "):
+            return lang
+    # 2) fallback substring (ex: 'idiot!!', 'ass-hole' după normalizare): RO are prioritate
+    langs = {lang for _, _, lang in matches}
+    if "ro" in langs:
+        return "ro"
+    if "en" in langs:
+        return "en"
+    # default rezonabil
+    return "ro"
+
+def _profanity_lang(norm_text: str) -> str:
+    """Returnează 'ro' sau 'en' în funcție de limba injuriei detectate."""
+    return _lang_from_matches(norm_text, _scan(norm_text))
+
+def find_profanity(text: str) -> List[Tuple[int, int, str]]:
+    """Injuriile din text ca (start, end, limbă); pozițiile sunt în textul normalizat."""
+    return _scan(_normalize(text))
+
+def polite_reply_for(text: str) -> str:
+    norm = _normalize(text)
+    return POLITE_REPLY_EN if _profanity_lang(norm) == "en" else POLITE_REPLY_RO
+
+def contains_profanity(text: str) -> bool:
+    # orice cuvânt din listă ca subșir al textului normalizat; acoperă și potrivirea pe token
+    # și expresiile tip „esti bou/prost/cretin...” (toate sunt în BAD_WORDS_RO)
+    return _BAD_RE.search(_normalize(text)) is not None
+
+def _mask_word(w: str) -> str:
+    if len(w) <= 2:
+        return "★" * len(w)
+    return w[0] + "★" * (len(w) - 2) + w[-1]
+
+_TOKEN_RE = re.compile(r"\w+|\W+", flags=re.UNICODE)
+_WORD_RE = re.compile(r"\w", flags=re.UNICODE)
+
+def censor(text: str) -> str:
+    tokens = _TOKEN_RE.findall(text)
+    words = [i for i, t in enumerate(tokens) if _WORD_RE.match(t)]
+    # normalizăm o singură dată cuvintele unite prin spațiu: nicio injurie nu conține spațiu,
+    # deci o potrivire nu trece de la un cuvânt la altul (aceeași decizie ca pe fiecare cuvânt separat)
+    parts = _normalize(" ".join(tokens[i] for i in words)).split(" ")
+    if len(parts) != len(words):
+        # un cuvânt s-a normalizat la gol: varianta sigură, cuvânt cu cuvânt
+        parts = [_normalize(tokens[i]) for i in words]
+    norm = " ".join(parts)
+
+    starts, pos = [], 0
+    for part in parts:
+        starts.append(pos)
+        pos += len(part) + 1
+
+    # intervalele găsite într-o singură trecere -> indicii cuvintelor de mascat
+    flagged = {words[bisect.bisect_right(starts, start) - 1] for start, _, _ in _scan(norm)}
+    return "".join(_mask_word(t) if i in flagged else t for i, t in enumerate(tokens))
+
+def filter_prompt(text: str, mode: str = "block") -> Tuple[bool, str]:
+    """
+    mode:
+      - "block": blochează complet → returnează mesaj politicos (RO/EN)
+      - "censor": cenzurează și lasă să treacă la LLM
+    returnează: (ok, text|mesaj)
+      - ok=False → NU trimitem la LLM, returnăm direct răspunsul
+      - ok=True  → text curățat (poate fi trimis la LLM)
+    """
+    norm = _normalize(text)
+    matches = _scan(norm)
+    if matches:
+        if mode == "censor":
+            return True, censor(text)
+        return False, POLITE_REPLY_EN if _lang_from_matches(norm, matches) == "en" else POLITE_REPLY_RO
+    return True, text
+
+def filter_many(texts: List[str], mode: str = "block") -> List[Tuple[bool, str]]:
+    """filter_prompt pe un lot de texte; textele identice sunt procesate o singură dată."""
+    done: Dict[str, Tuple[bool, str]] = {}
+    out = []
+    for t in texts:
+        r = done.get(t)
+        if r is None:
+            r = done[t] = filter_prompt(t, mode=mode)
+        out.append(r)
+    return out
@@ -0,0 +1,132 @@
+# core/lexical_index.py
+# Index invers BM25 peste titlu, teme și rezumat, construit la ingest și salvat lângă store-ul Chroma.
+# Răspunde instant la interogări literale (o temă, un nume, un titlu) fără apel de embedding.
+import os
+import re
+import json
+import math
+import heapq
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.catalog import normalize_title
+from core.language_detect import STOPWORDS_RO, STOPWORDS_EN
+
+INDEX_VERSION = 1
+STEM_LEN = 7              # trunchiere la prefix: "distopie"/"distopic"/"distopia" -> "distopi"
+BM25_K1 = 1.2
+BM25_B = 0.75
+# un termen din titlu sau din teme contează mai mult decât unul din rezumat
+FIELD_WEIGHTS = {"title": 3, "themes": 2, "summary": 1}
+# încredere pentru modul "auto": primul rezultat acoperă interogarea și se distanțează de al doilea
+LEXICAL_MIN_COVERAGE = float(os.getenv("LEXICAL_MIN_COVERAGE", "1.0"))
+LEXICAL_MIN_MARGIN = float(os.getenv("LEXICAL_MIN_MARGIN", "1.5"))
+
+_STOP = {normalize_title(w) for w in STOPWORDS_RO | STOPWORDS_EN} | {
+    "title", "themes", "summary", "carte", "carti", "cartea", "roman", "book", "books", "novel",
+    "despre", "about", "vreau", "want", "ceva", "something", "recomanzi", "recomanda", "recommend",
+}
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+def tokenize(text: str) -> List[str]:
+    out = []
+    for w in _WORD_RE.findall(normalize_title(text)):
+        if w in _STOP or (len(w) < 3 and not w.isdigit()):
+            continue
+        out.append(w[:STEM_LEN])
+    return out
+
+def parse_document(doc: str) -> Dict[str, str]:
+    """Desface textul documentului din ingest ("Title: ...\\nThemes: ...\\nSummary: ...") pe câmpuri."""
+    fields = {"title": "", "themes": "", "summary": ""}
+    current = "summary"
+    for line in (doc or "").splitlines():
+        head, sep, rest = line.partition(":")
+        key = head.strip().lower()
+        if sep and key in fields:
+            current = key
+            fields[key] = rest.strip()
+        else:
+            fields[current] = (fields[current] + "\n" + line).strip()
+    return fields
+
+class LexicalIndex:
+    def __init__(self, ids: List[str], titles: List[str], lengths: List[float],
+                 postings: Dict[str, List[List[float]]]):
+        self.ids = ids
+        self.titles = titles
+        self.lengths = lengths
+        self.postings = postings
+        self.avgdl = (sum(lengths) / len(lengths)) if lengths else 0.0
+        n = len(ids)
+        self.idf = {t: math.log(1.0 + (n - len(p) + 0.5) / (len(p) + 0.5)) for t, p in postings.items()}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, docs: Iterable[Tuple[str, str]]) -> "LexicalIndex":
+        """docs: perechi (id, text document)."""
+        ids, titles, lengths = [], [], []
+        postings: Dict[str, List[List[float]]] = {}
+        for _id, doc in docs:
+            fields = parse_document(doc)
+            tf: Counter = Counter()
+            for field, weight in FIELD_WEIGHTS.items():
+                for tok in tokenize(fields[field]):
+                    tf[tok] += weight
+            d = len(ids)
+            ids.append(_id)
+            titles.append(fields["title"])
+            lengths.append(float(sum(tf.values())))
+            for tok, f in tf.items():
+                postings.setdefault(tok, []).append([d, f])
+        return cls(ids, titles, lengths, postings)
+
+    def save(self, path: str):
+        tmp = path + ".tmp"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "ids": self.ids, "titles": self.titles,
+                       "lengths": self.lengths, "postings": self.postings}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["LexicalIndex"]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != INDEX_VERSION:
+            return None
+        return cls(data["ids"], data["titles"], data["lengths"], data["postings"])
+
+    def search(self, query: str, k: int = 10) -> List[Dict]:
+        """Top-k BM25: [{"id", "title", "score", "coverage"}]; coverage = fracția termenilor interogării găsiți."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.ids:
+            return []
+        scores: Dict[int, float] = {}
+        matched: Dict[int, int] = {}
+        for t in terms:
+            plist = self.postings.get(t)
+            if not plist:
+                continue
+            idf = self.idf[t]
+            for d, f in plist:
+                norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self.lengths[d] / self.avgdl)
+                scores[d] = scores.get(d, 0.0) + idf * f * (BM25_K1 + 1.0) / (f + norm)
+                matched[d] = matched.get(d, 0) + 1
+        best = heapq.nsmallest(k, scores.items(), key=lambda x: (-x[1], x[0]))
+        return [{"id": self.ids[d], "title": self.titles[d], "score": s, "coverage": matched[d] / len(terms)}
+                for d, s in best]
+
+    @staticmethod
+    def confident(results: List[Dict]) -> bool:
+        """Primul rezultat conține toți termenii interogării și are scor clar peste al doilea."""
+        if not results or results[0]["coverage"] < LEXICAL_MIN_COVERAGE:
+            return False
+        if len(results) == 1:
+            return True
+        return results[0]["score"] >= LEXICAL_MIN_MARGIN * results[1]["score"]
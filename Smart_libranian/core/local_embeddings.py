@@ -0,0 +1,176 @@
+# core/local_embeddings.py
+# Embedding-uri locale, pe CPU, fără rețea:
+#   - HashedNgramEmbedder: cuvinte, bigrame de cuvinte și n-grame de caractere (3-5) proiectate prin hashing
+#     într-un vector de dimensiune fixă; complet vectorizat cu NumPy și determinist între procese/mașini.
+#   - OnnxEmbedder: un model de tip sentence-transformer exportat ONNX (ex. all-MiniLM-L6-v2), dacă există
+#     pe disc împreună cu onnxruntime + tokenizers.
+import os
+import re
+import zlib
+import hashlib
+from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
+
+from core.catalog import normalize_title
+
+HASH_DIM = int(os.getenv("EMBED_HASH_DIM", "512"))
+CHAR_NGRAMS = (3, 4, 5)
+WORD_WEIGHT = 1.0
+BIGRAM_WEIGHT = 0.5
+CHAR_WEIGHT = 0.25
+ONNX_BATCH = 32
+ONNX_MAX_TOKENS = 256
+ONNX_DIRS = [
+    os.getenv("EMBED_ONNX_DIR", os.path.join(os.path.dirname(__file__), ".onnx_model")),
+    # modelul implicit descărcat de Chroma, dacă a fost folosit vreodată pe mașina asta
+    os.path.expanduser("~/.cache/chroma/onnx_models/all-MiniLM-L6-v2/onnx"),
+]
+ONNX_MODEL_NAME = os.getenv("ONNX_MODEL_NAME")  # numele modelului în identitatea providerului; gol = din director
+ONNX_FINGERPRINT_BYTES = 1 << 20                # cât din model.onnx intră în amprentă
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_M1 = np.uint64(0xFF51AFD7ED558CCD)
+_M2 = np.uint64(0xC4CEB9FE1A85EC53)
+_GOLDEN = 0x9E3779B97F4A7C15
+_PRIME = np.uint64(1000003)
+
+@lru_cache(maxsize=65536)
+def _fold(word: str) -> str:
+    # normalizarea e scumpă caracter cu caracter; cuvintele se repetă mult, deci o facem o dată pe cuvânt
+    return normalize_title(word)
+
+def _mix(h: np.ndarray, salt: int) -> np.ndarray:
+    # finalizatorul murmur3 pe 64 de biți: biți bine amestecați pentru index și semn
+    h = h ^ np.uint64((salt * _GOLDEN) & 0xFFFFFFFFFFFFFFFF)
+    h ^= h >> np.uint64(33)
+    h *= _M1
+    h ^= h >> np.uint64(33)
+    h *= _M2
+    h ^= h >> np.uint64(33)
+    return h
+
+def _char_ngram_hashes(codes: np.ndarray, ends: np.ndarray, n: int):
+    """Hash-urile n-gramelor de caractere peste toate textele concatenate, fără ferestre peste granițe."""
+    count = len(codes) - n + 1
+    if count <= 0:
+        return np.empty(0, dtype=np.uint64), np.zeros(0, dtype=bool)
+    h = codes[:count].copy()
+    for j in range(1, n):
+        h = h * _PRIME + codes[j:j + count]  # hash polinomial, modulo 2^64
+    valid = np.arange(count) + n <= ends[:count]
+    return _mix(h[valid], n), valid
+
+class HashedNgramEmbedder:
+    name = "hashed"
+    cacheable = False  # mai rapid decât o citire din cache
+
+    def __init__(self, dim: int = HASH_DIM):
+        self.dim = dim
+        self.model = f"ngram-{dim}-v1"
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        # partea Python: doar tokenizarea și crc32 pe cuvinte; restul e NumPy pe tot lotul deodată
+        word_h, word_rows, pair_h, pair_rows, padded = [], [], [], [], []
+        for i, t in enumerate(texts):
+            words = [f for f in map(_fold, _WORD_RE.findall(t.lower())) if f]
+            word_h.extend(zlib.crc32(x.encode("utf-8")) for x in words)
+            word_rows.extend([i] * len(words))
+            pair_h.extend(zlib.crc32(f"{a} {c}".encode("utf-8")) for a, c in zip(words, words[1:]))
+            pair_rows.extend([i] * max(len(words) - 1, 0))
+            padded.append(" " + " ".join(words) + " " if words else "")
+
+        lengths = np.fromiter(map(len, padded), dtype=np.int64, count=len(padded))
+        codes = np.frombuffer("".join(padded).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        char_rows = np.repeat(np.arange(len(texts)), lengths)
+        ends = np.repeat(np.cumsum(lengths), lengths)
+
+        hashes = [_mix(np.array(word_h, dtype=np.uint64), 1), _mix(np.array(pair_h, dtype=np.uint64), 2)]
+        rows = [np.array(word_rows, dtype=np.int64), np.array(pair_rows, dtype=np.int64)]
+        weights = [np.full(len(word_h), WORD_WEIGHT), np.full(len(pair_h), BIGRAM_WEIGHT)]
+        for n in CHAR_NGRAMS:
+            h, valid = _char_ngram_hashes(codes, ends, n)
+            hashes.append(h)
+            rows.append(char_rows[:len(valid)][valid])
+            weights.append(np.full(len(h), CHAR_WEIGHT))
+
+        h = np.concatenate(hashes)
+        idx = (h % np.uint64(self.dim)).astype(np.int64)
+        sign = np.where((h >> np.uint64(63)) == 1, -1.0, 1.0)
+        flat = np.concatenate(rows) * self.dim + idx
+        mat = np.bincount(flat, weights=np.concatenate(weights) * sign, minlength=len(texts) * self.dim)
+        mat = mat.reshape(len(texts), self.dim)
+        mat = np.sign(mat) * np.log1p(np.abs(mat))  # tf sublinear: cuvintele repetate nu domină
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (mat / norms).astype(np.float32)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_array(texts).tolist()
+
+def find_onnx_model() -> Optional[str]:
+    """Primul director cu model.onnx + tokenizer.json, dacă onnxruntime și tokenizers sunt instalate."""
+    try:
+        import onnxruntime  # noqa: F401
+        import tokenizers  # noqa: F401
+    except ImportError:
+        return None
+    for d in ONNX_DIRS:
+        if os.path.isfile(os.path.join(d, "model.onnx")) and os.path.isfile(os.path.join(d, "tokenizer.json")):
+            return d
+    return None
+
+def onnx_model_id(model_dir: str) -> str:
+    """
+    Identitatea modelului (cheia de cache și metadatele colecției): numele lui plus o amprentă a fișierului
+    model.onnx (mărime + sha1 pe primul MiB), ca înlocuirea fișierelor din același director să fie observată.
+    """
+    path = os.path.normpath(os.path.abspath(model_dir))
+    name = ONNX_MODEL_NAME or os.path.basename(path)
+    if not ONNX_MODEL_NAME and name == "onnx":
+        name = os.path.basename(os.path.dirname(path))  # cache-ul Chroma: .../all-MiniLM-L6-v2/onnx
+    model_file = os.path.join(model_dir, "model.onnx")
+    h = hashlib.sha1(str(os.path.getsize(model_file)).encode())
+    with open(model_file, "rb") as f:
+        h.update(f.read(ONNX_FINGERPRINT_BYTES))
+    return f"{name.lstrip('.') or 'onnx'}-{h.hexdigest()[:10]}"
+
+class OnnxEmbedder:
+    name = "onnx"
+    cacheable = True
+
+    def __init__(self, model_dir: str):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+        self.model_dir = model_dir
+        self.model = onnx_model_id(model_dir)
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=ONNX_MAX_TOKENS)
+        self.tokenizer.enable_padding()
+        self.session = ort.InferenceSession(os.path.join(model_dir, "model.onnx"),
+                                            providers=["CPUExecutionProvider"])
+        self.inputs = {i.name for i in self.session.get_inputs()}
+        self.dim = int(self.embed_array(["dim"]).shape[1])
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        out = []
+        for start in range(0, len(texts), ONNX_BATCH):
+            enc = self.tokenizer.encode_batch(texts[start:start + ONNX_BATCH])
+            ids = np.array([e.ids for e in enc], dtype=np.int64)
+            mask = np.array([e.attention_mask for e in enc], dtype=np.int64)
+            feed = {"input_ids": ids, "attention_mask": mask}
+            if "token_type_ids" in self.inputs:
+                feed["token_type_ids"] = np.zeros_like(ids)
+            hidden = self.session.run(None, feed)[0]
+            # mean pooling peste token-urile reale, apoi normalizare L2
+            m = mask[..., None].astype(np.float32)
+            pooled = (hidden * m).sum(axis=1) / np.maximum(m.sum(axis=1), 1e-9)
+            pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+            out.append(pooled.astype(np.float32))
+        return np.concatenate(out) if out else np.zeros((0, 0), dtype=np.float32)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_array(texts).tolist()
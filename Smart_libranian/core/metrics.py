@@ -0,0 +1,249 @@
+# core/metrics.py
+# Instrumentare ușoară, fără dependențe, comună backend-ului și frontend-ului:
+#   - histograme de latență per etapă (rina_stage_seconds{stage}) și per rută (rina_request_seconds{handler});
+#   - contoare (apeluri LLM, token-uri, cache hit/miss, operații pe baza de date, ...);
+#   - export în formatul text Prometheus pentru /metrics;
+#   - la cerere (header X-Debug-Timing: 1 sau TIMING_HEADER=1), defalcarea pe etape a unei cereri în
+#     header-ul de răspuns Server-Timing. Etapele unei cereri se adună într-un ContextVar, deci merg la fel
+#     pe thread-urile Flask și pe task-urile asyncio (inclusiv prin asyncio.to_thread).
+# Fiecare proces are propriul registru: cu mai mulți workeri, Prometheus îi citește pe fiecare separat.
+import os
+import re
+import time
+import threading
+import contextvars
+from bisect import bisect_left
+from functools import wraps
+from typing import Dict, List, Optional, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS", "1") != "0"
+TIMING_HEADER = os.getenv("TIMING_HEADER", "0") == "1"   # Server-Timing la fiecare răspuns, nu doar la cerere
+TIMING_REQUEST_HEADER = "X-Debug-Timing"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# secunde; de la verificările locale (sub o milisecundă) până la completări LLM lente
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    "rina_stage_seconds": ("histogram", "Latency of one pipeline stage."),
+    "rina_request_seconds": ("histogram", "HTTP request latency by handler."),
+    "rina_http_responses_total": ("counter", "HTTP responses by handler and status code."),
+    "rina_llm_calls_total": ("counter", "Calls to the LLM/embedding provider by kind and outcome."),
+    "rina_llm_tokens_total": ("counter", "Tokens reported by the provider (streams: content chunks)."),
+    "rina_cache_total": ("counter", "Cache lookups by cache and result."),
+    "rina_db_ops_total": ("counter", "ConversationDB operations."),
+    "rina_answer_path_total": ("counter", "/chat answers by pipeline path."),
+    "rina_backend_pings_total": ("counter", "Backend health checks from the frontend."),
+}
+
+_lock = threading.Lock()
+_histograms: Dict[Tuple[str, tuple], list] = {}   # (nume, etichete) -> [număr pe bucket..., +Inf, sumă]
+_counters: Dict[Tuple[str, tuple], float] = {}
+
+class Trace:
+    """Etapele unei singure cereri, în ordinea în care s-au terminat."""
+    __slots__ = ("start", "stages", "wanted")
+
+    def __init__(self, wanted: bool = False):
+        self.start = time.perf_counter()
+        self.stages: List[Tuple[str, float]] = []
+        self.wanted = wanted
+
+_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("rina_trace", default=None)
+
+def _labels(labels: Dict) -> tuple:
+    if len(labels) < 2:
+        return tuple(labels.items())
+    return tuple(sorted(labels.items()))
+
+def observe(name: str, seconds: float, **labels):
+    if METRICS_ENABLED:
+        _observe((name, _labels(labels)), seconds)
+
+def _observe(key: tuple, seconds: float):
+    i = bisect_left(BUCKETS, seconds)  # le e inclusiv: primul bucket cu limita >= valoare
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+        h[i] += 1
+        h[-1] += seconds
+
+def inc(name: str, value: float = 1, **labels):
+    if not METRICS_ENABLED:
+        return
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def record(name: str, seconds: float):
+    """O etapă deja cronometrată: în histogramă și în trasarea cererii curente."""
+    if not METRICS_ENABLED:
+        return
+    _observe(("rina_stage_seconds", (("stage", name),)), seconds)
+    trace = _trace.get()
+    if trace is not None:
+        trace.stages.append((name, seconds))
+
+class _Stage:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.t0)
+        return False
+
+class _NoStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_STAGE = _NoStage()
+
+def stage(name: str):
+    """`with stage("title_scan"): ...` — cronometrează blocul (merge și în jurul unui await)."""
+    return _Stage(name) if METRICS_ENABLED else _NO_STAGE
+
+def timed(name: str):
+    """Decorator: fiecare apel al funcției devine etapa `name`."""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+# ---------- trasarea unei cereri ----------
+def timing_requested(header_value: Optional[str]) -> bool:
+    return TIMING_HEADER or (header_value or "").strip().lower() in ("1", "true", "yes")
+
+def start_trace(wanted: bool = False):
+    """Deschide trasarea cererii curente; întoarce token-ul pentru end_trace."""
+    return _trace.set(Trace(wanted))
+
+def current_trace() -> Optional[Trace]:
+    return _trace.get()
+
+def end_trace(token=None):
+    """Închide trasarea; fără token (Flask, unde cererile refolosesc thread-ul) o șterge pur și simplu."""
+    if token is None:
+        _trace.set(None)
+    else:
+        _trace.reset(token)
+
+_SERVER_TIMING_RE = re.compile(r"([\w.\-]+);dur=([0-9.]+)")
+
+def add_remote(prefix: str, header_value: Optional[str]):
+    """Adaugă la cererea curentă etapele raportate de un serviciu apelat (header-ul lui Server-Timing)."""
+    trace = _trace.get()
+    if trace is None or not header_value:
+        return
+    for name, ms in _SERVER_TIMING_RE.findall(header_value):
+        if name != "total":
+            trace.stages.append((f"{prefix}{name}", float(ms) / 1000.0))
+
+def server_timing(trace: Trace) -> str:
+    """Valoarea Server-Timing: etapele cu același nume sunt adunate (desc = de câte ori au rulat), plus total."""
+    total: Dict[str, float] = {}
+    count: Dict[str, int] = {}
+    for name, dt in trace.stages:
+        total[name] = total.get(name, 0.0) + dt
+        count[name] = count.get(name, 0) + 1
+    parts = [f"{name};dur={dt * 1000:.2f}" + (f';desc="{count[name]}x"' if count[name] > 1 else "")
+             for name, dt in total.items()]
+    parts.append(f"total;dur={(time.perf_counter() - trace.start) * 1000:.2f}")
+    return ", ".join(parts)
+
+def finish_request(trace: Trace, handler: str, status: int):
+    observe("rina_request_seconds", time.perf_counter() - trace.start, handler=handler)
+    inc("rina_http_responses_total", handler=handler, status=str(status))
+
+class TimingMiddleware:
+    """Middleware ASGI (FastAPI): trasare per cerere, latența pe rută și Server-Timing la cerere."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        wanted = timing_requested(_header(scope, TIMING_REQUEST_HEADER.lower().encode()))
+        token = start_trace(wanted)
+        trace = _trace.get()
+        status = 500
+
+        async def send_timed(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if trace.wanted:
+                    # la răspunsurile pe flux conține doar etapele terminate înainte de primul octet
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing(trace).encode("latin-1")))
+                    message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            endpoint = scope.get("endpoint")
+            finish_request(trace, getattr(endpoint, "__name__", "unmatched"), status)
+            end_trace(token)
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for k, v in scope.get("headers", ()):
+        if k == name:
+            return v.decode("latin-1")
+    return None
+
+# ---------- export ----------
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _fmt_labels(labels: tuple, extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _fmt_value(v) -> str:
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+def render() -> str:
+    """Toate seriile procesului în formatul text Prometheus 0.0.4."""
+    with _lock:
+        hists = {k: list(v) for k, v in _histograms.items()}
+        counters = dict(_counters)
+    lines: List[str] = []
+    for name in sorted({k[0] for k in hists} | {k[0] for k in counters}):
+        kind, text = HELP.get(name, ("counter" if name in {k[0] for k in counters} else "histogram", name))
+        lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for (n, labels), h in sorted(hists.items()):
+            if n != name:
+                continue
+            cumulative = 0
+            for le, c in zip(BUCKETS + ("+Inf",), h[:-1]):
+                cumulative += c
+                bound = f'le="{le}"'
+                lines.append(f"{name}_bucket{_fmt_labels(labels, bound)} {cumulative}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {h[-1]!r}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {cumulative}")
+        for (n, labels), v in sorted(counters.items()):
+            if n == name:
+                lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(v)}")
+    return "\n".join(lines) + "\n"
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
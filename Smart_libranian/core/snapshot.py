@@ -0,0 +1,132 @@
+# core/snapshot.py
+# Snapshot-ul store-ului (Chroma + indexul lexical + indexul NumPy) împachetat într-o arhivă, ca prima pornire
+# să-l despacheteze în loc să re-embeduiască tot catalogul:
+#   python -m core.snapshot create      # după ingest, înainte de împachetare / release
+#   python -m core.snapshot restore     # run.py o face singur când lipsește core/.chroma_store
+# Manifestul reține providerul de embedding și digest-ul catalogului: un snapshot construit cu alt provider
+# e ignorat (ingest complet), iar unul cu alt catalog e restaurat și completat de ingest-ul incremental,
+# care re-embeduiește doar cărțile noi/modificate.
+import os, io, json, time, shutil, tarfile, tempfile, argparse
+from typing import Dict, Optional
+from core import vector_store
+from core.catalog import get_catalog
+from core.embeddings import check_compatible, EmbeddingMismatchError
+
+SNAPSHOT_PATH = os.getenv("STORE_SNAPSHOT", os.path.join(vector_store.BASE_DIR, "store_snapshot.tar.gz"))
+SNAPSHOT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+STORE_ARCNAME = "store"
+SKIP_FILES = {".ingest_checkpoint.json"}   # starea unui ingest întrerupt nu face parte din snapshot
+
+def create(path: str = None) -> Dict:
+    """Arhivează store-ul curent (trebuie să existe și să nu fie gol). Întoarce manifestul."""
+    path = path or SNAPSHOT_PATH
+    if not os.path.isdir(vector_store.CHROMA_DIR):
+        raise FileNotFoundError(f"Missing {vector_store.CHROMA_DIR}; run python -m core.ingest first.")
+    coll = vector_store.get_collection()
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "created": int(time.time()),
+        "count": coll.count(),
+        "catalog_digest": get_catalog().digest,
+        "metadata": {k: v for k, v in (coll.metadata or {}).items() if not k.startswith("hnsw:")},
+    }
+    if not manifest["count"]:
+        raise RuntimeError("The store is empty; run python -m core.ingest first.")
+    vector_store.close_store()  # Chroma închide baza SQLite înainte să copiem fișierele
+
+    def skip(info: tarfile.TarInfo):
+        return None if os.path.basename(info.name) in SKIP_FILES else info
+
+    tmp = path + ".tmp"
+    with tarfile.open(tmp, "w:gz") as tar:
+        raw = json.dumps(manifest, indent=2).encode("utf-8")
+        info = tarfile.TarInfo(MANIFEST_NAME)
+        info.size, info.mtime = len(raw), manifest["created"]
+        tar.addfile(info, io.BytesIO(raw))  # primul membru: read_manifest nu parcurge restul arhivei
+        tar.add(vector_store.CHROMA_DIR, arcname=STORE_ARCNAME, filter=skip)
+    os.replace(tmp, path)
+    return manifest
+
+def read_manifest(path: str = None) -> Optional[Dict]:
+    path = path or SNAPSHOT_PATH
+    try:
+        with tarfile.open(path, "r:gz") as tar:
+            first = tar.next()
+            if first is None or first.name != MANIFEST_NAME:
+                return None
+            return json.load(tar.extractfile(first))
+    except (OSError, tarfile.TarError, ValueError):
+        return None
+
+def _store_members(tar: tarfile.TarFile):
+    for m in tar.getmembers():
+        parts = m.name.split("/")
+        if parts[0] == STORE_ARCNAME and ".." not in parts and (m.isfile() or m.isdir()):
+            yield m
+
+def restore(path: str = None) -> Optional[Dict]:
+    """
+    Despachetează snapshot-ul în CHROMA_DIR (care nu trebuie să existe). Întoarce manifestul,
+    sau None dacă nu există snapshot ori a fost construit cu alt provider de embedding.
+    """
+    path = path or SNAPSHOT_PATH
+    if not os.path.exists(path):
+        return None
+    manifest = read_manifest(path)
+    if manifest is None or manifest.get("version") != SNAPSHOT_VERSION:
+        print(f"[WARN] Ignoring {path}: not a store snapshot (version {SNAPSHOT_VERSION}).")
+        return None
+    try:
+        check_compatible(manifest.get("metadata"), manifest.get("count", 0))
+    except EmbeddingMismatchError as e:
+        print(f"[WARN] Ignoring {path}: {e}")
+        return None
+    target = vector_store.CHROMA_DIR
+    if os.path.exists(target):
+        raise FileExistsError(f"{target} already exists; remove it to restore the snapshot.")
+    parent = os.path.dirname(os.path.abspath(target))
+    os.makedirs(parent, exist_ok=True)
+    # despachetăm alături și mutăm dintr-o bucată: un restore întrerupt nu lasă un store pe jumătate
+    tmp = tempfile.mkdtemp(prefix=".snapshot_", dir=parent)
+    try:
+        with tarfile.open(path, "r:gz") as tar:
+            kwargs = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+            tar.extractall(tmp, members=list(_store_members(tar)), **kwargs)
+        os.replace(os.path.join(tmp, STORE_ARCNAME), target)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    vector_store.bump_generation()  # generație nouă: nimic din cache-uri nu se leagă de marcajul din arhivă
+    return manifest
+
+def ensure_store() -> str:
+    """
+    Pentru pornire: store-ul existent, altfel snapshot-ul (plus ingest incremental dacă s-a schimbat
+    catalogul), altfel ingest complet. Întoarce sursa folosită.
+    """
+    if os.path.isdir(vector_store.CHROMA_DIR):
+        return "existing"
+    manifest = restore()
+    if manifest is not None and manifest.get("catalog_digest") == get_catalog().digest:
+        return "snapshot"
+    from core import ingest
+    ingest.run_ingest()
+    return "snapshot+ingest" if manifest is not None else "ingest"
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Create/restore a prebuilt snapshot of the vector store")
+    ap.add_argument("action", choices=["create", "restore", "info"])
+    ap.add_argument("--path", default=None, help=f"archive path (default: {SNAPSHOT_PATH})")
+    ap.add_argument("--force", action="store_true", help="restore: replace an existing store")
+    args = ap.parse_args()
+    if args.action == "create":
+        m = create(args.path)
+        size = os.path.getsize(args.path or SNAPSHOT_PATH) / 1024
+        print(f"[INFO] Snapshot {args.path or SNAPSHOT_PATH}: {m['count']} books, {size:.0f} KiB")
+    elif args.action == "restore":
+        if args.force and os.path.isdir(vector_store.CHROMA_DIR):
+            shutil.rmtree(vector_store.CHROMA_DIR)
+        m = restore(args.path)
+        print(f"[INFO] Restored {m['count']} books." if m else "[WARN] Nothing restored.")
+    else:
+        print(json.dumps(read_manifest(args.path), indent=2))
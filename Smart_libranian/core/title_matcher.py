@@ -0,0 +1,179 @@
+# core/title_matcher.py
+# Automat Aho–Corasick peste titlurile normalizate din catalog: găsește toate titlurile menționate
+# într-o întrebare printr-o singură trecere, indiferent de numărul de cărți.
+# Opțional: potrivire toleranta la greșeli de tastare (o editare) prin vecinătăți de ștergere.
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from core.catalog import get_catalog, normalize_title
+
+FUZZY_MIN_LEN = 5       # titluri mai scurte nu se potrivesc aproximativ ("ion" ar prinde orice)
+FUZZY_MAX_EDITS = 1
+FUZZY_MAX_WORDS = 8     # ferestre de cuvinte verificate în întrebare
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum()
+
+def _levenshtein(a: str, b: str, limit: int) -> int:
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+def _deletes(s: str) -> List[str]:
+    return [s[:i] + s[i + 1:] for i in range(len(s))]
+
+class TitleMatcher:
+    def __init__(self, titles: List[str]):
+        self.titles: List[str] = []
+        self.patterns: List[str] = []
+        # trie: tranzițiile fiecărei stări, legătura de eșec, pattern-ul care se termină aici,
+        # și legătura "dictionary suffix" către următoarea stare cu pattern (pentru toate potrivirile)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[int] = [-1]
+        self._dict: List[int] = [0]
+        self._fuzzy: Optional[Dict[str, List[int]]] = None
+        self._fuzzy_lock = threading.Lock()
+
+        seen = set()
+        for t in titles:
+            norm = normalize_title(t)
+            if not norm or norm in seen:
+                continue
+            seen.add(norm)
+            self._add(norm, len(self.titles))
+            self.titles.append(t)
+            self.patterns.append(norm)
+        self._build()
+
+    def __len__(self):
+        return len(self.titles)
+
+    def _add(self, pattern: str, pid: int):
+        s = 0
+        for c in pattern:
+            nxt = self._goto[s].get(c)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[s][c] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(-1)
+                self._dict.append(0)
+            s = nxt
+        self._out[s] = pid
+
+    def _build(self):
+        q = deque(self._goto[0].values())
+        while q:
+            s = q.popleft()
+            for c, nxt in self._goto[s].items():
+                q.append(nxt)
+                f = self._fail[s]
+                while f and c not in self._goto[f]:
+                    f = self._fail[f]
+                fn = self._goto[f].get(c, 0)
+                self._fail[nxt] = fn if fn != nxt else 0
+                fl = self._fail[nxt]
+                self._dict[nxt] = fl if self._out[fl] >= 0 else self._dict[fl]
+
+    def _find_norm(self, text: str, whole_words: bool) -> List[Tuple[int, int, int]]:
+        goto, fail, out, dlink, patterns = self._goto, self._fail, self._out, self._dict, self.patterns
+        n = len(text)
+        found = []
+        s = 0
+        for i, c in enumerate(text):
+            while s and c not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(c, 0)
+            o = s if out[s] >= 0 else dlink[s]
+            while o:
+                pid = out[o]
+                start = i + 1 - len(patterns[pid])
+                if not whole_words or (
+                    (start == 0 or not _is_word_char(text[start - 1]))
+                    and (i + 1 == n or not _is_word_char(text[i + 1]))
+                ):
+                    found.append((start, i + 1, pid))
+                o = dlink[o]
+        return found
+
+    def find_all(self, text: str, whole_words: bool = True) -> List[Tuple[int, int, str]]:
+        """Toate mențiunile (start, end, titlu), pe textul normalizat, ne-suprapuse, preferând cele mai lungi."""
+        norm = normalize_title(text)
+        hits = sorted(self._find_norm(norm, whole_words), key=lambda h: (-(h[1] - h[0]), h[0]))
+        taken, out = [], []
+        for start, end, pid in hits:
+            if any(start < e and s < end for s, e in taken):
+                continue
+            taken.append((start, end))
+            out.append((start, end, self.titles[pid]))
+        return sorted(out)
+
+    def best(self, text: str, fuzzy: bool = False) -> Optional[str]:
+        """Cel mai lung titlu menționat; cu fuzzy=True încearcă și potriviri cu o greșeală de tastare."""
+        hits = self.find_all(text)
+        if hits:
+            return max(hits, key=lambda h: (h[1] - h[0], -h[0]))[2]
+        if fuzzy:
+            return self._best_fuzzy(normalize_title(text))
+        return None
+
+    # --- potrivire aproximativă ---
+    def _fuzzy_index(self) -> Dict[str, List[int]]:
+        if self._fuzzy is None:
+            with self._fuzzy_lock:
+                if self._fuzzy is None:
+                    idx: Dict[str, List[int]] = {}
+                    for pid, p in enumerate(self.patterns):
+                        if len(p) < FUZZY_MIN_LEN:
+                            continue
+                        for key in {p, *_deletes(p)}:
+                            idx.setdefault(key, []).append(pid)
+                    self._fuzzy = idx
+        return self._fuzzy
+
+    def _best_fuzzy(self, norm: str) -> Optional[str]:
+        idx = self._fuzzy_index()
+        words = [w for w in "".join(c if _is_word_char(c) else " " for c in norm).split()]
+        best = None
+        for size in range(min(FUZZY_MAX_WORDS, len(words)), 0, -1):
+            for i in range(len(words) - size + 1):
+                window = " ".join(words[i:i + size])
+                if len(window) < FUZZY_MIN_LEN - FUZZY_MAX_EDITS:
+                    continue
+                for key in {window, *_deletes(window)}:
+                    for pid in idx.get(key, ()):
+                        p = self.patterns[pid]
+                        if _levenshtein(window, p, FUZZY_MAX_EDITS) <= FUZZY_MAX_EDITS:
+                            if best is None or len(p) > len(self.patterns[best]):
+                                best = pid
+            if best is not None:
+                return self.titles[best]
+        return None
+
+_matcher: Optional[TitleMatcher] = None
+_matcher_digest = None
+_matcher_lock = threading.Lock()
+
+def get_title_matcher() -> TitleMatcher:
+    """Automatul pentru versiunea curentă a catalogului; se reconstruiește doar când catalogul se schimbă."""
+    global _matcher, _matcher_digest
+    catalog = get_catalog()
+    digest = catalog.digest
+    if _matcher is not None and digest == _matcher_digest:
+        return _matcher
+    with _matcher_lock:
+        if _matcher is None or digest != _matcher_digest:
+            _matcher = TitleMatcher(catalog.titles())
+            _matcher_digest = digest
+        return _matcher
@@ -0,0 +1,245 @@
+# core/vector_index.py
+# Index vectorial în proces, alternativă la Chroma pentru căutare (VECTOR_BACKEND=numpy):
+# embedding-urile normalizate stau într-o matrice contiguă int8 (cuantizată pe rând) sau float16,
+# într-un fișier .npy deschis cu mmap — toate procesele worker partajează aceleași pagini din page cache.
+# Căutarea e brute force: produs matrice-vector pe blocuri + argpartition pentru top-k. La int8, primii
+# k * VECTOR_INDEX_RERANK candidați sunt rescorați din copia float16 (doar rândurile lor sunt citite de pe disc).
+# Id-urile, titlurile și documentele stau tot în mmap (UTF-8 concatenat + offseturi), decodate doar la acces.
+import os
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+INDEX_VERSION = 2
+VECTOR_INDEX_DTYPE = os.getenv("VECTOR_INDEX_DTYPE", "int8")        # int8 | float16
+# rânduri convertite la float32 deodată: bufferul rămâne în cache-ul L2, iar un catalog mic e un singur matmul
+VECTOR_INDEX_BLOCK = int(os.getenv("VECTOR_INDEX_BLOCK", "256"))
+VECTOR_INDEX_RERANK = int(os.getenv("VECTOR_INDEX_RERANK", "4"))  # 0 = fără rescorare
+INT8_MAX = 127.0
+TEXT_FIELDS = ("ids", "titles", "documents")
+
+def _normalize(rows) -> np.ndarray:
+    rows = np.asarray(rows, dtype=np.float32)
+    norms = np.linalg.norm(rows, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return rows / norms
+
+def _quantize(rows: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Rânduri normalizate -> float16, sau int8 simetric cu o scară pe rând (scor = q8 · x * scară)."""
+    if dtype == "float16":
+        return rows.astype(np.float16), None
+    peak = np.abs(rows).max(axis=1)
+    peak[peak == 0] = 1.0
+    q = np.rint(rows / peak[:, None] * INT8_MAX).astype(np.int8)
+    return q, (peak / INT8_MAX).astype(np.float32)
+
+class _Strings:
+    """Listă de șiruri read-only peste un buffer UTF-8 (mmap): workerii nu țin fiecare câte o copie ca obiecte."""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return self._blob[start:end].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+def _write_strings(base: str, stem: str, fields: List[List[str]]) -> Tuple[Optional[str], Optional[str]]:
+    """Câmpurile (liste de aceeași lungime) -> <stem>.text.npy (uint8) + <stem>.offsets.npy (câmpuri x rânduri+1)."""
+    if not fields[0]:
+        return None, None
+    offsets = np.zeros((len(fields), len(fields[0]) + 1), dtype=np.int64)
+    chunks, pos = [], 0
+    for f, values in enumerate(fields):
+        offsets[f, 0] = pos
+        for i, v in enumerate(values):
+            b = (v or "").encode("utf-8")
+            chunks.append(b)
+            pos += len(b)
+            offsets[f, i + 1] = pos
+    np.save(os.path.join(base, stem + ".text.npy"), np.frombuffer(b"".join(chunks), dtype=np.uint8))
+    np.save(os.path.join(base, stem + ".offsets.npy"), offsets)
+    return stem + ".text.npy", stem + ".offsets.npy"
+
+class VectorIndex:
+    def __init__(self, path: str, meta: Dict, matrix: Optional[np.ndarray], scales: Optional[np.ndarray],
+                 exact: Optional[np.ndarray] = None, text: Optional[np.ndarray] = None,
+                 offsets: Optional[np.ndarray] = None):
+        self.path = path
+        self.metadata = meta.get("embedding") or {}   # providerul cu care au fost calculați vectorii
+        self.dtype = meta.get("dtype")
+        if text is None:
+            text, offsets = np.zeros(0, dtype=np.uint8), np.zeros((len(TEXT_FIELDS), 1), dtype=np.int64)
+        self.ids, self.titles, self.docs = (_Strings(text, offsets[f]) for f in range(len(TEXT_FIELDS)))
+        self.matrix = matrix
+        self.scales = scales
+        self.exact = exact   # copia float16 pentru rescorare (doar la int8)
+        self.dim = int(matrix.shape[1]) if matrix is not None else 0
+        self._rows = None    # id -> rând, construit doar dacă e nevoie (documents)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, path: str, rows: Iterable[Tuple[str, str, str, List[float]]], n: int,
+              dtype: str = VECTOR_INDEX_DTYPE, metadata: Dict = None, page: int = 1024) -> "VectorIndex":
+        """
+        rows: (id, titlu, document, vector), cel mult n. Matricea se scrie direct în fișier (memorie plafonată),
+        apoi metadatele JSON sunt înlocuite atomic; cititorii vechi își păstrează mmap-ul pe fișierul vechi.
+        """
+        if dtype not in ("int8", "float16"):
+            raise ValueError(f"VECTOR_INDEX_DTYPE must be int8 or float16, got {dtype!r}")
+        base = os.path.dirname(path) or "."
+        os.makedirs(base, exist_ok=True)
+        stem = f"{os.path.splitext(os.path.basename(path))[0]}-{time.time_ns()}"
+        ids, titles, docs = [], [], []
+        matrix = scales = exact = None
+        buf: List[List[float]] = []
+
+        def flush():
+            nonlocal matrix, scales, exact
+            if not buf:
+                return
+            if matrix is None:
+                shape = (n, len(buf[0]))
+                matrix = np.lib.format.open_memmap(os.path.join(base, stem + ".npy"), mode="w+",
+                                                   dtype=np.dtype(dtype), shape=shape)
+                if dtype == "int8":
+                    scales = np.lib.format.open_memmap(os.path.join(base, stem + ".scales.npy"), mode="w+",
+                                                       dtype=np.float32, shape=(n,))
+                    exact = np.lib.format.open_memmap(os.path.join(base, stem + ".f16.npy"), mode="w+",
+                                                      dtype=np.float16, shape=shape)
+            start = len(ids) - len(buf)
+            rows = _normalize(buf)
+            q, s = _quantize(rows, dtype)
+            matrix[start:start + len(buf)] = q
+            if s is not None:
+                scales[start:start + len(buf)] = s
+                exact[start:start + len(buf)] = rows.astype(np.float16)
+            buf.clear()
+
+        for _id, title, doc, vec in rows:
+            if len(ids) >= n:
+                break
+            ids.append(_id)
+            titles.append(title)
+            docs.append(doc)
+            buf.append(vec)
+            if len(buf) >= page:
+                flush()
+        flush()
+        for m in (matrix, scales, exact):
+            if m is not None:
+                m.flush()
+
+        text, offsets = _write_strings(base, stem, [ids, titles, docs])
+        meta = {"version": INDEX_VERSION, "dtype": dtype, "rows": len(ids), "embedding": metadata or {},
+                "matrix": stem + ".npy" if matrix is not None else None,
+                "scales": stem + ".scales.npy" if scales is not None else None,
+                "exact": stem + ".f16.npy" if exact is not None else None,
+                "text": text, "offsets": offsets}
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        cls._remove_stale(path, meta)
+        return cls.load(path)
+
+    @staticmethod
+    def _remove_stale(path: str, meta: Dict):
+        # fișierele matricelor anterioare; procesele care le au deja în mmap le pot citi în continuare
+        prefix = os.path.splitext(os.path.basename(path))[0] + "-"
+        keep = {meta.get(k) for k in ("matrix", "scales", "exact", "text", "offsets")}
+        base = os.path.dirname(path) or "."
+        for name in os.listdir(base):
+            if name.startswith(prefix) and name.endswith(".npy") and name not in keep:
+                try:
+                    os.remove(os.path.join(base, name))
+                except OSError:
+                    pass
+
+    @classmethod
+    def load(cls, path: str) -> Optional["VectorIndex"]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("version") != INDEX_VERSION:
+            return None
+        base = os.path.dirname(path) or "."
+        rows = meta["rows"]
+
+        def mapped(key, limit=True):
+            name = meta.get(key)
+            if not name:
+                return None
+            arr = np.load(os.path.join(base, name), mmap_mode="r")
+            return arr[:rows] if limit else arr
+
+        try:
+            return cls(path, meta, mapped("matrix"), mapped("scales"), mapped("exact"),
+                       mapped("text", limit=False), mapped("offsets", limit=False))
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _unit(qvec) -> np.ndarray:
+        q = np.asarray(qvec, dtype=np.float32)
+        return q / (np.linalg.norm(q) or 1.0)
+
+    def scores(self, qvec) -> np.ndarray:
+        """Similaritatea cosinus (aproximată de cuantizare) a interogării cu fiecare rând (float32, len(self))."""
+        q = self._unit(qvec)
+        n = len(self)
+        out = np.empty(n, dtype=np.float32)
+        block = np.empty((min(VECTOR_INDEX_BLOCK, n), self.dim), dtype=np.float32)
+        for start in range(0, n, VECTOR_INDEX_BLOCK):
+            end = min(start + VECTOR_INDEX_BLOCK, n)
+            b = block[:end - start]
+            np.copyto(b, self.matrix[start:end], casting="unsafe")
+            np.dot(b, q, out=out[start:end])
+        if self.scales is not None:
+            out *= self.scales
+        return out
+
+    def query(self, qvec, k: int) -> List[Dict]:
+        """Top-k exact: [{"id", "title", "doc", "score"}] ordonat descrescător după similaritate."""
+        n = len(self)
+        if not n or k <= 0:
+            return []
+        if len(qvec) != self.dim:
+            raise ValueError(f"Query dimension {len(qvec)} does not match index dimension {self.dim}")
+        s = self.scores(qvec)
+        k = min(k, n)
+        if self.exact is not None and VECTOR_INDEX_RERANK > 0 and k < n:
+            # candidații din int8, reordonați cu scorurile din float16 (erorile de cuantizare schimbă doar ordinea
+            # între vecini aproape egali, așa că vecinii adevărați sunt aproape mereu printre candidați)
+            c = min(n, k * VECTOR_INDEX_RERANK)
+            cand = np.sort(np.argpartition(-s, c - 1)[:c])
+            s = s.copy()
+            s[cand] = self.exact[cand].astype(np.float32) @ self._unit(qvec)
+            top = cand
+        else:
+            top = np.arange(n)
+        if k < len(top):
+            top = top[np.argpartition(-s[top], k - 1)[:k]]
+        top = top[np.argsort(-s[top], kind="stable")]
+        return [{"id": self.ids[i], "title": self.titles[i], "doc": self.docs[i], "score": float(s[i])}
+                for i in top]
+
+    def documents(self, ids) -> Dict[str, str]:
+        if self._rows is None:
+            self._rows = {_id: i for i, _id in enumerate(self.ids)}
+        return {i: self.docs[self._rows[i]] for i in ids if i in self._rows}
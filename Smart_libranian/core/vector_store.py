@@ -1,37 +1,371 @@
 # core/vector_store.py
 import os
-import chromadb
-from chromadb.config import Settings
-from core.embeddings import embed_texts
+import threading
+import uuid
+import numpy as np
+from core.embeddings import (embed_texts, get_provider, provider_info, provider_key, check_compatible,
+                             EmbeddingMismatchError)
 from core.tools import get_summary_by_title
+from core.lexical_index import LexicalIndex
+from core.vector_index import VectorIndex
+from core import metrics
 
 BASE_DIR = os.path.dirname(__file__)
 CHROMA_DIR = os.path.join(BASE_DIR, ".chroma_store")
 COLLECTION_NAME = "books"
+# scris de ingest după fiecare recreare a colecției; schimbarea lui forțează redeschiderea handle-ului
+GENERATION_FILE = ".generation"
+LEXICAL_INDEX_FILE = "lexical_index.json"
+VECTOR_INDEX_FILE = "vector_index.json"
+# chroma: interogări prin Chroma (HNSW); numpy: matricea memory-mapped din vector_index.py (exactă, partajată)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+# vector: doar embedding; hybrid: BM25 + vector fuzionate (RRF); auto: ca hybrid, dar sare peste
+# embedding când indexul lexical e sigur pe primul rezultat
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "auto")
+RRF_K = 60                # constanta din reciprocal rank fusion: 1 / (RRF_K + rang)
+FUSION_CANDIDATES = 20    # câte rezultate din fiecare listă intră în fuziune
 
-def _get_collection():
-    client = chromadb.PersistentClient(path=CHROMA_DIR, settings=Settings(anonymized_telemetry=False))
-    return client.get_or_create_collection(COLLECTION_NAME, metadata={"hnsw:space": "cosine"})
+# --- handle unic pe proces (client + colecție), creat leneș ---
+_lock = threading.RLock()
+_client = None
+_collection = None
+_generation = None
+_lexical = None
+_lexical_generation = None
+_vindex = None
+_vindex_generation = None
+_checked = None  # (colecție, cheia providerului) deja verificate
 
-def search_books(query: str, k: int = 3):
-    coll = _get_collection()
-    qvec = embed_texts([query])[0]
+def collection_metadata() -> dict:
+    """Metadatele cu care se creează colecția: distanța cosinus + providerul/dimensiunea embedding-urilor."""
+    return {"hnsw:space": "cosine", **provider_info(get_provider())}
+
+def _generation_path() -> str:
+    return os.path.join(CHROMA_DIR, GENERATION_FILE)
+
+def _read_generation():
+    # conținutul (un id nou la fiecare bump), nu mtime-ul: pe sisteme de fișiere cu mtime grosier,
+    # două bump-uri în același tick ar fi arătat la fel
+    try:
+        with open(_generation_path(), encoding="utf-8") as f:
+            return f.read() or None
+    except OSError:
+        return None
+
+def store_version():
+    """Versiunea curentă a datelor din store (se schimbă la fiecare ingest care modifică ceva)."""
+    return _read_generation()
+
+def bump_generation():
+    """Marchează colecția ca înlocuită/modificată (apelat de ingest); clienții o redeschid la următoarea interogare."""
+    os.makedirs(CHROMA_DIR, exist_ok=True)
+    tmp = f"{_generation_path()}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(uuid.uuid4().hex)
+    os.replace(tmp, _generation_path())  # cititorii văd marcajul vechi sau pe cel nou, niciodată un fișier gol
+    invalidate()
+
+def get_client():
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                # chromadb (~0.5 s la import) se încarcă abia la prima deschidere a store-ului
+                import chromadb
+                from chromadb.config import Settings
+                _client = chromadb.PersistentClient(path=CHROMA_DIR, settings=Settings(anonymized_telemetry=False))
+    return _client
+
+def get_collection():
+    global _collection, _generation
+    gen = _read_generation()
+    coll = _collection
+    if coll is not None and gen == _generation:
+        return coll
+    with _lock:
+        if _collection is None or gen != _generation:
+            _collection = get_client().get_or_create_collection(COLLECTION_NAME, metadata=collection_metadata())
+            _generation = gen
+        return _collection
+
+def invalidate():
+    """Uită colecția și indexul lexical din cache (clientul rămâne deschis)."""
+    global _collection, _generation, _lexical, _lexical_generation, _vindex, _vindex_generation, _checked
+    with _lock:
+        _collection = None
+        _generation = None
+        _lexical = None
+        _lexical_generation = None
+        _vindex = None
+        _vindex_generation = None
+        _checked = None
+
+def check_embeddings(coll=None):
+    """
+    EmbeddingMismatchError dacă store-ul a fost construit cu alt provider/model/dimensiune decât EMBED_PROVIDER.
+    coll poate fi și un VectorIndex (are aceleași metadata/count()).
+    """
+    global _checked
+    coll = coll or get_collection()
+    provider = get_provider()
+    # dimensiunea intră în cheie: la OpenAI e aflată abia din primul răspuns, deci verificarea se reia atunci
+    key = (id(coll), provider_key(provider), provider.dim)
+    if _checked == key:
+        return
+    check_compatible(coll.metadata, coll.count())
+    _checked = key
+
+def record_embedding_info(coll, dim: int = None):
+    """Scrie în metadatele colecției providerul cu care au fost calculați vectorii (apelat de ingest)."""
+    info = provider_info(get_provider())
+    if dim:
+        info["embed_dim"] = int(dim)
+    meta = {k: v for k, v in (coll.metadata or {}).items() if not k.startswith("hnsw:")}
+    if any(meta.get(k) != v for k, v in info.items()):
+        # fără cheile hnsw:* (Chroma nu le permite la modify); distanța rămâne cea de la creare
+        coll.modify(metadata={**meta, **info})
+
+def lexical_index_path() -> str:
+    return os.path.join(CHROMA_DIR, LEXICAL_INDEX_FILE)
+
+def get_lexical_index():
+    """Indexul BM25 salvat de ingest, reîncărcat când se schimbă generația store-ului; None dacă lipsește."""
+    global _lexical, _lexical_generation
+    gen = _read_generation()
+    if _lexical is not None and gen == _lexical_generation:
+        return _lexical
+    with _lock:
+        if _lexical is None or gen != _lexical_generation:
+            _lexical = LexicalIndex.load(lexical_index_path())
+            _lexical_generation = gen
+        return _lexical
+
+def rebuild_lexical_index(coll=None, page_size: int = 1000) -> LexicalIndex:
+    """Reconstruiește indexul din documentele colecției (fără embedding) și îl salvează lângă store."""
+    coll = coll or get_collection()
+
+    def docs():
+        offset = 0
+        while True:
+            page = coll.get(include=["documents"], limit=page_size, offset=offset)
+            ids = page.get("ids") or []
+            yield from zip(ids, page.get("documents") or [])
+            if len(ids) < page_size:
+                return
+            offset += len(ids)
+
+    index = LexicalIndex.build(docs())
+    index.save(lexical_index_path())
+    return index
+
+def vector_index_path() -> str:
+    return os.path.join(CHROMA_DIR, VECTOR_INDEX_FILE)
+
+def get_vector_index():
+    """Indexul NumPy memory-mapped, reîncărcat când se schimbă generația store-ului; None dacă lipsește."""
+    global _vindex, _vindex_generation
+    gen = _read_generation()
+    if _vindex is not None and gen == _vindex_generation:
+        return _vindex
+    with _lock:
+        if _vindex is None or gen != _vindex_generation:
+            _vindex = VectorIndex.load(vector_index_path())
+            _vindex_generation = gen
+        return _vindex
+
+def rebuild_vector_index(coll=None, page_size: int = 1000) -> VectorIndex:
+    """Exportă embedding-urile din Chroma în matricea cuantizată (pe pagini, memorie plafonată)."""
+    coll = coll or get_collection()
+    n = coll.count()
+
+    def rows():
+        offset = 0
+        while True:
+            page = coll.get(include=["embeddings", "metadatas", "documents"], limit=page_size, offset=offset)
+            ids = page.get("ids") or []
+            metas = page.get("metadatas") or [{}] * len(ids)
+            for _id, meta, doc, emb in zip(ids, metas, page.get("documents") or [], page.get("embeddings")):
+                yield _id, (meta or {}).get("title"), doc, emb
+            if len(ids) < page_size:
+                return
+            offset += len(ids)
+
+    info = {k: v for k, v in (coll.metadata or {}).items() if not k.startswith("hnsw:")}
+    return VectorIndex.build(vector_index_path(), rows(), n, metadata=info)
+
+def refresh_indexes(coll, changed: bool):
+    """Apelat de ingest: reconstruiește indexurile derivate din colecție dacă s-a schimbat ceva sau lipsesc."""
+    if changed or not os.path.exists(lexical_index_path()):
+        rebuild_lexical_index(coll)  # BM25 peste documentele din store, fără embedding
+    # indexul NumPy se ține la zi doar dacă e folosit (sau există deja și ar rămâne vechi)
+    if VECTOR_BACKEND == "numpy" or os.path.exists(vector_index_path()):
+        if changed or not os.path.exists(vector_index_path()):
+            rebuild_vector_index(coll)
+
+def _backend():
+    """Sursa vectorilor pentru căutare: indexul NumPy (dacă e ales și există) sau colecția Chroma."""
+    if VECTOR_BACKEND == "numpy":
+        index = get_vector_index()
+        if index is not None:
+            return index
+    return get_collection()
+
+def check_vector_index(sample: int = 50, k: int = 10) -> float:
+    """Recall@k mediu al indexului NumPy față de Chroma, cu vectori din store ca interogări."""
+    coll, index = get_collection(), get_vector_index()
+    if index is None or not len(index):
+        return 0.0
+    page = coll.get(include=["embeddings"], limit=sample)
+    total = 0.0
+    for emb in page["embeddings"]:
+        expected = {h["id"] for h in _query(coll, list(emb), k)}
+        got = {h["id"] for h in index.query(emb, k)}
+        total += len(expected & got) / max(len(expected), 1)
+    return total / max(len(page["embeddings"]), 1)
+
+def warm_store() -> int:
+    """Deschide clientul și încarcă segmentul HNSW înainte de primul request. Returnează numărul de cărți."""
+    if not os.path.isdir(CHROMA_DIR):
+        # fără store încă (ingest nu a rulat): nu-l creăm gol din greșeală
+        return 0
+    coll = get_collection()
+    n = coll.count()
+    try:
+        check_embeddings(coll)
+    except EmbeddingMismatchError as e:
+        # căutarea lexicală merge în continuare; cea vectorială eșuează până la re-ingest
+        print(f"[WARN] {e}")
+    if n and get_lexical_index() is None:
+        # store creat înainte de indexul lexical: îl construim o dată din documentele existente
+        rebuild_lexical_index(coll)
+    if n and VECTOR_BACKEND == "numpy":
+        index = get_vector_index()
+        if index is None:
+            index = rebuild_vector_index(coll)
+        if len(index):
+            index.scores(np.zeros(index.dim, dtype=np.float32))  # aduce paginile matricei în page cache
+    if n:
+        peek = coll.peek(1)
+        emb = peek.get("embeddings")
+        if emb is not None and len(emb):
+            coll.query(query_embeddings=[list(emb[0])], n_results=1)
+    return n
+
+def close_store():
+    global _client
+    with _lock:
+        client = _client
+        _client = None
+        invalidate()  # și indexurile derivate / verificarea: la redeschidere store-ul poate fi altul (snapshot)
+    if client is not None:
+        try:
+            client.close()
+        except Exception:
+            pass
+
+def _query(coll, qvec, k: int):
+    if isinstance(coll, VectorIndex):
+        return coll.query(qvec, k)
     res = coll.query(query_embeddings=[qvec], n_results=k, include=["documents", "metadatas", "distances"]) or {}
     hits = []
     if res.get("metadatas") and res["metadatas"]:
-        for meta, doc, dist in zip(res["metadatas"][0], res["documents"][0], res["distances"][0]):
-            hits.append({"title": meta.get("title"), "doc": doc, "score": 1.0 - float(dist)})
+        for _id, meta, doc, dist in zip(res["ids"][0], res["metadatas"][0], res["documents"][0], res["distances"][0]):
+            hits.append({"id": _id, "title": meta.get("title"), "doc": doc, "score": 1.0 - float(dist)})
     return hits
 
-def answer_book_question(user_prompt: str) -> str | None:
-    hits = search_books(user_prompt, k=3)
+def _documents(coll, ids):
+    if isinstance(coll, VectorIndex):
+        return coll.documents(ids)
+    got = coll.get(ids=list(ids), include=["documents"])
+    return dict(zip(got.get("ids") or [], got.get("documents") or []))
+
+def _fuse(lexical, vector, k: int):
+    """Reciprocal rank fusion: scor = suma 1 / (RRF_K + rang) peste listele în care apare documentul."""
+    fused = {}
+    for source, hits in (("lexical", lexical), ("vector", vector)):
+        for rank, h in enumerate(hits, 1):
+            item = fused.setdefault(h["id"], {"id": h["id"], "title": h["title"], "doc": h.get("doc"),
+                                              "score": 0.0, "bm25": None, "similarity": None})
+            item["score"] += 1.0 / (RRF_K + rank)
+            item["bm25" if source == "lexical" else "similarity"] = h["score"]
+            if item["doc"] is None:
+                item["doc"] = h.get("doc")
+    return sorted(fused.values(), key=lambda h: -h["score"])[:k]
+
+def _search(coll, query: str, k: int, mode: str, embed_query):
+    lex = get_lexical_index() if mode != "vector" else None
+    if lex is None:
+        hits = _query(coll, embed_query(), k)
+        for h in hits:
+            h.update(similarity=h["score"], bm25=None, source="vector")
+        return hits
+
+    n = max(k, FUSION_CANDIDATES)
+    lexical = lex.search(query, n)
+    if mode == "auto" and LexicalIndex.confident(lexical):
+        # răspuns lexical sigur: fără apel de embedding
+        top = lexical[:k]
+        docs = _documents(coll, [h["id"] for h in top])
+        return [{"id": h["id"], "title": h["title"], "doc": docs.get(h["id"]), "score": 1.0 / (RRF_K + r),
+                 "bm25": h["score"], "similarity": None, "source": "lexical"}
+                for r, h in enumerate(top, 1)]
+
+    vector = _query(coll, embed_query(), n)
+    hits = _fuse(lexical, vector, k)
+    missing = [h["id"] for h in hits if h["doc"] is None]
+    if missing:
+        docs = _documents(coll, missing)
+        for h in hits:
+            if h["doc"] is None:
+                h["doc"] = docs.get(h["id"])
+    for h in hits:
+        h["source"] = "hybrid"
+    return hits
+
+@metrics.timed("search_books")
+def search_books(query: str, k: int = 3, mode: str = None, vector=None):
+    """
+    Top-k cărți pentru întrebare: [{"id", "title", "doc", "score", "bm25", "similarity", "source"}].
+    score este scorul RRF în modurile hybrid/auto și similaritatea cosinus în modul vector.
+    `vector`: embedding-ul întrebării, dacă a fost deja calculat (ex. într-un lot embed_texts).
+    """
+    mode = mode or RETRIEVAL_MODE
+    state = {"vector": vector, "embedding_failed": False, "store": None}
+
+    def embed_query():
+        # embedding-ul se calculează cel mult o dată, și doar dacă e nevoie de el
+        try:
+            check_embeddings(state["store"])
+            if state["vector"] is None:
+                state["vector"] = embed_texts([query])[0]
+                check_embeddings(state["store"])  # primul embedding poate afla dimensiunea providerului
+        except Exception:
+            state["embedding_failed"] = True
+            raise
+        return state["vector"]
+
+    try:
+        state["store"] = _backend()
+        return _search(state["store"], query, k, mode, embed_query)
+    except Exception:
+        if state["embedding_failed"]:
+            raise
+        # colecția a fost ștearsă/recreată de alt proces între două verificări -> redeschidem o dată
+        invalidate()
+        state["store"] = _backend()
+        return _search(state["store"], query, k, mode, embed_query)
+
+def answer_book_question(user_prompt: str, hits=None) -> str | None:
+    """Răspuns direct din catalog (fără LLM) pentru primul rezultat; `hits` evită o a doua căutare."""
+    hits = search_books(user_prompt, k=3) if hits is None else hits
     if not hits:
         return None
     best = hits[0]
     title = best["title"]
     summary_full = get_summary_by_title(title)
+    # text simplu: interfața afișează răspunsul escapat, deci fără HTML
     lines = [
-        f"Îți recomand: <b>{title}</b>.",
+        f"Îți recomand: „{title}”.",
         "",
         "Rezumat detaliat:",
         summary_full,
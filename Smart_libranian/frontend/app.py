@@ -1,14 +1,17 @@
 import sys
 import os
 import time
-import requests
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify
+import json
+import uuid
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, Response, stream_with_context
 import re
 from datetime import timedelta
 
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from core.database import ConversationDB
+from frontend.backend_client import BackendClient
+from core import metrics
 
 
 from core.language_filter import filter_prompt
@@ -29,11 +32,35 @@ LANGUAGE_FILTER_MODE_FRONTEND = "block"
 def _keep_session_alive():
     session.permanent = True
 
+# latența pe etape + /metrics; Server-Timing doar cu X-Debug-Timing: 1 (sau TIMING_HEADER=1)
+@app.before_request
+def _start_timing():
+    if metrics.METRICS_ENABLED:
+        metrics.start_trace(metrics.timing_requested(request.headers.get(metrics.TIMING_REQUEST_HEADER)))
+
+@app.after_request
+def _finish_timing(response):
+    trace = metrics.current_trace()
+    if trace is not None:
+        if trace.wanted:
+            response.headers["Server-Timing"] = metrics.server_timing(trace)
+        metrics.finish_request(trace, request.endpoint or "unmatched", response.status_code)
+    return response
+
+@app.teardown_request
+def _end_timing(exc):
+    metrics.end_trace()
+
 db = ConversationDB()
 
 FASTAPI_URL = "http://127.0.0.1:8000/chat"
+FASTAPI_STREAM_URL = "http://127.0.0.1:8000/chat/stream"
 PING_URL     = "http://127.0.0.1:8000/ping"
 SESSION_TIMEOUT = 180  # secunde
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "20"))  # ture (întrebare + răspuns) afișate la încărcarea paginii
+
+# sesiune HTTP keep-alive partajată + monitorul /ping din fundal (pornește la prima cerere)
+backend = BackendClient(PING_URL)
 
 def clean_latex(text):
     return (
@@ -43,12 +70,58 @@ def clean_latex(text):
         .replace("\\boxed", "").replace("$", "")
     )
 
+# răspunsurile finalizate pe /chat/stream, până când browserul le confirmă în sesiune (/chat/stream/finish);
+# cookie-ul de sesiune nu mai poate fi modificat după ce a început corpul unui răspuns pe flux.
+# Stau în baza de date: cu mai mulți workeri, confirmarea poate ajunge la alt proces decât fluxul.
+STREAM_RESULT_TTL = 600  # secunde
+
+def _put_stream_result(user_id, question, answer) -> str:
+    token = uuid.uuid4().hex
+    db.put_stream_result(token, user_id, question, answer, STREAM_RESULT_TTL)
+    return token
+
+def _sse(event: dict) -> str:
+    return f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+# Istoricul stă doar în baza de date; cookie-ul de sesiune păstrează numai ID-uri (user_id, session_id),
+# iar răspunsul care așteaptă Good/Bad e ținut în tabela `pending`.
+def _history_page(session_id, before_id=None, limit=HISTORY_PAGE_SIZE):
+    """(rânduri (id, întrebare, răspuns) în ordine cronologică, există mesaje mai vechi)."""
+    if not session_id:
+        return [], False
+    rows = db.get_messages_page(session_id, before_id, limit + 1)
+    has_more = len(rows) > limit
+    return [(r[0], r[1], r[2]) for r in rows[-limit:]], has_more
+
+def _as_bubbles(rows):
+    messages = []
+    for _id, q, a in rows:
+        messages.append(("You", q))
+        messages.append(("RINA", a))
+    return messages
+
+def _is_resubmit(question, pending, session_id) -> bool:
+    """Dublu-click / re-POST din browser: întrebarea e deja cea care așteaptă Good/Bad sau ultima salvată."""
+    if pending:
+        return pending[0] == question
+    rows = db.get_messages_page(session_id, None, 1) if session_id else []
+    return bool(rows) and rows[-1][1] == question
+
+def _set_pending(user_id, question, answer):
+    db.set_pending(user_id, session.get("session_id"), question, answer)
+
+def _post_chat(payload: dict, **kwargs):
+    """POST /chat către backend, cronometrat; cu trasarea cerută, include și etapele backend-ului (backend.*)."""
+    trace = metrics.current_trace()
+    headers = {metrics.TIMING_REQUEST_HEADER: "1"} if trace is not None and trace.wanted else None
+    with metrics.stage("backend_chat"):
+        r = backend.post(FASTAPI_URL, json=payload, headers=headers, **kwargs)
+    metrics.add_remote("backend.", r.headers.get("Server-Timing"))
+    return r
+
 def check_backend_status():
-    try:
-        res = requests.get(PING_URL, timeout=3)
-        return res.json().get("status") == "ok"
-    except Exception:
-        return False
+    # starea din cache a monitorului: randarea nu mai așteaptă după /ping
+    return backend.is_up()
 
 @app.route("/", methods=["GET", "POST"])
 def login():
@@ -59,8 +132,8 @@ def login():
         if user_id:
             session["user_id"] = user_id
             session["username"] = username
-            session["pending"] = None
             session["last_active"] = time.time()
+            db.clear_pending(user_id)
 
             
             session_id = db.get_latest_session(user_id)
@@ -68,16 +141,6 @@ def login():
                 session_id = db.create_session(user_id)
             session["session_id"] = session_id
 
-            
-            if session_id:
-                history = db.get_conversation_by_session(session_id)
-                session["messages"] = [
-                    ("You", q) if i % 2 == 0 else ("RINA", a)
-                    for i, (q, a, _) in enumerate(history)
-                ]
-            else:
-                session["messages"] = []
-
             return redirect(url_for("chat_view"))
         else:
             return render_template("login.html", error="Invalid credentials.")
@@ -107,9 +170,6 @@ def chat_view():
                 session["user_id"] = int(uid)
             if sid:
                 session["session_id"] = int(sid)
-                hist = db.get_conversation_by_session(int(sid))
-                session["messages"] = [("You", q) if i % 2 == 0 else ("RINA", a)
-                                       for i, (q, a, _) in enumerate(hist)]
             session["last_active"] = time.time()
         except Exception as e:
             print("[WARN] Rehydrate failed:", e)
@@ -118,7 +178,6 @@ def chat_view():
     if "user_id" not in session or session.get("user_id") is None:
         
         if request.method == "POST" and request.form.get("rate") in ("good", "bad"):
-            session["pending"] = None
             return redirect(url_for("chat_view"))
         return redirect(url_for("login"))
 
@@ -133,18 +192,10 @@ def chat_view():
 
     
     if not session_id:
-        latest = db.get_latest_session(user_id)
-        if latest is not None:
-            session_id = latest
-            session["session_id"] = session_id
-            history = db.get_conversation_by_session(session_id)
-            session["messages"] = [("You", q) if i % 2 == 0 else ("RINA", a)
-                                   for i, (q, a, _) in enumerate(history)]
-        else:
-            session["messages"] = []
+        session_id = db.get_latest_session(user_id)
+        session["session_id"] = session_id
 
-    messages = session.get("messages", [])
-    pending  = session.get("pending")
+    pending = db.get_pending(user_id)
 
     if request.method == "POST":
         rate_value = request.form.get("rate")
@@ -155,19 +206,16 @@ def chat_view():
             sid = session.get("session_id") or request.form.get("session_id")
             if not uid or not sid:
                 print("[WARN] Missing user/session on rate=good; dropping pending and staying.")
-                session["pending"] = None
+                db.clear_pending(user_id)
                 return redirect(url_for("chat_view"))
 
-            messages.append(("You",  pending[0]))
-            messages.append(("RINA", pending[1]))
             db.save(int(uid), pending[0], pending[1], int(sid))
-            session["pending"] = None
-            session["messages"] = messages
+            db.clear_pending(user_id)
             return redirect(url_for("chat_view"))
 
         
         if rate_value == "bad":
-            session["pending"] = None
+            db.clear_pending(user_id)
             return redirect(url_for("chat_view"))
 
         
@@ -176,44 +224,124 @@ def chat_view():
             if not user_msg_original:
                 return redirect(url_for("chat_view"))
 
-            
-            if session.get("messages") and session["messages"][-1][0] == "You" and session["messages"][-1][1] == user_msg_original:
+            # aceeași întrebare trimisă din nou nu mai ajunge la backend (al doilea apel LLM, al doilea pending)
+            if _is_resubmit(user_msg_original, pending, session_id):
                 return redirect(url_for("chat_view"))
 
             if not user_id:
                 return redirect(url_for("login"))
 
             
-            ok, maybe_censored = filter_prompt(user_msg_original, mode=LANGUAGE_FILTER_MODE_FRONTEND)
+            with metrics.stage("filter_prompt"):
+                ok, maybe_censored = filter_prompt(user_msg_original, mode=LANGUAGE_FILTER_MODE_FRONTEND)
 
             
             if not ok:
                 bot_reply = maybe_censored
-                session["pending"] = (user_msg_original, bot_reply)
+                _set_pending(user_id, user_msg_original, bot_reply)
                 return redirect(url_for("chat_view"))
 
             
             user_msg_to_send = maybe_censored
 
             try:
-                r = requests.post(
-                    FASTAPI_URL,
-                    json={"user_id": str(user_id), "question": user_msg_to_send},
-                    timeout=20,
-                )
+                r = _post_chat({"user_id": str(user_id), "question": user_msg_to_send}, timeout=20)
                 r.raise_for_status()
                 bot_reply = clean_latex(r.json().get("response", "[No response]"))
             except Exception as e:
                 bot_reply = f"[Error contacting backend: {e}]"
 
             
-            session["pending"] = (user_msg_original, bot_reply)
+            _set_pending(user_id, user_msg_original, bot_reply)
             return redirect(url_for("chat_view"))
 
+    rows, has_more = _history_page(session_id)
+    messages = _as_bubbles(rows)
     gemini_ok = check_backend_status()  
     sessions = db.get_sessions(user_id)
     return render_template("chat.html", messages=messages, pending=pending,
-                           gemini_ok=gemini_ok, sessions=sessions)
+                           gemini_ok=gemini_ok, sessions=sessions, session_id=session_id,
+                           has_more=has_more, oldest_id=rows[0][0] if rows else None)
+
+@app.route("/session/<int:session_id>/history")
+def session_history(session_id):
+    """Ture mai vechi decât ?before=<message id>, pentru butonul "Load older messages"."""
+    if "user_id" not in session or session.get("user_id") is None:
+        return jsonify({"error": "not logged in"}), 401
+    if db.get_session_owner(session_id) != session["user_id"]:
+        return jsonify({"error": "not found"}), 404
+    before = request.args.get("before", type=int)
+    limit = min(request.args.get("limit", HISTORY_PAGE_SIZE, type=int), 100)
+    rows, has_more = _history_page(session_id, before, max(limit, 1))
+    return jsonify({
+        "messages": [{"id": _id, "question": q, "answer": a} for _id, q, a in rows],
+        "has_more": has_more,
+        "before": rows[0][0] if rows else None,
+    })
+
+@app.route("/chat/stream", methods=["POST"])
+def chat_stream():
+    """Trimite răspunsul backend-ului token cu token (SSE); rezultatul final intră apoi în fluxul pending/rate."""
+    if "user_id" not in session or session.get("user_id") is None:
+        return jsonify({"error": "not logged in"}), 401
+    session["last_active"] = time.time()
+    user_id = session["user_id"]
+    data = request.get_json(silent=True) or request.form
+    user_msg_original = (data.get("message") or "").strip()
+    if not user_msg_original:
+        return jsonify({"error": "empty message"}), 400
+
+    with metrics.stage("filter_prompt"):
+        ok, maybe_censored = filter_prompt(user_msg_original, mode=LANGUAGE_FILTER_MODE_FRONTEND)
+    if not ok:
+        token = _put_stream_result(user_id, user_msg_original, maybe_censored)
+        return Response(_sse({"type": "done", "response": maybe_censored, "moderated": True, "token": token}),
+                        mimetype="text/event-stream")
+
+    def events():
+        final = None
+        try:
+            with backend.post(
+                FASTAPI_STREAM_URL,
+                json={"user_id": str(user_id), "question": maybe_censored},
+                stream=True,
+                timeout=(5, 60),
+            ) as r:
+                r.raise_for_status()
+                for line in r.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data: "):
+                        continue
+                    ev = json.loads(line[len("data: "):])
+                    if ev.get("type") == "done":
+                        final = ev
+                        break
+                    yield _sse(ev)
+                    if ev.get("type") == "error":
+                        return   # fără răspuns de evaluat: pagina păstrează eroarea, nu se reîncarcă
+        except Exception as e:
+            yield _sse({"type": "error", "detail": f"Error contacting backend: {e}"})
+            return
+        if final is None:
+            final = {"type": "done", "response": "[No response]"}
+        bot_reply = clean_latex(final.get("response") or "[No response]")
+        final.update(response=bot_reply, token=_put_stream_result(user_id, user_msg_original, bot_reply))
+        yield _sse(final)
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route("/chat/stream/finish", methods=["POST"])
+def chat_stream_finish():
+    """Salvează răspunsul terminat ca pending, exact ca ruta blocantă, ca să poată fi evaluat Good/Bad."""
+    if "user_id" not in session or session.get("user_id") is None:
+        return jsonify({"ok": False}), 401
+    token = (request.get_json(silent=True) or {}).get("token", "")
+    item = db.pop_stream_result(token, STREAM_RESULT_TTL)
+    if item is None or item[0] != session["user_id"]:
+        return jsonify({"ok": False}), 404
+    _set_pending(session["user_id"], item[1], item[2])
+    session["last_active"] = time.time()
+    return jsonify({"ok": True})
 
 @app.route("/book_recommendation", methods=["POST"])
 def book_recommendation():
@@ -223,31 +351,32 @@ def book_recommendation():
         return jsonify({"response": "Te rog să scrii o întrebare."})
 
   
-    ok, maybe_censored = filter_prompt(user_input_original, mode=LANGUAGE_FILTER_MODE_FRONTEND)
+    with metrics.stage("filter_prompt"):
+        ok, maybe_censored = filter_prompt(user_input_original, mode=LANGUAGE_FILTER_MODE_FRONTEND)
     if not ok:
         return jsonify({"response": maybe_censored})
 
     user_input_to_send = maybe_censored
 
     try:
-        r = requests.post(
-            FASTAPI_URL,
-            json={"user_id": str(session.get("user_id", "anonim")), "question": user_input_to_send},
-            timeout=20,
-        )
+        r = _post_chat({"user_id": str(session.get("user_id", "anonim")), "question": user_input_to_send},
+                       timeout=20)
         r.raise_for_status()
         return jsonify({"response": r.json().get("response", "[Eroare: răspuns lipsă]")})
     except Exception as e:
         return jsonify({"response": f"Eroare API backend: {str(e)}"}), 500
 
+@app.route("/metrics")
+def prometheus_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
 @app.route("/new_chat")
 def new_chat():
     if "user_id" not in session:
         return redirect(url_for("login"))
     session_id = db.create_session(session["user_id"])
     session["session_id"] = session_id
-    session["messages"] = []
-    session["pending"] = None
+    db.clear_pending(session["user_id"])
     return redirect(url_for("chat_view"))
 
 @app.route("/session/<int:session_id>")
@@ -255,11 +384,6 @@ def load_session(session_id):
     if "user_id" not in session:
         return redirect(url_for("login"))
     session["session_id"] = session_id
-    history = db.get_conversation_by_session(session_id)
-    session["messages"] = [
-        ("You", q) if i % 2 == 0 else ("RINA", a)
-        for i, (q, a, _) in enumerate(history)
-    ]
     return redirect(url_for("chat_view"))
 
 @app.route("/rename_session/<int:session_id>", methods=["POST"])
@@ -278,7 +402,6 @@ def delete_session(session_id):
     db.delete_session(session_id)
     if session.get("session_id") == session_id:
         session["session_id"] = None
-        session["messages"] = []
     return redirect(url_for("chat_view"))
 
 @app.route("/logout")
@@ -0,0 +1,177 @@
+# frontend/backend_client.py
+# Client HTTP partajat către backend-ul FastAPI: conexiuni keep-alive reutilizate (plafon per host)
+# și un monitor de sănătate în fundal, cu circuit breaker. Randarea paginilor citește doar starea
+# din cache; când backend-ul cade, cererile eșuează imediat în loc să-l mai lovească.
+import os
+import time
+import threading
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from core import metrics
+
+BACKEND_POOL_SIZE = int(os.getenv("BACKEND_POOL_SIZE", "32"))                 # conexiuni per host (peste plafon se așteaptă)
+HEALTH_INTERVAL = float(os.getenv("BACKEND_HEALTH_INTERVAL", "2.0"))          # secunde între două /ping
+HEALTH_TIMEOUT = float(os.getenv("BACKEND_HEALTH_TIMEOUT", "1.0"))
+HEALTH_TTL = float(os.getenv("BACKEND_HEALTH_TTL", "10.0"))                   # cât timp rămâne valid ultimul verdict
+BREAKER_FAILURES = int(os.getenv("BACKEND_BREAKER_FAILURES", "3"))            # eșecuri consecutive până la deschidere
+BREAKER_MAX_INTERVAL = float(os.getenv("BACKEND_BREAKER_MAX_INTERVAL", "30.0"))
+
+class BackendUnavailable(requests.ConnectionError):
+    """Circuitul e deschis: cererea nu mai pleacă spre backend."""
+
+def make_session(pool_size: int = BACKEND_POOL_SIZE) -> requests.Session:
+    s = requests.Session()
+    # pool_block=True: peste pool_size conexiuni simultane către același host, cererile așteaptă
+    # o conexiune liberă în loc să deschidă altele noi (care oricum nu ar mai fi refolosite)
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=True, max_retries=0)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+class BackendClient:
+    def __init__(self, ping_url: str, pool_size: int = BACKEND_POOL_SIZE, interval: float = HEALTH_INTERVAL,
+                 timeout: float = HEALTH_TIMEOUT, ttl: float = HEALTH_TTL, failures: int = BREAKER_FAILURES,
+                 max_interval: float = BREAKER_MAX_INTERVAL):
+        self.ping_url = ping_url
+        self.http = make_session(pool_size)
+        self.interval = interval
+        self.timeout = timeout
+        self.ttl = ttl
+        self.failures = failures
+        self.max_interval = max_interval
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._ok = False
+        self._checked = 0.0
+        self._consecutive = 0
+        self._open = False
+        self._probing = False   # circuit deschis: o cerere reală lăsată să treacă drept sondă
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self.pings = 0
+        self.rejected = 0
+
+    # --- monitorul din fundal ---
+    def start(self):
+        """
+        Pornește monitorul la prima utilizare (nu la import, ca să nu pornească în scripturi/benchmark-uri).
+        Primul /ping e sincron (cel mult `timeout`): prima pagină randată nu arată backend-ul căzut doar pentru
+        că monitorul nu a apucat să-l verifice.
+        """
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._wake.clear()
+                ok = self._ping()
+                with self._lock:
+                    self.pings += 1
+                self._record(ok)
+                self._thread = threading.Thread(target=self._loop, name="backend-health", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        t, self._thread = self._thread, None
+        if t is not None:
+            t.join(timeout=self.timeout + 1)
+
+    def _ping(self) -> bool:
+        with metrics.stage("backend_ping"):
+            try:
+                r = self.http.get(self.ping_url, timeout=self.timeout)
+                ok = r.ok and r.json().get("status") == "ok"
+            except Exception:
+                ok = False
+        metrics.inc("rina_backend_pings_total", result="ok" if ok else "fail")
+        return ok
+
+    def _next_wait(self) -> float:
+        with self._lock:
+            if not self._open:
+                return self.interval
+            # circuit deschis: sondăm tot mai rar, ca un backend căzut să nu fie bombardat
+            extra = min(self._consecutive - self.failures, 10)
+            return min(self.max_interval, self.interval * (2 ** max(extra, 0)))
+
+    def _loop(self):
+        # primul /ping a fost făcut de start()
+        while not self._stop.is_set():
+            self._wake.wait(self._next_wait())
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            ok = self._ping()
+            with self._lock:
+                self.pings += 1
+            self._record(ok)
+
+    def _record(self, ok: bool):
+        with self._lock:
+            was_open = self._open
+            self._ok = ok
+            self._checked = time.monotonic()
+            if ok:
+                self._consecutive = 0
+                self._open = False
+            else:
+                self._consecutive += 1
+                if self._consecutive >= self.failures:
+                    self._open = True
+            opened, closed = self._open and not was_open, was_open and not self._open
+        if closed:
+            print("[INFO] Backend reachable again; circuit closed.")
+        elif opened:
+            print(f"[WARN] Backend unreachable ({self.failures} failures); circuit open.")
+
+    # --- starea citită de pagini ---
+    def is_up(self) -> bool:
+        """Ultimul verdict al monitorului, fără rețea; un verdict mai vechi decât ttl contează ca indisponibil."""
+        self.start()
+        with self._lock:
+            return self._ok and not self._open and time.monotonic() - self._checked <= self.ttl
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "up": self._ok and not self._open,
+                "circuit": "open" if self._open else "closed",
+                "consecutive_failures": self._consecutive,
+                "pings": self.pings,
+                "rejected": self.rejected,
+            }
+
+    # --- cereri către backend ---
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        self.start()
+        probe = False
+        with self._lock:
+            if self._open:
+                # half-open: la cel mult o cerere la `interval` secunde de la ultimul verdict trece ca sondă,
+                # ca revenirea backend-ului să nu aștepte /ping-ul monitorului, rărit până la max_interval
+                if self._probing or time.monotonic() - self._checked < self.interval:
+                    self.rejected += 1
+                    raise BackendUnavailable("backend unavailable (circuit open)")
+                self._probing = probe = True
+        try:
+            r = self.http.request(method, url, **kwargs)
+        except requests.ConnectionError:
+            # include ConnectTimeout; un ReadTimeout înseamnă doar un răspuns lent, nu un backend căzut
+            self._record(False)
+            self._wake.set()
+            raise
+        finally:
+            if probe:
+                with self._lock:
+                    self._probing = False
+        self._record(r.status_code not in (502, 503))
+        return r
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
@@ -1,36 +1,44 @@
 import os
+import socket
 import threading
 import time
 import subprocess
-import uvicorn
+
+T0 = time.perf_counter()
+BACKEND_HOST = "127.0.0.1"
+BACKEND_PORT = 8000
+READY_TIMEOUT = float(os.getenv("BACKEND_READY_TIMEOUT", "120"))
 
 
-if not os.path.exists("core/.chroma_store"):
-    print("[INFO] Running initial ingest...")
-    subprocess.run(["python", "-m", "core.ingest"], check=True)
+# store-ul vectorial: cel existent, altfel snapshot-ul împachetat (core/store_snapshot.tar.gz), altfel ingest
+from core.snapshot import ensure_store
+source = ensure_store()
+if source != "existing":
+    print(f"[INFO] Vector store prepared from {source} in {time.perf_counter() - T0:.1f}s.")
 
 
-def run_backend():
-    uvicorn.run("backend.api:app", host="127.0.0.1", port=8000, reload=False)
+import uvicorn
+from backend import api
+
+# socket-ul e deschis înainte de pornirea aplicației: conexiunile sosite devreme așteaptă în coadă, nu sunt refuzate
+sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+sock.bind((BACKEND_HOST, BACKEND_PORT))
+sock.listen(2048)
 
-backend_thread = threading.Thread(target=run_backend, daemon=True)
+server = uvicorn.Server(uvicorn.Config(api.app, reload=False))
+backend_thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
 backend_thread.start()
 
 
-import requests
+# backend-ul anunță singur că e gata (din lifespan), deci nu mai interogăm /ping în buclă
 def wait_for_backend():
-    for _ in range(20):
-        try:
-            r = requests.get("http://127.0.0.1:8000/ping", timeout=2)
-            if r.status_code == 200:
-                print("[INFO] Backend ready.")
-                return
-        except:
-            pass
-        print("[INFO] Waiting for backend to start...")
-        time.sleep(1)
-    print("[ERROR] Backend did not start.")
-    exit(1)
+    deadline = time.monotonic() + READY_TIMEOUT
+    while not api.ready.wait(0.5):
+        if not backend_thread.is_alive() or time.monotonic() > deadline:
+            print("[ERROR] Backend did not start.")
+            exit(1)
+    print(f"[INFO] Backend ready in {time.perf_counter() - T0:.2f}s.")
 
 wait_for_backend()
 
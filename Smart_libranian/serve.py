@@ -0,0 +1,500 @@
+# serve.py
+# Lansare de producție (run.py rămâne varianta de dezvoltare): N workeri uvicorn pentru backend și N workeri
+# WSGI waitress pentru frontend (pool fix de thread-uri, timeout pe conexiunile inactive, cererile citite complet
+# înainte să ocupe un thread), sub un proces master care:
+#   - deschide socket-urile o singură dată; workerii le moștenesc și acceptă din aceeași coadă;
+#   - încarcă starea read-mostly înainte de fork (modulele, catalogul, automatul de titluri, indexul BM25,
+#     indexul NumPy memory-mapped), partajată apoi copy-on-write / prin page cache, nu câte o copie per worker;
+#   - la SIGTERM / Ctrl+C oprește workerii grațios (nu mai acceptă conexiuni, termină cererile în curs, cel mult
+#     GRACEFUL_TIMEOUT secunde) și repornește un worker căzut;
+#   - raportează periodic (REPORT_INTERVAL) și la oprire RSS/PSS per worker și throughput-ul agregat.
+# Doar Linux/macOS (fork); RSS/PSS se citesc din /proc.
+#
+#   python serve.py --backend-workers 4 --frontend-workers 4
+import os
+
+# căutarea vectorială din matricea memory-mapped (o singură copie în page cache pentru toți workerii), nu din
+# indexul HNSW al Chroma, încărcat separat în fiecare proces; trebuie setat înainte de importul core.vector_store
+os.environ.setdefault("VECTOR_BACKEND", "numpy")
+
+import gc, mmap, select, signal, socket, sys, threading, time, traceback, argparse, logging
+
+HOST = os.getenv("SERVE_HOST", "127.0.0.1")
+BACKEND_PORT = int(os.getenv("BACKEND_PORT", "8000"))
+FRONTEND_PORT = int(os.getenv("FRONTEND_PORT", "5000"))
+BACKEND_WORKERS = int(os.getenv("BACKEND_WORKERS", str(os.cpu_count() or 1)))
+FRONTEND_WORKERS = int(os.getenv("FRONTEND_WORKERS", str(os.cpu_count() or 1)))
+GRACEFUL_TIMEOUT = float(os.getenv("GRACEFUL_TIMEOUT", "30"))    # secunde pentru cererile în curs la oprire
+READY_TIMEOUT = float(os.getenv("BACKEND_READY_TIMEOUT", "120"))
+REPORT_INTERVAL = float(os.getenv("REPORT_INTERVAL", "60"))      # secunde între rapoarte; 0 = doar la oprire
+PRELOAD = os.getenv("SERVE_PRELOAD", "1") != "0"
+ACCESS_LOG = os.getenv("ACCESS_LOG", "0") == "1"
+FRONTEND_SERVER = os.getenv("FRONTEND_SERVER", "waitress")       # werkzeug = serverul de dezvoltare, doar pentru teste
+FRONTEND_THREADS = int(os.getenv("FRONTEND_THREADS", "8"))       # thread-uri per worker frontend (waitress)
+FRONTEND_CHANNEL_TIMEOUT = int(os.getenv("FRONTEND_CHANNEL_TIMEOUT", "60"))   # secunde pentru conexiuni inactive
+FRONTEND_CONNECTION_LIMIT = int(os.getenv("FRONTEND_CONNECTION_LIMIT", "200"))
+LISTEN_BACKLOG = 2048
+RESPAWN_DELAY = 1.0   # un worker care cade imediat după pornire nu e repornit în buclă strânsă
+RESTART_POLL = 0.1    # cât de des verifică master-ul workerii reporniți care nu au anunțat încă „ready”
+
+_SIGNALS = {signal.SIGTERM, signal.SIGINT, signal.SIGCHLD}
+_STOP_SIGNALS = {signal.SIGTERM, signal.SIGINT}
+
+class RequestCounters:
+    """Cereri servite per worker, într-o zonă mmap anonimă creată înainte de fork (vizibilă și în master)."""
+
+    def __init__(self, slots: int):
+        self._buf = mmap.mmap(-1, 8 * max(slots, 1))
+        self._counts = memoryview(self._buf).cast("Q")
+        self._lock = threading.Lock()   # fiecare slot e scris de un singur proces; lock-ul e pentru thread-urile lui
+
+    def add(self, slot: int):
+        with self._lock:
+            self._counts[slot] += 1
+
+    def get(self, slot: int) -> int:
+        return self._counts[slot]
+
+class Worker:
+    __slots__ = ("kind", "slot", "index", "pid", "started")
+
+    def __init__(self, kind: str, slot: int, index: int):
+        self.kind, self.slot, self.index = kind, slot, index
+        self.pid, self.started = 0, 0.0
+
+    def __str__(self):
+        return f"{self.kind}#{self.index}"
+
+def memory_mib(pid: int):
+    """(RSS, PSS) în MiB. PSS împarte fiecare pagină partajată între procesele care o folosesc."""
+    rss = pss = 0.0
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Rss:"):
+                    rss = int(line.split()[1]) / 1024
+                elif line.startswith("Pss:"):
+                    pss = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return rss, pss
+
+def listen(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(LISTEN_BACKLOG)
+    return sock
+
+# ---------- pregătire în master ----------
+def prepare_store():
+    """
+    Store-ul (existent / snapshot / ingest) și indexurile derivate, într-un proces copil: master-ul nu
+    trebuie să aibă un client Chroma deschis când face fork.
+    """
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            from core.snapshot import ensure_store
+            from core import vector_store
+            source = ensure_store()
+            n = vector_store.warm_store()   # construiește indexul BM25 / NumPy dacă lipsesc
+            vector_store.close_store()
+            print(f"[INFO] Vector store: {n} books ({source}).")
+            code = 0
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise SystemExit("[ERROR] Vector store preparation failed.")
+
+def preload():
+    """Starea read-mostly, încărcată o dată; workerii o moștenesc la fork în loc să o reconstruiască fiecare."""
+    from backend import api  # noqa: F401  FastAPI, pydantic, NumPy și modulele core
+    import chromadb, openai  # noqa: F401  doar modulele: clienții se creează în fiecare worker, după fork
+    import flask, requests, werkzeug.serving  # noqa: F401  frontend.app însuși deschide baza de date la import
+    try:
+        import waitress.server  # noqa: F401
+    except ImportError:   # verificat în main doar când există workeri frontend
+        pass
+    from core import vector_store
+    from core.catalog import get_catalog
+    from core.title_matcher import get_title_matcher
+    get_catalog()
+    get_title_matcher()
+    vector_store.get_lexical_index()
+    if vector_store.VECTOR_BACKEND == "numpy":
+        vector_store.get_vector_index()
+    # obiectele de până acum nu mai sunt parcurse de GC, deci paginile lor nu sunt atinse (și copiate) în workeri
+    gc.collect()
+    gc.freeze()
+
+# ---------- workeri ----------
+def backend_worker(sock: socket.socket, ready_fd: int, counters: RequestCounters, slot: int):
+    import uvicorn
+    from backend import api
+    api.READY_FD = str(ready_fd)   # lifespan anunță master-ul când workerul e gata
+    app = api.app
+
+    async def counted(scope, receive, send):
+        try:
+            await app(scope, receive, send)
+        finally:
+            if scope["type"] == "http":
+                counters.add(slot)
+
+    config = uvicorn.Config(counted, interface="asgi3", access_log=ACCESS_LOG,
+                            timeout_graceful_shutdown=GRACEFUL_TIMEOUT)
+    # uvicorn tratează SIGTERM/SIGINT: nu mai acceptă, termină cererile în curs, apoi rulează shutdown-ul lifespan
+    uvicorn.Server(config).run(sockets=[sock])
+
+def frontend_worker(sock: socket.socket, ready_fd: int, counters: RequestCounters, slot: int):
+    from werkzeug.wsgi import ClosingIterator
+    import frontend.app as frontend
+    from frontend.backend_client import BackendClient
+
+    backend_base = f"http://{'127.0.0.1' if HOST in ('', '0.0.0.0') else HOST}:{BACKEND_PORT}"
+    frontend.FASTAPI_URL = f"{backend_base}/chat"
+    frontend.FASTAPI_STREAM_URL = f"{backend_base}/chat/stream"
+    frontend.backend = BackendClient(f"{backend_base}/ping")
+
+    in_flight = [0]
+    cond = threading.Condition()
+
+    def done():
+        with cond:
+            in_flight[0] -= 1
+            cond.notify_all()
+        counters.add(slot)
+
+    def tracked(environ, start_response):
+        # cererea e „în curs” până se închide corpul răspunsului (inclusiv fluxurile SSE)
+        with cond:
+            in_flight[0] += 1
+        try:
+            body = frontend.app(environ, start_response)
+        except BaseException:
+            done()
+            raise
+        return ClosingIterator(body, done)
+
+    def drain() -> bool:
+        with cond:
+            return cond.wait_for(lambda: in_flight[0] == 0, timeout=GRACEFUL_TIMEOUT)
+
+    if FRONTEND_SERVER == "werkzeug":
+        serve_werkzeug(sock, ready_fd, tracked)
+        drained = drain()
+    else:
+        drained = serve_waitress(sock, ready_fd, tracked, drain)
+    if not drained:
+        print(f"[WARN] frontend pid {os.getpid()}: {in_flight[0]} requests still running at shutdown.")
+    frontend.backend.stop()
+    frontend.db.close()   # golește coada write-behind, dacă e activă
+
+def serve_waitress(sock: socket.socket, ready_fd: int, app, drain) -> bool:
+    """
+    waitress pe socket-ul moștenit. La SIGTERM/SIGINT nu mai acceptă conexiuni, așteaptă cererile în curs
+    (drain) și ieșirea lor din buffere, apoi închide bucla. Întoarce rezultatul lui drain.
+    """
+    from waitress.server import create_server
+    from waitress import wasyncore
+    logging.getLogger("waitress").setLevel(logging.INFO if ACCESS_LOG else logging.WARNING)
+    server = create_server(app, sockets=[sock], threads=FRONTEND_THREADS, channel_timeout=FRONTEND_CHANNEL_TIMEOUT,
+                           connection_limit=FRONTEND_CONNECTION_LIMIT, backlog=LISTEN_BACKLOG, ident="rina")
+    result = [True]
+
+    def finish():
+        result[0] = drain()
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and any(ch.total_outbufs_len for ch in list(server.active_channels.values())):
+            time.sleep(0.05)
+        # close_all rulează în bucla waitress (prin trigger); harta goală o oprește
+        server.trigger.pull_trigger(lambda: wasyncore.close_all(server._map))
+
+    def stop(signum, frame):
+        if server.accepting:
+            server.accepting = False   # handler-ul rulează în thread-ul buclei
+            threading.Thread(target=finish, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    os.write(ready_fd, b"ready\n")
+    os.close(ready_fd)
+    server.run()
+    server.task_dispatcher.shutdown()
+    return result[0]
+
+def serve_werkzeug(sock: socket.socket, ready_fd: int, app):
+    """Serverul de dezvoltare werkzeug (fără timeout-uri, un thread per cerere): doar cu --frontend-server werkzeug."""
+    from werkzeug.serving import make_server
+    logging.getLogger("werkzeug").setLevel(logging.INFO if ACCESS_LOG else logging.WARNING)
+    server = make_server(HOST, FRONTEND_PORT, app, threaded=True, fd=sock.fileno())
+
+    def stop(signum, frame):
+        # shutdown() așteaptă bucla serve_forever, deci nu poate fi apelat din thread-ul ei
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    os.write(ready_fd, b"ready\n")
+    os.close(ready_fd)
+    server.serve_forever()
+
+class Launcher:
+    def __init__(self, backend_workers: int, frontend_workers: int):
+        self.sockets = {"backend": listen(HOST, BACKEND_PORT)}
+        if frontend_workers:
+            self.sockets["frontend"] = listen(HOST, FRONTEND_PORT)
+        self.targets = {"backend": backend_worker, "frontend": frontend_worker}
+        self.workers = [Worker("backend", i, i) for i in range(backend_workers)]
+        self.workers += [Worker("frontend", backend_workers + i, i) for i in range(frontend_workers)]
+        self.counters = RequestCounters(len(self.workers))
+        self.restarting = {}   # fd -> (worker, pid, termen): reporniți, încă fără semnalul „ready”
+        self.delayed = []      # (moment, worker): reporniri amânate cu RESPAWN_DELAY
+        self.stopped = False
+        self.started = time.monotonic()
+        self._last = (self.started, [0] * len(self.workers))
+
+    def spawn(self, w: Worker) -> int:
+        """Fork + pornirea workerului; întoarce capătul de citire al pipe-ului pe care anunță că e gata."""
+        r, wfd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                os.close(r)
+                signal.pthread_sigmask(signal.SIG_SETMASK, [])
+                for sig in _SIGNALS:
+                    signal.signal(sig, signal.SIG_DFL)
+                for kind, sock in self.sockets.items():
+                    if kind != w.kind:
+                        sock.close()
+                self.targets[w.kind](self.sockets[w.kind], wfd, self.counters, w.slot)
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else 1
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+        os.close(wfd)
+        w.pid, w.started = pid, time.monotonic()
+        return r
+
+    def stop_requested(self) -> bool:
+        """SIGTERM/SIGINT sosit între două citiri de semnale (e blocat, deci rămâne în așteptare)."""
+        for sig in _STOP_SIGNALS & signal.sigpending():
+            signal.sigtimedwait({sig}, 0)
+            if not self.stopped:
+                print(f"[INFO] {signal.Signals(sig).name}: shutting down.")
+                self.stopped = True
+        return self.stopped
+
+    def wait_ready(self, pending) -> bool:
+        """
+        pending: {fd: worker}, la pornire. Un worker care moare înainte de semnal închide pipe-ul (EOF).
+        Întoarce False și la un SIGTERM/SIGINT primit între timp.
+        """
+        deadline = time.monotonic() + READY_TIMEOUT
+        ok = True
+        while pending:
+            if self.stop_requested():
+                return False
+            remaining = deadline - time.monotonic()
+            readable, _, _ = select.select(list(pending), [], [], max(0.0, min(remaining, RESTART_POLL)))
+            if not readable and remaining > RESTART_POLL:
+                continue
+            if not readable:
+                print(f"[ERROR] No readiness signal within {READY_TIMEOUT:.0f}s from "
+                      f"{', '.join(map(str, pending.values()))}.")
+                return False
+            for fd in readable:
+                w = pending.pop(fd)
+                if not os.read(fd, 64):
+                    print(f"[ERROR] {w} (pid {w.pid}) exited during startup.")
+                    ok = False
+                os.close(fd)
+        return ok
+
+    def report(self, final: bool = False):
+        now = time.monotonic()
+        counts = [self.counters.get(w.slot) for w in self.workers]
+        since, before = self._last
+        elapsed = max(now - since, 1e-9)
+        total_rss = total_pss = 0.0
+        rates = {}
+        for w, n, prev in zip(self.workers, counts, before):
+            rss, pss = memory_mib(w.pid)
+            total_rss += rss
+            total_pss += pss
+            rates[w.kind] = rates.get(w.kind, 0.0) + (n - prev) / elapsed
+            print(f"[INFO] {str(w):<11} pid {w.pid:<7} rss {rss:7.1f} MiB  pss {pss:7.1f} MiB  {n} requests")
+        master_rss, master_pss = memory_mib(os.getpid())
+        window = "since start" if final else f"last {elapsed:.0f}s"
+        if final:
+            elapsed = max(now - self.started, 1e-9)
+            rates = {}
+            for w, n in zip(self.workers, counts):
+                rates[w.kind] = rates.get(w.kind, 0.0) + n / elapsed
+        throughput = ", ".join(f"{kind} {rate:.1f} req/s" for kind, rate in rates.items())
+        print(f"[INFO] {len(self.workers)} workers: rss {total_rss:.1f} MiB, pss {total_pss:.1f} MiB "
+              f"(master pss {master_pss:.1f} MiB); {throughput} ({window})")
+        self._last = (now, counts)
+
+    def reap(self, stopping: bool):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            w = next((w for w in self.workers if w.pid == pid), None)
+            if w is None:
+                continue
+            w.pid = 0
+            if stopping:
+                continue
+            print(f"[WARN] {w} (pid {pid}) exited with code {os.waitstatus_to_exitcode(status)}; restarting.")
+            now = time.monotonic()
+            if now - w.started < RESPAWN_DELAY:
+                self.delayed.append((now + RESPAWN_DELAY, w))
+            else:
+                self.restart(w)
+
+    def restart(self, w: Worker):
+        fd = self.spawn(w)
+        self.restarting[fd] = (w, w.pid, time.monotonic() + READY_TIMEOUT)
+
+    def poll_restarts(self):
+        """
+        Repornirile, fără să blocheze bucla principală (care trebuie să vadă SIGTERM/SIGINT): pornește
+        workerii amânați și citește, fără așteptare, pipe-urile celor care nu au anunțat încă „ready”.
+        """
+        now = time.monotonic()
+        due = [w for when, w in self.delayed if when <= now]
+        self.delayed = [(when, w) for when, w in self.delayed if when > now]
+        for w in due:
+            self.restart(w)
+        if not self.restarting:
+            return
+        readable, _, _ = select.select(list(self.restarting), [], [], 0)
+        for fd in list(self.restarting):
+            w, pid, deadline = self.restarting[fd]
+            if fd in readable:
+                if os.read(fd, 64):
+                    print(f"[INFO] {w} restarted (pid {pid}).")
+                else:   # a murit la pornire; SIGCHLD-ul lui îl repornește din nou
+                    print(f"[ERROR] {w} (pid {pid}) exited during startup.")
+            elif now > deadline:
+                print(f"[ERROR] No readiness signal within {READY_TIMEOUT:.0f}s from {w} (pid {pid}); killing it.")
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+            else:
+                continue
+            del self.restarting[fd]
+            os.close(fd)
+
+    def run(self):
+        # semnalele rămân blocate în master și sunt citite sincron (sigtimedwait); workerii le deblochează
+        signal.pthread_sigmask(signal.SIG_BLOCK, _SIGNALS)
+        t0 = time.perf_counter()
+        pending = {self.spawn(w): w for w in self.workers}
+        if not self.wait_ready(pending):
+            for fd in pending:
+                os.close(fd)
+            self.shutdown()
+            raise SystemExit(0 if self.stopped else 1)
+        kinds = ", ".join(f"{sum(w.kind == k for w in self.workers)} {k}" for k in self.sockets)
+        print(f"[INFO] Ready in {time.perf_counter() - t0:.2f}s: {kinds} workers "
+              f"(backend http://{HOST}:{BACKEND_PORT}"
+              + (f", frontend http://{HOST}:{FRONTEND_PORT}" if "frontend" in self.sockets else "") + ").")
+        self._last = (time.monotonic(), [self.counters.get(w.slot) for w in self.workers])
+        next_report = time.monotonic() + REPORT_INTERVAL if REPORT_INTERVAL > 0 else None
+        while True:
+            timeout = None if next_report is None else max(0.0, next_report - time.monotonic())
+            if self.restarting or self.delayed:
+                timeout = RESTART_POLL if timeout is None else min(timeout, RESTART_POLL)
+            info = signal.sigwaitinfo(_SIGNALS) if timeout is None else signal.sigtimedwait(_SIGNALS, timeout)
+            if info is not None and info.si_signo in _STOP_SIGNALS:
+                print(f"[INFO] {signal.Signals(info.si_signo).name}: shutting down.")
+                break
+            if info is not None:
+                self.reap(stopping=False)
+            self.poll_restarts()
+            if next_report is not None and time.monotonic() >= next_report:
+                self.report()
+                next_report = time.monotonic() + REPORT_INTERVAL
+        self.report(final=True)
+        self.shutdown()
+
+    def shutdown(self):
+        self.delayed = []
+        for fd in self.restarting:
+            os.close(fd)
+        self.restarting = {}
+        for w in self.workers:
+            if w.pid:
+                try:
+                    os.kill(w.pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT + 5
+        while any(w.pid for w in self.workers) and time.monotonic() < deadline:
+            signal.sigtimedwait({signal.SIGCHLD}, max(0.0, deadline - time.monotonic()))
+            self.reap(stopping=True)
+        for w in self.workers:
+            if w.pid:
+                print(f"[WARN] {w} (pid {w.pid}) did not stop in time; killing it.")
+                os.kill(w.pid, signal.SIGKILL)
+                os.waitpid(w.pid, 0)
+                w.pid = 0
+        for sock in self.sockets.values():
+            sock.close()
+        print("[INFO] All workers stopped.")
+
+def main(argv=None):
+    global HOST, BACKEND_PORT, FRONTEND_PORT, GRACEFUL_TIMEOUT, REPORT_INTERVAL, FRONTEND_SERVER
+    ap = argparse.ArgumentParser(description="Production launcher: multi-process backend and frontend")
+    ap.add_argument("--backend-workers", type=int, default=BACKEND_WORKERS)
+    ap.add_argument("--frontend-workers", type=int, default=FRONTEND_WORKERS, help="0 = backend only")
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--backend-port", type=int, default=BACKEND_PORT)
+    ap.add_argument("--frontend-port", type=int, default=FRONTEND_PORT)
+    ap.add_argument("--graceful-timeout", type=float, default=GRACEFUL_TIMEOUT)
+    ap.add_argument("--report-interval", type=float, default=REPORT_INTERVAL, help="seconds; 0 = only at shutdown")
+    ap.add_argument("--frontend-server", choices=["waitress", "werkzeug"], default=FRONTEND_SERVER,
+                    help="werkzeug = development server (no timeouts), for local comparison only")
+    ap.add_argument("--no-preload", action="store_true", help="each worker loads its own state (for comparison)")
+    args = ap.parse_args(argv)
+    HOST, BACKEND_PORT, FRONTEND_PORT = args.host, args.backend_port, args.frontend_port
+    GRACEFUL_TIMEOUT, REPORT_INTERVAL = args.graceful_timeout, args.report_interval
+    FRONTEND_SERVER = args.frontend_server
+    if args.frontend_workers > 0 and FRONTEND_SERVER == "waitress":
+        try:
+            import waitress  # noqa: F401
+        except ImportError:
+            raise SystemExit("[ERROR] The frontend needs waitress (pip install waitress); "
+                             "--frontend-server werkzeug runs the development server instead.")
+    elif args.frontend_workers > 0:
+        print("[WARN] Frontend on the werkzeug development server: no request timeouts or slow-client protection.")
+
+    prepare_store()
+    launcher = Launcher(max(1, args.backend_workers), max(0, args.frontend_workers))
+    if PRELOAD and not args.no_preload:
+        t0 = time.perf_counter()
+        preload()
+        print(f"[INFO] Shared state preloaded in {time.perf_counter() - t0:.2f}s.")
+    launcher.run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+# tests/conftest.py
+# Modulele care deschid baza de date la import (frontend.app) nu trebuie să atingă core/rina.sqlite3.
+import os, tempfile
+
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="rina_tests_"), "rina.sqlite3"))
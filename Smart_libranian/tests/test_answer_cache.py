@@ -0,0 +1,38 @@
+# tests/test_answer_cache.py
+# Nivelul semantic al cache-ului de răspunsuri: pragul, limba și rândurile matricei eliberate la evacuare.
+#   python -m pytest -q tests
+import numpy as np
+
+from core.answer_cache import AnswerCache
+
+VECTORS = {
+    "carte despre magie": [1.0, 0.0, 0.0],
+    "o carte despre magie te rog": [0.99, 0.1, 0.0],
+    "carte despre razboi": [0.0, 1.0, 0.0],
+}
+
+def _embed(question):
+    return VECTORS.get(question, [0.0, 0.0, 1.0])
+
+def test_semantic_hit_respects_threshold_and_language():
+    cache = AnswerCache(threshold=lambda: 0.95, embed=_embed)
+    _, _, vec = cache.get("ro", "carte despre magie")
+    cache.put("ro", "carte despre magie", {"response": "A"}, vec)
+
+    assert cache.get("ro", "o carte despre magie te rog")[:2] == ({"response": "A"}, "semantic")
+    assert cache.get("en", "o carte despre magie te rog")[1] == "miss"
+    assert cache.get("ro", "carte despre razboi")[1] == "miss"
+    cache.threshold = 0.999
+    assert cache.get("ro", "o carte despre magie te rog")[1] == "miss"
+
+def test_evicted_entries_free_their_rows():
+    cache = AnswerCache(max_items=3, threshold=0.9, embed=_embed)
+    for i in range(100):
+        v = np.zeros(3, dtype=np.float32)
+        v[i % 3] = 1.0
+        cache.put("ro", f"intrebare {i}", {"response": i}, v)
+    assert cache.stats()["items"] == 3
+    assert len(cache._entries) - len(cache._free) == 3
+    assert len(cache._entries) <= 64
+    answer, kind, _ = cache.get("ro", "carte despre razboi")   # [0, 1, 0]: cea mai nouă e "intrebare 97"
+    assert (answer, kind) == ({"response": 97}, "semantic")
@@ -0,0 +1,48 @@
+# tests/test_backend_client.py
+# Monitorul backend-ului: primul verdict și sonda half-open a circuitului, fără rețea.
+#   python -m pytest -q tests
+import time
+
+import pytest
+import requests
+
+from frontend.backend_client import BackendClient, BackendUnavailable
+
+class _Response:
+    status_code = 200
+
+@pytest.fixture
+def client(monkeypatch):
+    c = BackendClient("http://backend/ping", interval=0.5, failures=2, max_interval=60)
+    state = {"up": True, "requests": 0}
+    monkeypatch.setattr(c, "_ping", lambda: state["up"])
+
+    def request(method, url, **kwargs):
+        state["requests"] += 1
+        if not state["up"]:
+            raise requests.ConnectionError("refused")
+        return _Response()
+
+    monkeypatch.setattr(c.http, "request", request)
+    yield c, state
+    c.stop()
+
+def test_first_render_sees_the_first_ping(client):
+    c, _ = client
+    assert c.is_up()
+
+def test_open_circuit_lets_one_probe_through(client):
+    c, state = client
+    state["up"] = False
+    c.start()
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            c.post("http://backend/chat")
+    assert c.stats()["circuit"] == "open"
+    with pytest.raises(BackendUnavailable):   # prea devreme pentru o sondă
+        c.post("http://backend/chat")
+
+    state["up"] = True   # monitorul e rărit: doar sonda poate închide circuitul acum
+    c._checked = time.monotonic() - 1
+    c.post("http://backend/chat")
+    assert c.stats()["circuit"] == "closed"
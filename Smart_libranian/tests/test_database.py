@@ -0,0 +1,31 @@
+# tests/test_database.py
+# Răspunsurile pe flux trebuie să fie vizibile imediat și pentru alt worker, și în modul write-behind.
+#   python -m pytest -q tests
+from core import database
+
+def test_stream_result_visible_across_write_behind_instances(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_WRITE_LINGER", 1.0)   # coada ar ține scrierea o secundă
+    path = str(tmp_path / "rina.sqlite3")
+    producer = database.ConversationDB(path, write_behind=True)
+    consumer = database.ConversationDB(path, write_behind=True)   # alt worker: altă coadă, aceeași bază
+    try:
+        producer.put_stream_result("tok", 1, "întrebare", "răspuns", ttl=60)
+        assert consumer.pop_stream_result("tok", ttl=60) == (1, "întrebare", "răspuns")
+        assert producer.pop_stream_result("tok", ttl=60) is None
+    finally:
+        producer.close()
+        consumer.close()
+
+def test_pending_visible_across_write_behind_instances(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_WRITE_LINGER", 1.0)
+    path = str(tmp_path / "rina.sqlite3")
+    writer = database.ConversationDB(path, write_behind=True)
+    reader = database.ConversationDB(path, write_behind=True)
+    try:
+        writer.set_pending(1, None, "întrebare", "răspuns")
+        assert reader.get_pending(1) == ("întrebare", "răspuns")
+        reader.clear_pending(1)
+        assert writer.get_pending(1) is None
+    finally:
+        writer.close()
+        reader.close()
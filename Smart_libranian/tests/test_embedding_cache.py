@@ -0,0 +1,22 @@
+# tests/test_embedding_cache.py
+# Citirile de pe disc nu scriu în fișierul partajat; last_used ajunge acolo grupat.
+#   python -m pytest -q tests
+import sqlite3
+
+from core.embedding_cache import EmbeddingCache
+
+def _last_used(path):
+    with sqlite3.connect(path) as con:
+        return con.execute("SELECT last_used FROM embeddings WHERE model='m'").fetchone()[0]
+
+def test_disk_hits_defer_last_used(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    EmbeddingCache(path).put_many("m", ["carte"], [[0.5, 0.25]])
+    before = _last_used(path)
+
+    cache = EmbeddingCache(path)   # memorie goală: citirea vine de pe disc
+    assert cache.get_many("m", ["carte"]) == [[0.5, 0.25]]
+    assert _last_used(path) == before
+
+    cache.close()
+    assert _last_used(path) > before
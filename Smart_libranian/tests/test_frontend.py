@@ -0,0 +1,71 @@
+# tests/test_frontend.py
+# Rutele Flask cu backend-ul înlocuit (fără rețea), pe o bază de date temporară.
+#   python -m pytest -q tests
+import time
+
+import pytest
+
+import frontend.app as frontend
+from core.database import ConversationDB
+
+class _Reply:
+    headers = {}
+
+    def __init__(self, text):
+        self._text = text
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"response": self._text}
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    db = ConversationDB(str(tmp_path / "rina.sqlite3"))
+    monkeypatch.setattr(frontend, "db", db)
+    calls = []
+    monkeypatch.setattr(frontend, "_post_chat", lambda payload, **kw: calls.append(payload) or _Reply("răspuns"))
+    db.create_user("ana", "parola123")
+    user_id = db.validate_user("ana", "parola123")
+    c = frontend.app.test_client()
+    with c.session_transaction() as s:
+        s.update(user_id=user_id, session_id=db.create_session(user_id), last_active=time.time())
+    yield c, calls
+    db.close()
+
+def test_resubmitted_question_does_not_reach_backend(client):
+    c, calls = client
+    c.post("/chat", data={"message": "O carte despre prietenie"})
+    c.post("/chat", data={"message": "O carte despre prietenie"})   # dublu-click: încă pending
+    assert len(calls) == 1
+
+    c.post("/chat", data={"rate": "good"})
+    c.post("/chat", data={"message": "O carte despre prietenie"})   # re-POST după salvare
+    assert len(calls) == 1
+
+    c.post("/chat", data={"message": "Altă întrebare"})
+    assert len(calls) == 2
+
+class _Stream:
+    def __init__(self, lines):
+        self._lines = lines
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self, decode_unicode=True):
+        return iter(self._lines)
+
+def test_stream_error_is_relayed_without_a_result(client, monkeypatch):
+    c, _ = client
+    lines = ['data: {"type": "token", "text": "Am"}', "", 'data: {"type": "error", "detail": "LLM timeout"}']
+    monkeypatch.setattr(frontend.backend, "post", lambda *a, **kw: _Stream(lines))
+    body = c.post("/chat/stream", json={"message": "O carte despre prietenie"}).get_data(as_text=True)
+    assert '"type": "error"' in body and '"type": "done"' not in body
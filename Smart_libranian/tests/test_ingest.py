@@ -0,0 +1,45 @@
+# tests/test_ingest.py
+# Ingest-ul pe flux: checkpoint-ul după --rebuild și oprirea thread-urilor din _staged.
+#   python -m pytest -q tests
+import threading, time
+
+import pytest
+
+from core import embeddings, ingest, vector_store
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # embedding-uri locale (hashed), fără rețea și fără cache pe disc
+    monkeypatch.setattr(embeddings, "EMBED_PROVIDER", "hashed")
+    monkeypatch.setattr(embeddings, "EMBED_CACHE_ENABLED", False)
+    monkeypatch.setattr(embeddings, "_provider", None)
+    vector_store.close_store()
+    monkeypatch.setattr(vector_store, "CHROMA_DIR", str(tmp_path / "chroma"))
+    yield
+    vector_store.close_store()
+
+def test_rebuild_discards_streaming_checkpoint(store):
+    total = len(ingest.load_books())
+    ingest.run_ingest_streaming(batch_size=4)
+    ingest._save_checkpoint(ingest.BOOKS_PATH, total - 4)
+
+    ingest.recreate_collection()
+    stats = ingest.run_ingest_streaming(batch_size=4, resume=True)
+
+    assert stats["added"] == total
+    assert vector_store.get_collection().count() == total
+
+def test_staged_worker_exits_when_consumer_stops():
+    def source():
+        for i in range(100):
+            yield i
+
+    before = threading.active_count()
+    it = ingest._staged(source(), maxsize=1)
+    assert next(it) == 0
+    time.sleep(0.3)  # producătorul umple coada și rămâne blocat în put
+    it.close()
+    deadline = time.monotonic() + 2
+    while threading.active_count() > before and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert threading.active_count() == before
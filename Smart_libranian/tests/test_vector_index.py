@@ -0,0 +1,30 @@
+# tests/test_vector_index.py
+# Indexul NumPy: textele din mmap și rescorarea float16.
+#   python -m pytest -q tests
+import numpy as np
+
+from core import vector_index
+from core.vector_index import VectorIndex
+
+def _build(tmp_path, n=40, dim=16):
+    rng = np.random.default_rng(1)
+    vecs = rng.standard_normal((n, dim)).astype(np.float32)
+    rows = [(f"id{i}", f"Titlu {i} — ă", f"Document {i} despre prietenie și magie", vecs[i]) for i in range(n)]
+    return VectorIndex.build(str(tmp_path / "vindex.json"), rows, n), vecs
+
+def test_texts_round_trip_from_mmap(tmp_path):
+    index, vecs = _build(tmp_path)
+    loaded = VectorIndex.load(index.path)
+    assert len(loaded) == 40
+    assert list(loaded.ids)[:2] == ["id0", "id1"]
+    top = loaded.query(vecs[7], 1)[0]
+    assert (top["id"], top["title"]) == ("id7", "Titlu 7 — ă")
+    assert loaded.documents(["id3", "lipsă"]) == {"id3": "Document 3 despre prietenie și magie"}
+
+def test_rerank_factor_one_still_rescores(tmp_path, monkeypatch):
+    index, vecs = _build(tmp_path)
+    monkeypatch.setattr(vector_index, "VECTOR_INDEX_RERANK", 1)
+    q = vecs[5]
+    top = index.query(q, 3)
+    exact = index.exact[[int(h["id"][2:]) for h in top]].astype(np.float32) @ (q / np.linalg.norm(q))
+    assert np.allclose([h["score"] for h in top], exact)
@@ -0,0 +1,27 @@
+# tests/test_vector_store.py
+# Generația store-ului și cache-urile legate de ea.
+#   python -m pytest -q tests
+from core import embeddings, ingest, vector_store
+
+def _use_tmp_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(embeddings, "EMBED_PROVIDER", "hashed")
+    monkeypatch.setattr(embeddings, "EMBED_CACHE_ENABLED", False)
+    monkeypatch.setattr(embeddings, "_provider", None)
+    vector_store.close_store()
+    monkeypatch.setattr(vector_store, "CHROMA_DIR", str(tmp_path / "chroma"))
+
+def test_back_to_back_bumps_change_the_version(tmp_path, monkeypatch):
+    _use_tmp_store(tmp_path, monkeypatch)
+    vector_store.bump_generation()
+    first = vector_store.store_version()
+    vector_store.bump_generation()   # același tick de mtime pe multe sisteme de fișiere
+    assert first is not None and vector_store.store_version() != first
+
+def test_close_store_drops_derived_indexes(tmp_path, monkeypatch):
+    _use_tmp_store(tmp_path, monkeypatch)
+    ingest.run_ingest()
+    assert vector_store.get_lexical_index() is not None
+    vector_store.check_embeddings()
+    vector_store.close_store()
+    assert vector_store._lexical is None and vector_store._checked is None
+    vector_store.close_store()